@@ -1,10 +1,30 @@
 import os
+import re
+import json
+import time
 import uuid
+import asyncio
+import bisect
+import hashlib
+import random
+import shlex
+import fnmatch
+import codecs
+import configparser
+import signal
+import fcntl
+import tempfile
+from contextlib import contextmanager
 import subprocess
+import threading
+import collections
+import zlib
+import gzip
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 
 import yaml
-from flask import Flask, jsonify, request, render_template, make_response
+from flask import Flask, Response, jsonify, request, render_template, make_response
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -18,6 +38,80 @@ APP_CONFIG = {
     'conda': {
         'base_path': '/mnt/nfsshare/miniforge3',
         'ignored_envs': ['miniforge3', 'base']
+    },
+    'execution': {
+        'max_workers': int(os.environ.get('ANSIBLE_MAX_WORKERS', 4)),
+        'max_per_user': int(os.environ.get('ANSIBLE_MAX_PER_USER', 2)),
+        'max_queued_per_user': int(os.environ.get('ANSIBLE_MAX_QUEUED_PER_USER', 10)),
+        'timeout': 1800,
+        'cancel_grace': 5,
+        'retained': 200,
+        'result_cache_ttl': int(os.environ.get('ANSIBLE_RESULT_CACHE_TTL', 60)),
+        'read_only_playbooks': [
+            'check_disk.yml', 'check_listening_ports.yml', 'check_os_version.yml',
+            'check_uptime.yml', 'disk_space.yml', 'list_active_services.yml',
+            'list_files_etc.yml', 'list_files_root.yml', 'list_installed_packages.yml',
+            'list_security_updates.yml', 'list_sudo_users.yml', 'list_systemctl.yml',
+            'list_users.yml'
+        ],
+        'output_dir': os.path.join(os.path.expanduser("~"), "ansible_quickstart", "executions"),
+        'stream_chunk_size': 64 * 1024,
+        'result_output_limit': 1024 * 1024,
+        'pipeline_max_parallel': 4,
+        'schedule_poll_interval': 15,
+        'schedule_default_jitter': 60,
+        'pipelines_retained': 50,
+        'callback_plugins': os.path.join(os.path.dirname(os.path.abspath(__file__)), 'callback_plugins')
+    },
+    'ssh': {
+        'control_dir': os.path.join(os.path.expanduser("~"), "ansible_quickstart", "ssh"),
+        'control_persist': os.environ.get('ANSIBLE_CONTROL_PERSIST', '300s'),
+        'pipelining': os.environ.get('ANSIBLE_WEBAPP_PIPELINING', 'true').lower() == 'true',
+        'forks': int(os.environ.get('ANSIBLE_WEBAPP_FORKS', 10))
+    },
+    'facts': {
+        'cache_dir': os.path.join(os.path.expanduser("~"), "ansible_quickstart", "facts"),
+        'ttl': int(os.environ.get('ANSIBLE_FACT_CACHE_TTL', 3600)),
+        'warm_interval': int(os.environ.get('ANSIBLE_FACT_WARM_INTERVAL', 1800)),
+        'warm_timeout': 600
+    },
+    'health': {
+        'port': int(os.environ.get('ANSIBLE_HEALTH_PORT', 22)),
+        'timeout': float(os.environ.get('ANSIBLE_HEALTH_TIMEOUT', 3)),
+        'concurrency': int(os.environ.get('ANSIBLE_HEALTH_CONCURRENCY', 200)),
+        'interval': int(os.environ.get('ANSIBLE_HEALTH_INTERVAL', 60)),
+        'ttl': int(os.environ.get('ANSIBLE_HEALTH_TTL', 180)),
+        'exclude_unreachable': os.environ.get('ANSIBLE_EXCLUDE_UNREACHABLE', 'false').lower() == 'true'
+    },
+    'jobs': {
+        'home_root': '/home',
+        'extra_dirs': {'root': '/root/slurm_jobs'},
+        'rescan_interval': int(os.environ.get('JOB_CATALOG_RESCAN_INTERVAL', 30)),
+        'full_rescan_interval': int(os.environ.get('JOB_CATALOG_FULL_RESCAN_INTERVAL', 600)),
+        'max_array_size': int(os.environ.get('SLURM_MAX_ARRAY_SIZE', 1000)),
+        'default_array_throttle': int(os.environ.get('SLURM_ARRAY_THROTTLE', 20))
+    },
+    'slurm': {
+        'poll_interval': int(os.environ.get('SLURM_POLL_INTERVAL', 5)),
+        'accounting_window': int(os.environ.get('SLURM_ACCOUNTING_WINDOW', 86400)),
+        'retention': int(os.environ.get('SLURM_STATE_RETENTION', 86400)),
+        'command_timeout': 10,
+        'event_backlog': 1000,
+        'session_check_interval': 30,
+        'squeue_json': os.environ.get('SLURM_SQUEUE_JSON', 'true').lower() == 'true',
+        'log_chunk_size': 256 * 1024,
+        'log_max_chunk_size': 4 * 1024 * 1024,
+        'log_poll_interval': 0.5,
+        'log_max_wait': 30,
+        'log_unknown_grace': 30
+    },
+    'inventory': {
+        'default_group': 'myhosts',
+        'max_bulk_operations': 5000,
+        'max_page_size': 1000,
+        'source': os.environ.get('ANSIBLE_INVENTORY_SOURCE', 'ini').lower(),
+        'dynamic_script': os.path.join(os.path.dirname(os.path.abspath(__file__)), 'inventory', 'db_inventory.py'),
+        'db_cache_ttl': int(os.environ.get('ANSIBLE_INVENTORY_DB_CACHE_TTL', 10))
     }
 }
 
@@ -78,6 +172,217 @@ class Application(db.Model):
     name = db.Column(db.String(128), nullable=False)
     description = db.Column(db.String(256))
 
+class TaskResult(db.Model):
+    __tablename__ = 'task_results'
+    __table_args__ = (
+        db.Index('ix_task_results_task_status', 'task', 'status'),
+        db.Index('ix_task_results_playbook_task', 'playbook', 'task'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    execution_id = db.Column(db.String(32), nullable=False, index=True)
+    playbook = db.Column(db.String(255), index=True)
+    play = db.Column(db.String(255))
+    task = db.Column(db.String(255), nullable=False)
+    action = db.Column(db.String(128))
+    host = db.Column(db.String(255), nullable=False, index=True)
+    status = db.Column(db.String(16), nullable=False)
+    changed = db.Column(db.Boolean, default=False)
+    message = db.Column(db.String(512))
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    duration = db.Column(db.Float, index=True)
+
+    def to_dict(self):
+        return {
+            'execution_id': self.execution_id,
+            'playbook': self.playbook,
+            'play': self.play,
+            'task': self.task,
+            'action': self.action,
+            'host': self.host,
+            'status': self.status,
+            'changed': self.changed,
+            'message': self.message,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'duration': self.duration
+        }
+
+class ExecutionRecord(db.Model):
+    __tablename__ = 'execution_history'
+    __table_args__ = (
+        db.Index('ix_execution_history_user_created', 'username', 'created_at'),
+        db.Index('ix_execution_history_name_created', 'name', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    execution_id = db.Column(db.String(32), unique=True, nullable=False)
+    kind = db.Column(db.String(16), nullable=False, index=True)
+    username = db.Column(db.String(64), nullable=False)
+    name = db.Column(db.String(255), nullable=False)
+    hosts = db.Column(db.String(255), index=True)
+    status = db.Column(db.String(16), index=True)
+    return_code = db.Column(db.Integer, index=True)
+    slurm_job_id = db.Column(db.String(32), index=True)
+    error = db.Column(db.String(512))
+    teardown_seconds = db.Column(db.Float)
+    first_task_seconds = db.Column(db.Float)
+    output_size = db.Column(db.BigInteger, default=0)
+    created_at = db.Column(db.DateTime, index=True)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'execution_id': self.execution_id,
+            'kind': self.kind,
+            'username': self.username,
+            'name': self.name,
+            'hosts': self.hosts,
+            'status': self.status,
+            'return_code': self.return_code,
+            'slurm_job_id': self.slurm_job_id,
+            'error': self.error,
+            'teardown_seconds': self.teardown_seconds,
+            'first_task_seconds': self.first_task_seconds,
+            'output_size': self.output_size,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class ExecutionOutput(db.Model):
+    __tablename__ = 'execution_outputs'
+
+    execution_id = db.Column(db.String(32), db.ForeignKey('execution_history.execution_id', ondelete='CASCADE'), primary_key=True)
+    compression = db.Column(db.String(16), nullable=False, default='zlib')
+    data = db.Column(db.LargeBinary(length=2**32 - 1), nullable=False)
+
+def utc_isoformat(value):
+    # Schedule columns hold naive UTC; add the offset, since a client reads
+    # an ISO string without one as local time.
+    return value.replace(tzinfo=timezone.utc).isoformat() if value else None
+
+
+class PlaybookSchedule(db.Model):
+    __tablename__ = 'playbook_schedules'
+    __table_args__ = (
+        db.Index('ix_playbook_schedules_enabled_next', 'enabled', 'next_run_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(128), nullable=False)
+    username = db.Column(db.String(64), nullable=False, index=True)
+    playbook = db.Column(db.String(255), nullable=False)
+    hosts = db.Column(db.String(255), nullable=False, default='all')
+    extra_vars = db.Column(db.Text)
+    cron = db.Column(db.String(64), nullable=False)
+    jitter_seconds = db.Column(db.Integer, default=0)
+    enabled = db.Column(db.Boolean, default=True)
+    next_slot_at = db.Column(db.DateTime)
+    next_run_at = db.Column(db.DateTime)
+    last_run_at = db.Column(db.DateTime)
+    last_execution_id = db.Column(db.String(32))
+    skipped_runs = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'username': self.username,
+            'playbook': self.playbook,
+            'hosts': self.hosts,
+            'extra_vars': json.loads(self.extra_vars) if self.extra_vars else None,
+            'cron': self.cron,
+            'timezone': 'UTC',
+            'jitter_seconds': self.jitter_seconds,
+            'enabled': self.enabled,
+            'next_slot_at': utc_isoformat(self.next_slot_at),
+            'next_run_at': utc_isoformat(self.next_run_at),
+            'last_run_at': utc_isoformat(self.last_run_at),
+            'last_execution_id': self.last_execution_id,
+            'skipped_runs': self.skipped_runs,
+            'created_at': utc_isoformat(self.created_at)
+        }
+
+
+class ScheduleRun(db.Model):
+    __tablename__ = 'schedule_runs'
+    __table_args__ = (
+        db.Index('ix_schedule_runs_schedule_slot', 'schedule_id', 'slot_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    schedule_id = db.Column(db.Integer, db.ForeignKey('playbook_schedules.id', ondelete='CASCADE'), nullable=False)
+    execution_id = db.Column(db.String(32))
+    slot_at = db.Column(db.DateTime, nullable=False)
+    dispatched_at = db.Column(db.DateTime)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    lateness_seconds = db.Column(db.Float)
+    status = db.Column(db.String(16))
+    error = db.Column(db.String(512))
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'schedule_id': self.schedule_id,
+            'execution_id': self.execution_id,
+            'slot_at': utc_isoformat(self.slot_at),
+            'dispatched_at': utc_isoformat(self.dispatched_at),
+            'started_at': utc_isoformat(self.started_at),
+            'finished_at': utc_isoformat(self.finished_at),
+            'lateness_seconds': self.lateness_seconds,
+            'status': self.status,
+            'error': self.error
+        }
+
+inventory_group_hosts = db.Table('inventory_group_hosts',
+    db.Column('group_id', db.Integer, db.ForeignKey('inventory_groups.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('host_id', db.Integer, db.ForeignKey('inventory_hosts.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_inventory_group_hosts_host', 'host_id')
+)
+
+
+class InventoryHost(db.Model):
+    __tablename__ = 'inventory_hosts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), unique=True, nullable=False, index=True)
+    ansible_host = db.Column(db.String(255), index=True)
+    ansible_user = db.Column(db.String(64))
+    ansible_connection = db.Column(db.String(32))
+    updated_at = db.Column(db.DateTime)
+    groups = db.relationship('InventoryGroup', secondary=inventory_group_hosts, backref='hosts')
+    host_vars = db.relationship('InventoryHostVar', cascade='all, delete-orphan')
+
+
+class InventoryGroup(db.Model):
+    __tablename__ = 'inventory_groups'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), unique=True, nullable=False, index=True)
+    group_vars = db.relationship('InventoryGroupVar', cascade='all, delete-orphan')
+
+
+class InventoryHostVar(db.Model):
+    __tablename__ = 'inventory_host_vars'
+
+    host_id = db.Column(db.Integer, db.ForeignKey('inventory_hosts.id', ondelete='CASCADE'), primary_key=True)
+    key = db.Column(db.String(128), primary_key=True)
+    value = db.Column(db.Text)
+
+
+class InventoryGroupVar(db.Model):
+    __tablename__ = 'inventory_group_vars'
+
+    group_id = db.Column(db.Integer, db.ForeignKey('inventory_groups.id', ondelete='CASCADE'), primary_key=True)
+    key = db.Column(db.String(128), primary_key=True)
+    value = db.Column(db.Text)
+
 def sync_applications_table():
     manifests = load_application_manifests()
     from sqlalchemy.exc import IntegrityError
@@ -140,11 +445,7 @@ def verify_password(password, password_hash):
     return check_password_hash(password_hash, password)
 
 
-def get_current_user():
-    token = request.cookies.get('session_token')
-    if not token:
-        return None
-    
+def find_active_session(token):
     session = Session.query.filter_by(session_token=token).first()
     if not session:
         return None
@@ -158,6 +459,18 @@ def get_current_user():
     if expires_at < now:
         return None
     
+    return session
+
+
+def get_current_user():
+    token = request.cookies.get('session_token')
+    if not token:
+        return None
+    
+    session = find_active_session(token)
+    if not session:
+        return None
+    
     user = db.session.get(User, session.user_id)
     return user
 
@@ -301,6 +614,23 @@ def list_applications():
     
     return jsonify(filtered_apps)
 
+def normalize_app_name(app_name):
+    return app_name.upper().replace(' ', '_').replace('-', '_').replace('(', '').replace(')', '')
+
+
+def sbatch_preamble_end(lines):
+    # sbatch keeps reading #SBATCH directives past blank lines and other
+    # comments and only stops at the first command, so the preamble runs up
+    # to the last directive before that.
+    end = 1 if lines and lines[0].startswith('#!') else 0
+    for i, line in enumerate(lines):
+        if line.startswith('#SBATCH'):
+            end = i + 1
+        elif line.strip() and not line.lstrip().startswith('#'):
+            break
+    return end
+
+
 def inject_application_setup(content, app_config):
     if not app_config:
         return content
@@ -309,7 +639,7 @@ def inject_application_setup(content, app_config):
     app_name = app_config.get('name', 'Unknown')
     app_type = manifest.get('type', 'Unknown')
     
-    norm_app_name = app_name.upper().replace(' ', '_').replace('-', '_').replace('(', '').replace(')', '')
+    norm_app_name = normalize_app_name(app_name)
     
     app_signature = f"# Application: {app_name}\n# Type: {app_type}"
     if app_signature in content:
@@ -317,16 +647,9 @@ def inject_application_setup(content, app_config):
         return content
     
     lines = content.split('\n')
-    headers = []
-    content_body = []
-    
-    in_headers = True
-    for line in lines:
-        if in_headers and (line.startswith('#!') or line.startswith('#SBATCH')):
-            headers.append(line)
-        else:
-            in_headers = False
-            content_body.append(line)
+    header_end = sbatch_preamble_end(lines)
+    headers = lines[:header_end]
+    content_body = lines[header_end:]
     
     app_setup_lines = [
         "",
@@ -433,12 +756,96 @@ def inject_application_setup(content, app_config):
     return '\n'.join(result_lines)
 
     
+def get_user_application(user, role, app_id):
+    for app_entry in load_application_manifests():
+        if app_entry['type'] != app_id:
+            continue
+        if role == 'admin' or app_id in [a.app_id for a in user.applications]:
+            return app_entry
+    return None
+
+
+def select_sweep_inputs(app_entry, paths=None, pattern=None):
+    available = app_entry['test_files']
+    if paths is not None:
+        by_path = {f['path']: f for f in available}
+        unknown = [p for p in paths if p not in by_path]
+        if unknown:
+            raise ValueError(f"Not a test file of {app_entry['name']}: {unknown[0]}")
+        return [by_path[p] for p in dict.fromkeys(paths)]
+    if pattern:
+        return sorted(
+            (f for f in available if fnmatch.fnmatch(f['display_name'], pattern)),
+            key=lambda f: f['display_name']
+        )
+    return sorted(available, key=lambda f: f['display_name'])
+
+
+def build_sweep_command(app_entry):
+    manifest = app_entry['manifest']
+    func_name = f"run_{normalize_app_name(app_entry['name']).lower()}"
+    input_spec = manifest.get('input') or {}
+    output_spec = manifest.get('output') or {}
+    template = manifest.get('command')
+    if template and manifest.get('type') == 'binary':
+        # The helper already invokes the binary; keep only its arguments.
+        template = template.split(None, 1)[1] if ' ' in template.strip() else ''
+    if not template:
+        template = '{redirect_input}' if input_spec.get('redirect') else '{input_file}'
+        if output_spec.get('redirect'):
+            template += ' {redirect_output}'
+    command = (template
+               .replace('{input_file}', '"$SWEEP_INPUT"')
+               .replace('{redirect_input}', '< "$SWEEP_INPUT"')
+               .replace('{redirect_output}', '> "$SWEEP_OUTPUT"'))
+    return f"{func_name} {command}".strip()
+
+
+def render_sweep_script(content, app_entry, inputs):
+    uses_sweep = 'SWEEP_INPUT' in content or 'run_sweep_task' in content
+    if not uses_sweep:
+        # A plain job script hard-codes its own workload; running that body
+        # in every array task would repeat it N times. Keep only the
+        # shebang and #SBATCH preamble and let each task run its input.
+        lines = content.split('\n')
+        content = '\n'.join(lines[:sbatch_preamble_end(lines)]) + '\n'
+    script = inject_application_setup(content, app_entry)
+    output_ext = (app_entry['manifest'].get('output') or {}).get('extension', '.out')
+
+    block = [
+        "",
+        "# === JOB ARRAY INPUTS ===",
+        "SWEEP_INPUTS=("
+    ]
+    block.extend(f"  {shlex.quote(f['path'])}" for f in inputs)
+    block.extend([
+        ")",
+        'export SWEEP_INPUT="${SWEEP_INPUTS[$SLURM_ARRAY_TASK_ID]}"',
+        'export SWEEP_INPUT_DIR="$(dirname "$SWEEP_INPUT")"',
+        'SWEEP_INPUT_NAME="$(basename "$SWEEP_INPUT")"',
+        f'export SWEEP_OUTPUT="$SLURM_SUBMIT_DIR/${{SWEEP_INPUT_NAME%.*}}_${{SLURM_ARRAY_JOB_ID}}_${{SLURM_ARRAY_TASK_ID}}{output_ext}"',
+        "function run_sweep_task() {",
+        f'  (cd "$SWEEP_INPUT_DIR" && {build_sweep_command(app_entry)})',
+        "}",
+        "# === END JOB ARRAY INPUTS ==="
+    ])
+
+    lines = script.split('\n')
+    insert_at = sbatch_preamble_end(lines)
+    lines[insert_at:insert_at] = block
+    if not uses_sweep:
+        lines.append('run_sweep_task')
+    return '\n'.join(lines)
+
+
 def initialize_directories():
     home_dir = os.path.expanduser("~")
     directories = [
         os.path.join(home_dir, "ansible_quickstart"),
         os.path.join(home_dir, "ansible_quickstart", "playbooks"),
         os.path.join(home_dir, "ansible_quickstart", "jobs"),
+        APP_CONFIG['execution']['output_dir'],
+        APP_CONFIG['facts']['cache_dir'],
         APP_CONFIG['manifest_dir']
     ]
     
@@ -454,116 +861,1069 @@ def initialize_directories():
 # ANSIBLE INVENTORY MANAGEMENT
 # =============================================================================
 
-def parse_inventory_file():
-
-    hosts = []
-    groups = {}
-    home_dir = os.path.expanduser("~")
-    inventory_path = os.path.join(home_dir, "ansible_quickstart", "inventory.ini")
-    
-    if not os.path.exists(inventory_path):
-        print(f"Inventory file not found at: {inventory_path}")
-        return hosts
-
-    try:
-        with open(inventory_path, 'r') as file:
-            content = file.read()
-        
-        lines = content.split('\n')
-        current_group = None
-        seen_hosts = {}
-
-        for line in lines:
-            line = line.strip()
-            
-            if line == "" or line.startswith('#'):
+HOST_RANGE_RE = re.compile(r'\[([^\[\]:]+):([^\[\]:]+)(?::(\d+))?\]')
+
+
+class HostRange:
+    def __init__(self, pattern, host_vars=None):
+        self.pattern = pattern
+        self.vars = host_vars or {}
+        self.parts = []
+        position = 0
+        for match in HOST_RANGE_RE.finditer(pattern):
+            self.parts.append(pattern[position:match.start()])
+            self.parts.append(self.parse_bounds(match.group(1), match.group(2), int(match.group(3) or 1)))
+            position = match.end()
+        self.parts.append(pattern[position:])
+        self._regex = re.compile(''.join(
+            '(\\d+)' if isinstance(part, tuple) and part[0] == 'num'
+            else '([a-zA-Z])' if isinstance(part, tuple)
+            else re.escape(part)
+            for part in self.parts
+        ) + '$')
+
+    @staticmethod
+    def parse_bounds(start, end, step):
+        if step < 1:
+            raise ValueError(f'Invalid range step {step}')
+        if start.isdigit() and end.isdigit():
+            width = len(start) if start.startswith('0') and len(start) > 1 else 0
+            if int(start) > int(end):
+                raise ValueError(f'Invalid range [{start}:{end}]')
+            return ('num', int(start), int(end), step, width)
+        if len(start) == 1 and len(end) == 1 and start.isalpha() and end.isalpha() and start <= end:
+            return ('alpha', ord(start), ord(end), step, 0)
+        raise ValueError(f'Invalid range [{start}:{end}]')
+
+    @staticmethod
+    def range_values(bounds):
+        kind, start, end, step, width = bounds
+        for value in range(start, end + 1, step):
+            yield str(value).zfill(width) if kind == 'num' else chr(value)
+
+    def __iter__(self):
+        def expand(index, prefix):
+            if index == len(self.parts):
+                yield prefix
+                return
+            part = self.parts[index]
+            if isinstance(part, tuple):
+                for value in self.range_values(part):
+                    yield from expand(index + 1, prefix + value)
+            else:
+                yield from expand(index + 1, prefix + part)
+        return expand(0, '')
+
+    def __contains__(self, name):
+        match = self._regex.match(name)
+        if not match:
+            return False
+        bounds = [part for part in self.parts if isinstance(part, tuple)]
+        for value, (kind, start, end, step, width) in zip(match.groups(), bounds):
+            number = int(value) if kind == 'num' else ord(value)
+            if kind == 'num' and str(number).zfill(width) != value:
+                return False
+            if not start <= number <= end or (number - start) % step:
+                return False
+        return True
+
+
+class InventoryModel:
+    def __init__(self):
+        self.groups = {}
+        self.host_vars = {}
+        self.host_order = []
+        self._members = {}
+        self._ancestors = {}
+
+    def group(self, name):
+        if name not in self.groups:
+            self.groups[name] = {'hosts': [], 'ranges': [], 'children': [], 'vars': {}}
+        return self.groups[name]
+
+    @staticmethod
+    def split_line(line):
+        try:
+            return shlex.split(line, comments=False)
+        except ValueError:
+            return line.split()
+
+    @staticmethod
+    def parse_vars(tokens):
+        result = {}
+        for token in tokens:
+            if '=' in token:
+                key, value = token.split('=', 1)
+                result[key] = value
+        return result
+
+    def add_host_entry(self, group_name, tokens):
+        pattern = tokens[0]
+        host_vars = self.parse_vars(tokens[1:])
+        group = self.group(group_name)
+        if HOST_RANGE_RE.search(pattern):
+            host_range = HostRange(pattern, host_vars)
+            group['ranges'].append(host_range)
+            self.host_order.append(host_range)
+            return
+        if pattern not in self.host_vars:
+            self.host_vars[pattern] = {}
+            self.host_order.append(pattern)
+        self.host_vars[pattern].update(host_vars)
+        if pattern not in group['hosts']:
+            group['hosts'].append(pattern)
+
+    @classmethod
+    def from_lines(cls, lines):
+        model = cls()
+        section, kind = 'ungrouped', 'hosts'
+        for raw in lines:
+            line = raw.strip()
+            if not line or line.startswith(('#', ';')):
                 continue
-
             if line.startswith('[') and line.endswith(']'):
-                current_group = line[1:-1]
-                if ':children' not in current_group:
-                    groups[current_group] = []
+                header = line[1:-1].strip()
+                section, _, kind = header.partition(':')
+                kind = kind or 'hosts'
+                model.group(section)
                 continue
+            if kind == 'children':
+                child = line.split()[0]
+                model.group(child)
+                if child not in model.groups[section]['children']:
+                    model.groups[section]['children'].append(child)
+            elif kind == 'vars':
+                key, sep, value = line.partition('=')
+                if sep:
+                    model.groups[section]['vars'][key.strip()] = value.strip()
+            else:
+                tokens = model.split_line(line)
+                if tokens:
+                    model.add_host_entry(section, tokens)
+        model.check_group_loops()
+        return model
+
+    def check_group_loops(self):
+        # Ansible rejects cyclic children, and a cycle would leave the
+        # member and ancestor walks below without a fixed answer.
+        done = set()
+
+        def visit(name, path):
+            if name in path:
+                cycle = path[path.index(name):] + [name]
+                raise ValueError(f"Inventory has a recursive group loop: {' -> '.join(cycle)}")
+            if name in done:
+                return
+            for child in self.groups[name]['children']:
+                visit(child, path + [name])
+            done.add(name)
+
+        for name in self.groups:
+            visit(name, [])
+
+    def host_entries(self):
+        seen = set()
+        for entry in self.host_order:
+            if isinstance(entry, HostRange):
+                for name in entry:
+                    if name not in seen:
+                        seen.add(name)
+                        yield name, dict(entry.vars, **self.host_vars.get(name, {}))
+            elif entry not in seen:
+                seen.add(entry)
+                yield entry, self.host_vars[entry]
+
+    def group_members(self, group_name):
+        if group_name in self._members:
+            return self._members[group_name]
+        group = self.groups.get(group_name)
+        if group is None:
+            return frozenset()
+        members = set(group['hosts'])
+        for host_range in group['ranges']:
+            members.update(host_range)
+        for child in group['children']:
+            members.update(self.group_members(child))
+        self._members[group_name] = frozenset(members)
+        return self._members[group_name]
+
+    def group_ancestors(self, group_name):
+        if group_name not in self._ancestors:
+            parents = {name for name, g in self.groups.items() if group_name in g['children']}
+            ancestors = set(parents)
+            for parent in parents:
+                ancestors.update(self.group_ancestors(parent))
+            self._ancestors[group_name] = frozenset(ancestors)
+        return self._ancestors[group_name]
+
+    def defines_host(self, host_name):
+        # Range membership is tested against the pattern, not by expanding it.
+        return host_name in self.host_vars or any(
+            host_name in host_range
+            for group in self.groups.values() for host_range in group['ranges']
+        )
 
-            parts = line.split()
-            if parts:
-                name = parts[0]
-                host_info = {'name': name, 'groups': []}
-                
-                for part in parts[1:]:
-                    if part.startswith('ansible_host='):
-                        host_info['ip'] = part.split('=', 1)[1]
-                    elif part.startswith('ansible_user='):
-                        host_info['user'] = part.split('=', 1)[1]
-                    elif part.startswith('ansible_connection='):
-                        host_info['connection'] = part.split('=', 1)[1]
-                
-                if 'ip' in host_info and name not in seen_hosts:
-                    hosts.append(host_info)
-                    seen_hosts[name] = len(hosts) - 1
-                    print(f"Found host: {name} -> {host_info.get('ip', '')}")
-                
-                if current_group and current_group in groups:
-                    groups[current_group].append(name)
-                    if name in seen_hosts:
-                        host_index = seen_hosts[name]
-                        if current_group not in hosts[host_index]['groups']:
-                            hosts[host_index]['groups'].append(current_group)
-                continue
-            
-            parts = line.split('.')
-            if len(parts) == 4 and all(part.isdigit() for part in parts):
-                ip = line
-                name = f"host-{ip.replace('.', '-')}"
-                
-                if name not in seen_hosts:
-                    host_info = {
-                        'name': name,
-                        'ip': ip,
-                        'groups': []
-                    }
-                    if current_group:
-                        host_info['groups'].append(current_group)
-                    hosts.append(host_info)
-                    seen_hosts[name] = len(hosts) - 1
-                    print(f"Found simple IP: {ip}")
-                
-                if current_group and current_group in groups:
-                    groups[current_group].append(name)
+    def host_groups(self, host_name, direct):
+        groups = set(direct)
+        for name in direct:
+            groups.update(self.group_ancestors(name))
+        groups.discard('ungrouped')
+        return sorted(groups)
+
+    def group_vars(self, host_name, direct):
+        chain = set(direct)
+        for name in direct:
+            chain.update(self.group_ancestors(name))
+        # Parents first so that the more specific child group wins.
+        ordered = sorted(chain, key=lambda name: len(self.group_ancestors(name)))
+        result = dict(self.groups.get('all', {}).get('vars', {}))
+        for name in ordered:
+            result.update(self.groups[name]['vars'])
+        return result
+
+    def direct_groups_map(self):
+        mapping = {}
+        for name, group in self.groups.items():
+            for host in group['hosts']:
+                mapping.setdefault(host, []).append(name)
+            for host_range in group['ranges']:
+                for host in host_range:
+                    mapping.setdefault(host, []).append(name)
+        return mapping
+
+    def to_host_list(self):
+        direct = self.direct_groups_map()
+        hosts = []
+        for name, host_vars in self.host_entries():
+            direct_groups = direct.get(name, [])
+            merged = dict(self.group_vars(name, direct_groups), **host_vars)
+            host_info = {
+                'name': name,
+                'ip': merged.get('ansible_host', name),
+                'groups': self.host_groups(name, direct_groups)
+            }
+            if 'ansible_user' in merged:
+                host_info['user'] = merged['ansible_user']
+            if 'ansible_connection' in merged:
+                host_info['connection'] = merged['ansible_connection']
+            if 'ansible_port' in merged:
+                host_info['port'] = merged['ansible_port']
+            hosts.append(host_info)
 
         group_hosts = []
-        for group_name, group_members in groups.items():
-            if group_members and group_name != 'all':
-                group_info = {
+        for group_name in sorted(self.groups):
+            if group_name in ('all', 'ungrouped'):
+                continue
+            members = sorted(self.group_members(group_name))
+            if members:
+                group_hosts.append({
                     'name': f"group:{group_name}",
-                    'ip': f"Group ({len(group_members)} hosts: {', '.join(group_members)})",
+                    'ip': f"Group ({len(members)} hosts: {', '.join(members)})",
                     'groups': [group_name]
-                }
-                group_hosts.append(group_info)
-        
-        filtered_group_hosts = [
-            group for group in group_hosts 
-            if not group['name'].replace('group:', '').endswith(':children')
-        ]
-        filtered_group_hosts.sort(key=lambda x: x['name'])
-        
+                })
+
         all_option = {
             'name': 'all',
             'ip': f'All hosts ({len(hosts)} hosts)',
             'groups': ['all']
         }
-        
-        final_hosts = [all_option] + filtered_group_hosts + hosts
-        
-        print(f"Final hosts count: {len(final_hosts)} (including {len(filtered_group_hosts)} filtered groups)")
-        print(f"Groups found: {list(groups.keys())}")
-        print(f"Filtered groups: {[g['name'] for g in filtered_group_hosts]}")
-        
-        return final_hosts
-        
+        return [all_option] + group_hosts + hosts
+
+
+def load_inventory_model():
+    inventory_path = get_inventory_path()
+    if not os.path.exists(inventory_path):
+        return None
+    with open(inventory_path, 'r') as file:
+        return InventoryModel.from_lines(file.readlines())
+
+
+def parse_inventory_file():
+    inventory_path = get_inventory_path()
+    if not os.path.exists(inventory_path):
+        print(f"Inventory file not found at: {inventory_path}")
+        return []
+
+    try:
+        return load_inventory_model().to_host_list()
     except Exception as e:
         print(f"Error reading inventory file: {str(e)}")
-        return hosts
+        return []
+
+inventory_cache = {'key': None, 'hosts': [], 'json': None, 'index': None, 'revision': 0}
+inventory_cache_lock = threading.Lock()
+
+
+def get_inventory_path():
+    return os.path.join(os.path.expanduser("~"), "ansible_quickstart", "inventory.ini")
+
+
+def inventory_source():
+    return 'db' if APP_CONFIG['inventory']['source'] == 'db' else 'ini'
+
+
+def get_ansible_inventory():
+    if inventory_source() == 'db':
+        return APP_CONFIG['inventory']['dynamic_script']
+    return get_inventory_path()
+
+
+def inventory_available():
+    return inventory_source() == 'db' or os.path.exists(get_inventory_path())
+
+
+def inventory_cache_key():
+    if inventory_source() == 'db':
+        # Other workers write the same tables, so the local revision alone
+        # is not enough; the TTL bucket bounds how stale a reader can be.
+        ttl = max(1, APP_CONFIG['inventory']['db_cache_ttl'])
+        return ('db', inventory_cache['revision'], int(time.time() // ttl))
+    try:
+        st = os.stat(get_inventory_path())
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def get_inventory_hosts():
+    key = inventory_cache_key()
+    if key is None:
+        return []
+    with inventory_cache_lock:
+        if inventory_cache['key'] == key:
+            return inventory_cache['hosts']
+
+    hosts = load_db_inventory_hosts() if key[0] == 'db' else parse_inventory_file()
+    with inventory_cache_lock:
+        inventory_cache['key'] = key
+        inventory_cache['hosts'] = hosts
+        inventory_cache['json'] = None
+        inventory_cache['index'] = None
+    return hosts
+
+
+def get_inventory_hosts_json():
+    hosts = get_inventory_hosts()
+    with inventory_cache_lock:
+        if inventory_cache['hosts'] is hosts and inventory_cache['json'] is not None:
+            return inventory_cache['json'], inventory_cache['key']
+        body = json.dumps(hosts)
+        if inventory_cache['hosts'] is hosts:
+            inventory_cache['json'] = body
+        return body, inventory_cache['key']
+
+
+def build_inventory_index(hosts):
+    real_hosts = [h for h in hosts if h['name'] != 'all' and not h['name'].startswith('group:')]
+    members = {}
+    for host in real_hosts:
+        for group in host['groups']:
+            members.setdefault(group, []).append(host['name'])
+    return {
+        'all': next((h for h in hosts if h['name'] == 'all'), None),
+        'groups': [h for h in hosts if h['name'].startswith('group:')],
+        'hosts': real_hosts,
+        'members': members,
+        'sorted_names': sorted((h['name'].lower(), i) for i, h in enumerate(real_hosts))
+    }
+
+
+def get_inventory_index():
+    hosts = get_inventory_hosts()
+    with inventory_cache_lock:
+        if inventory_cache['hosts'] is hosts and inventory_cache['index'] is not None:
+            return inventory_cache['index'], inventory_cache['key']
+    index = build_inventory_index(hosts)
+    with inventory_cache_lock:
+        if inventory_cache['hosts'] is hosts:
+            inventory_cache['index'] = index
+        return index, inventory_cache['key']
+
+
+def compact_group_entry(entry, index):
+    group_name = entry['name'][len('group:'):]
+    count = len(index['members'].get(group_name, []))
+    return {'name': entry['name'], 'ip': f"Group ({count} hosts)", 'groups': entry['groups'], 'count': count}
+
+
+def filter_inventory_entries(index, kind='all', q=None, prefix=None, groups=None, name=None, compact=False):
+    q = (q or '').lower()
+    prefix = (prefix or '').lower()
+    entries = []
+
+    if kind in ('all', 'group') and not groups:
+        candidates = ([index['all']] if index['all'] else []) + index['groups']
+        for entry in candidates:
+            label = entry['name'].lower()
+            bare = label[len('group:'):] if label.startswith('group:') else label
+            if name and entry['name'] != name:
+                continue
+            if prefix and not (label.startswith(prefix) or bare.startswith(prefix)):
+                continue
+            if q and q not in label:
+                continue
+            if compact and entry['name'].startswith('group:'):
+                entry = compact_group_entry(entry, index)
+            entries.append(entry)
+
+    if kind in ('all', 'host'):
+        real_hosts = index['hosts']
+        if name:
+            candidates = [h for h in real_hosts if h['name'] == name]
+        elif prefix:
+            names = index['sorted_names']
+            start = bisect.bisect_left(names, (prefix,))
+            end = bisect.bisect_left(names, (prefix + '\uffff',))
+            candidates = [real_hosts[i] for _, i in names[start:end]]
+        else:
+            candidates = real_hosts
+        if groups:
+            allowed = set()
+            for group in groups:
+                allowed.update(index['members'].get(group, []))
+            candidates = [h for h in candidates if h['name'] in allowed]
+        if q:
+            candidates = [
+                h for h in candidates
+                if q in h['name'].lower() or q in str(h.get('ip', '')).lower()
+            ]
+        entries.extend(candidates)
+
+    return entries
+
+
+def invalidate_inventory_cache():
+    with inventory_cache_lock:
+        inventory_cache['key'] = None
+        inventory_cache['hosts'] = []
+        inventory_cache['json'] = None
+        inventory_cache['index'] = None
+        inventory_cache['revision'] += 1
+
+def format_host_line(name, ip=None, connection=None, user=None):
+    line = f"{name}"
+    if ip:
+        line += f" ansible_host={ip}"
+    if connection:
+        line += f" ansible_connection={connection}"
+    if user:
+        line += f" ansible_user={user}"
+    return line
+
+
+class InventoryDocument:
+    def __init__(self, lines):
+        self.preamble = []
+        self.sections = []
+        current = self.preamble
+        for line in lines:
+            if not line.endswith('\n'):
+                line += '\n'
+            stripped = line.strip()
+            if stripped.startswith('[') and stripped.endswith(']'):
+                section = [line, []]
+                self.sections.append(section)
+                current = section[1]
+            else:
+                current.append(line)
+
+    def find_section(self, group_name):
+        header = f"[{group_name}]"
+        for section in self.sections:
+            if section[0].strip() == header:
+                return section
+        return None
+
+    def add_section(self, group_name):
+        previous = self.sections[-1][1] if self.sections else self.preamble
+        if previous and previous[-1].strip():
+            previous.append('\n')
+        section = [f"[{group_name}]\n", []]
+        self.sections.append(section)
+        return section
+
+    def add_host_line(self, group_name, host_line):
+        section = self.find_section(group_name) or self.add_section(group_name)
+        body = section[1]
+        insert_at = len(body)
+        while insert_at > 0 and not body[insert_at - 1].strip():
+            insert_at -= 1
+        body.insert(insert_at, host_line + '\n')
+
+    def host_bodies(self):
+        yield self.preamble
+        for header, body in self.sections:
+            if ':' not in header.strip()[1:-1]:
+                yield body
+
+    @staticmethod
+    def line_pattern(line):
+        stripped = line.strip()
+        if not stripped or stripped.startswith(('#', ';')):
+            return None
+        return stripped.split()[0]
+
+    def remove_host_lines(self, bodies, name):
+        bodies = list(bodies)
+        # A single host cannot be cut out of a node[01:10] line without
+        # rewriting it, so refuse instead of silently leaving it in place.
+        for body in bodies:
+            for line in body:
+                pattern = self.line_pattern(line)
+                if pattern and pattern != name and HOST_RANGE_RE.search(pattern) and name in HostRange(pattern):
+                    raise ValueError(f'Host {name} is defined by the range {pattern}; edit that line instead')
+        removed = 0
+        for body in bodies:
+            kept = [line for line in body if self.line_pattern(line) != name]
+            removed += len(body) - len(kept)
+            body[:] = kept
+        return removed
+
+    def delete_host(self, name):
+        return self.remove_host_lines(self.host_bodies(), name)
+
+    def remove_host_from_section(self, group_name, name):
+        section = self.find_section(group_name)
+        if not section:
+            return 0
+        return self.remove_host_lines([section[1]], name)
+
+    def delete_group(self, group_name):
+        section = self.find_section(group_name)
+        if not section:
+            return False
+        self.sections.remove(section)
+        return True
+
+    def lines(self):
+        result = list(self.preamble)
+        for header, body in self.sections:
+            result.append(header)
+            result.extend(body)
+        return result
+
+
+@contextmanager
+def locked_inventory(inventory_path):
+    with open(inventory_path + '.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_inventory_atomic(inventory_path, lines):
+    directory = os.path.dirname(inventory_path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.inventory.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(inventory_path):
+            os.chmod(tmp_path, os.stat(inventory_path).st_mode & 0o7777)
+        os.replace(tmp_path, inventory_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def edit_inventory(edit):
+    inventory_path = get_inventory_path()
+    with locked_inventory(inventory_path):
+        with open(inventory_path, 'r') as f:
+            document = InventoryDocument(f.readlines())
+        result = edit(document)
+        write_inventory_atomic(inventory_path, document.lines())
+    invalidate_inventory_cache()
+    return result
+
+
+def apply_inventory_operation(document, operation):
+    op = operation.get('op')
+    if op == 'add_host':
+        name = str(operation.get('name', '')).strip()
+        if not name:
+            raise ValueError('add_host needs a name')
+        group = str(operation.get('group') or APP_CONFIG['inventory']['default_group']).strip()
+        document.add_host_line(group, format_host_line(
+            name,
+            str(operation.get('ip', '')).strip(),
+            str(operation.get('connection', '')).strip(),
+            str(operation.get('user', '')).strip()
+        ))
+        return [name]
+    if op == 'delete_host':
+        name = str(operation.get('name', '')).strip()
+        if not name:
+            raise ValueError('delete_host needs a name')
+        document.delete_host(name)
+        return [name]
+    if op == 'add_group':
+        group_name = str(operation.get('group_name', '')).strip()
+        hosts = operation.get('hosts') or []
+        if not group_name or not hosts:
+            raise ValueError('add_group needs group_name and hosts')
+        model = InventoryModel.from_lines(document.lines())
+        for host in hosts:
+            name = str(host.get('name', '')).strip()
+            if not name:
+                continue
+            # Hosts defined elsewhere (including by a range) are listed by
+            # name only, so their own and inherited vars are not copied here.
+            if model.defines_host(name):
+                document.add_host_line(group_name, name)
+            else:
+                document.add_host_line(group_name, format_host_line(
+                    name, host.get('ip'), host.get('connection'), host.get('user')
+                ))
+        return []
+    if op == 'delete_group':
+        group_name = str(operation.get('group_name', '')).strip()
+        if not group_name:
+            raise ValueError('delete_group needs group_name')
+        document.delete_group(group_name)
+        return []
+    if op == 'update_group':
+        group_name, add, remove = group_membership_changes(operation)
+        # Members are existing hosts, so a bare name is enough: Ansible
+        # merges the host's variables from wherever else it is defined.
+        for name in add:
+            document.add_host_line(group_name, name)
+        for name in remove:
+            document.remove_host_from_section(group_name, name)
+        return add + remove
+    raise ValueError(f'Unknown operation {op}')
+
+
+def group_membership_changes(operation):
+    group_name = str(operation.get('group_name', '')).strip()
+    if not group_name:
+        raise ValueError('update_group needs group_name')
+    changes = []
+    for key in ('add', 'remove'):
+        names = operation.get(key) or []
+        if not isinstance(names, list) or not all(isinstance(n, str) and n.strip() for n in names):
+            raise ValueError(f'update_group {key} must be a list of host names')
+        changes.append([n.strip() for n in names])
+    return group_name, changes[0], changes[1]
+
+# =============================================================================
+# DATABASE INVENTORY
+# =============================================================================
+
+def load_db_inventory_hosts():
+    with app.app_context():
+        host_rows = InventoryHost.query.order_by(InventoryHost.name).all()
+        group_rows = InventoryGroup.query.order_by(InventoryGroup.name).all()
+        memberships = db.session.query(
+            inventory_group_hosts.c.group_id, inventory_group_hosts.c.host_id
+        ).all()
+        host_ports = dict(db.session.query(InventoryHostVar.host_id, InventoryHostVar.value)
+                          .filter(InventoryHostVar.key == 'ansible_port'))
+        group_ports = dict(db.session.query(InventoryGroupVar.group_id, InventoryGroupVar.value)
+                           .filter(InventoryGroupVar.key == 'ansible_port'))
+
+    group_names = {g.id: g.name for g in group_rows}
+    host_names = {h.id: h.name for h in host_rows}
+    groups_by_host = {}
+    members_by_group = {}
+    for group_id, host_id in memberships:
+        if group_id in group_names and host_id in host_names:
+            groups_by_host.setdefault(host_id, []).append(group_names[group_id])
+            members_by_group.setdefault(group_id, []).append(host_names[host_id])
+            if group_id in group_ports:
+                host_ports.setdefault(host_id, group_ports[group_id])
+    all_id = next((g.id for g in group_rows if g.name == 'all'), None)
+    if all_id in group_ports:
+        for h in host_rows:
+            host_ports.setdefault(h.id, group_ports[all_id])
+
+    hosts = []
+    for h in host_rows:
+        host_info = {
+            'name': h.name,
+            'ip': h.ansible_host or h.name,
+            'groups': sorted(groups_by_host.get(h.id, []))
+        }
+        if h.ansible_user:
+            host_info['user'] = h.ansible_user
+        if h.ansible_connection:
+            host_info['connection'] = h.ansible_connection
+        if h.id in host_ports:
+            host_info['port'] = host_ports[h.id]
+        hosts.append(host_info)
+
+    group_hosts = []
+    for g in group_rows:
+        members = members_by_group.get(g.id)
+        if members and g.name != 'all':
+            group_hosts.append({
+                'name': f"group:{g.name}",
+                'ip': f"Group ({len(members)} hosts: {', '.join(members)})",
+                'groups': [g.name]
+            })
+
+    all_option = {
+        'name': 'all',
+        'ip': f'All hosts ({len(hosts)} hosts)',
+        'groups': ['all']
+    }
+    return [all_option] + group_hosts + hosts
+
+
+def export_db_inventory():
+    inventory = {
+        '_meta': {'hostvars': {}},
+        'all': {'children': ['ungrouped']},
+        'ungrouped': {'hosts': []}
+    }
+    hostvars = inventory['_meta']['hostvars']
+    grouped = set()
+
+    for h in InventoryHost.query.order_by(InventoryHost.name).all():
+        vars_ = {}
+        if h.ansible_host:
+            vars_['ansible_host'] = h.ansible_host
+        if h.ansible_user:
+            vars_['ansible_user'] = h.ansible_user
+        if h.ansible_connection:
+            vars_['ansible_connection'] = h.ansible_connection
+        for var in h.host_vars:
+            vars_[var.key] = var.value
+        hostvars[h.name] = vars_
+
+    for g in InventoryGroup.query.order_by(InventoryGroup.name).all():
+        group_vars = {v.key: v.value for v in g.group_vars}
+        if g.name == 'all':
+            # Holds the [all:vars] only; every host is implicitly a member.
+            inventory['all']['vars'] = group_vars
+            continue
+        members = sorted(h.name for h in g.hosts)
+        grouped.update(members)
+        inventory[g.name] = {'hosts': members, 'vars': group_vars}
+        inventory['all']['children'].append(g.name)
+
+    inventory['ungrouped']['hosts'] = sorted(name for name in hostvars if name not in grouped)
+    return inventory
+
+
+def format_inventory_ini(inventory):
+    hostvars = inventory['_meta']['hostvars']
+
+    def host_line(name):
+        parts = [name] + [f"{key}={value}" for key, value in hostvars.get(name, {}).items()]
+        return ' '.join(parts)
+
+    lines = [host_line(name) for name in inventory['ungrouped']['hosts']]
+    for group_name in inventory['all']['children']:
+        if group_name == 'ungrouped':
+            continue
+        group = inventory[group_name]
+        if lines:
+            lines.append('')
+        lines.append(f"[{group_name}]")
+        lines.extend(host_line(name) for name in group['hosts'])
+        if group['vars']:
+            lines.append('')
+            lines.append(f"[{group_name}:vars]")
+            lines.extend(f"{key}={value}" for key, value in group['vars'].items())
+    if inventory['all'].get('vars'):
+        if lines:
+            lines.append('')
+        lines.append('[all:vars]')
+        lines.extend(f"{key}={value}" for key, value in inventory['all']['vars'].items())
+    return '\n'.join(lines) + '\n'
+
+
+def inventory_digest():
+    # A version stamp rather than a content hash: it only has to change
+    # whenever the inventory does, and it runs on every launch. Every write
+    # path touches InventoryHost.updated_at or changes one of the counts.
+    if inventory_source() == 'db':
+        with app.app_context():
+            version = (
+                tuple(db.session.query(db.func.count(InventoryHost.id), db.func.max(InventoryHost.updated_at)).one()),
+                InventoryGroup.query.count(),
+                db.session.query(db.func.count()).select_from(inventory_group_hosts).scalar(),
+                InventoryHostVar.query.count(),
+                InventoryGroupVar.query.count()
+            )
+    else:
+        version = inventory_cache_key()
+        if version is None:
+            return ''
+    return hashlib.sha256(repr(version).encode()).hexdigest()
+
+
+def db_inventory_host(name, batch, create=False):
+    if name not in batch['hosts']:
+        host = InventoryHost.query.filter_by(name=name).first()
+        if host is None and create:
+            host = InventoryHost(name=name)
+            db.session.add(host)
+        batch['hosts'][name] = host
+    return batch['hosts'][name]
+
+
+def db_inventory_group(name, batch, create=False):
+    if name not in batch['groups']:
+        group = InventoryGroup.query.filter_by(name=name).first()
+        if group is None and create:
+            group = InventoryGroup(name=name)
+            db.session.add(group)
+        batch['groups'][name] = group
+    return batch['groups'][name]
+
+
+def upsert_db_inventory_host(batch, name, ip=None, connection=None, user=None):
+    host = db_inventory_host(name, batch, create=True)
+    if ip:
+        host.ansible_host = ip
+    if connection:
+        host.ansible_connection = connection
+    if user:
+        host.ansible_user = user
+    host.updated_at = datetime.now(timezone.utc)
+    return host
+
+
+def apply_db_inventory_operation(operation, batch):
+    op = operation.get('op')
+    if op == 'add_host':
+        name = str(operation.get('name', '')).strip()
+        if not name:
+            raise ValueError('add_host needs a name')
+        group_name = str(operation.get('group') or APP_CONFIG['inventory']['default_group']).strip()
+        host = upsert_db_inventory_host(
+            batch, name,
+            str(operation.get('ip', '')).strip(),
+            str(operation.get('connection', '')).strip(),
+            str(operation.get('user', '')).strip()
+        )
+        group = db_inventory_group(group_name, batch, create=True)
+        if group not in host.groups:
+            host.groups.append(group)
+        return [name]
+    if op == 'delete_host':
+        name = str(operation.get('name', '')).strip()
+        if not name:
+            raise ValueError('delete_host needs a name')
+        host = db_inventory_host(name, batch)
+        if host is not None:
+            db.session.delete(host)
+            batch['hosts'][name] = None
+        return [name]
+    if op == 'add_group':
+        group_name = str(operation.get('group_name', '')).strip()
+        hosts = operation.get('hosts') or []
+        if not group_name or not hosts:
+            raise ValueError('add_group needs group_name and hosts')
+        group = db_inventory_group(group_name, batch, create=True)
+        touched = []
+        for entry in hosts:
+            name = str(entry.get('name', '')).strip()
+            if not name:
+                continue
+            host = upsert_db_inventory_host(
+                batch, name, entry.get('ip'), entry.get('connection'), entry.get('user')
+            )
+            if group not in host.groups:
+                host.groups.append(group)
+            touched.append(name)
+        return touched
+    if op == 'delete_group':
+        group_name = str(operation.get('group_name', '')).strip()
+        if not group_name:
+            raise ValueError('delete_group needs group_name')
+        group = db_inventory_group(group_name, batch)
+        if group is None:
+            return []
+        # Match the INI behaviour: hosts only listed in this group go with it.
+        orphaned = [h for h in group.hosts if len(h.groups) == 1]
+        for host in orphaned:
+            db.session.delete(host)
+            batch['hosts'][host.name] = None
+        db.session.delete(group)
+        batch['groups'][group_name] = None
+        return [h.name for h in orphaned]
+    if op == 'update_group':
+        group_name, add, remove = group_membership_changes(operation)
+        group = db_inventory_group(group_name, batch, create=True)
+        for name in add:
+            host = db_inventory_host(name, batch)
+            if host is None:
+                raise ValueError(f'Unknown host {name}')
+            if group not in host.groups:
+                host.groups.append(group)
+                host.updated_at = datetime.now(timezone.utc)
+        for name in remove:
+            host = db_inventory_host(name, batch)
+            if host is not None and group in host.groups:
+                host.groups.remove(group)
+                host.updated_at = datetime.now(timezone.utc)
+        return add + remove
+    raise ValueError(f'Unknown operation {op}')
+
+
+def apply_inventory_operations(operations):
+    def apply_all(apply):
+        touched = []
+        for index, operation in enumerate(operations):
+            try:
+                touched.extend(apply(operation))
+            except (ValueError, AttributeError) as e:
+                raise ValueError(f'Operation {index}: {str(e)}')
+        return touched
+
+    if inventory_source() != 'db':
+        return edit_inventory(lambda document: apply_all(
+            lambda operation: apply_inventory_operation(document, operation)
+        ))
+
+    batch = {'hosts': {}, 'groups': {}}
+    try:
+        touched = apply_all(lambda operation: apply_db_inventory_operation(operation, batch))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    invalidate_inventory_cache()
+    return touched
+
+
+def set_inventory_var(collection, model, key, value):
+    for var in collection:
+        if var.key == key:
+            var.value = value
+            return
+    collection.append(model(key=key, value=value))
+
+
+def import_inventory_ini(content):
+    model = InventoryModel.from_lines(content.splitlines())
+    batch = {'hosts': {}, 'groups': {}}
+    try:
+        db.session.execute(inventory_group_hosts.delete())
+        InventoryHostVar.query.delete()
+        InventoryGroupVar.query.delete()
+        InventoryHost.query.delete()
+        InventoryGroup.query.delete()
+
+        for name, host_vars in model.host_entries():
+            host = upsert_db_inventory_host(
+                batch, name,
+                host_vars.get('ansible_host'),
+                host_vars.get('ansible_connection'),
+                host_vars.get('ansible_user')
+            )
+            for key, value in host_vars.items():
+                if key not in ('ansible_host', 'ansible_connection', 'ansible_user'):
+                    set_inventory_var(host.host_vars, InventoryHostVar, key, value)
+
+        # The tables have no parent/child relation, so children are
+        # flattened into direct memberships of every ancestor group. 'all'
+        # is kept as a group row with no members so its vars survive.
+        for group_name in model.groups:
+            if group_name == 'ungrouped':
+                continue
+            if group_name == 'all' and not model.groups['all']['vars']:
+                continue
+            group = db_inventory_group(group_name, batch, create=True)
+            if group_name == 'all':
+                for key, value in model.groups['all']['vars'].items():
+                    set_inventory_var(group.group_vars, InventoryGroupVar, key, value)
+                continue
+            for key, value in model.groups[group_name]['vars'].items():
+                set_inventory_var(group.group_vars, InventoryGroupVar, key, value)
+            for name in model.group_members(group_name):
+                host = db_inventory_host(name, batch)
+                if host is not None and group not in host.groups:
+                    host.groups.append(group)
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    invalidate_inventory_cache()
+    return len([h for h in batch['hosts'].values() if h is not None])
+
+
+def db_pattern_host_names(term):
+    if term in ('all', '*'):
+        return {name for (name,) in db.session.query(InventoryHost.name)}
+    if '*' in term:
+        like = term.replace('%', r'\%').replace('_', r'\_').replace('*', '%')
+        names = {name for (name,) in db.session.query(InventoryHost.name).filter(InventoryHost.name.like(like))}
+        names.update(
+            name for (name,) in db.session.query(InventoryHost.name)
+            .join(InventoryHost.groups).filter(InventoryGroup.name.like(like))
+        )
+        return names
+    names = {
+        name for (name,) in db.session.query(InventoryHost.name)
+        .join(InventoryHost.groups).filter(InventoryGroup.name == term)
+    }
+    names.update(
+        name for (name,) in db.session.query(InventoryHost.name).filter(InventoryHost.name == term)
+    )
+    return names
+
+
+def resolve_limit_hosts(limit, pattern_host_names=db_pattern_host_names):
+    # Same order as Ansible: union every plain term, then apply the &
+    # intersections, then the ! exclusions. A limit made only of & and !
+    # terms starts from all hosts.
+    terms = {'union': [], 'intersect': [], 'exclude': []}
+    for raw in re.split(r'[,:]', limit or ''):
+        term = raw.strip()
+        if not term:
+            continue
+        mode = 'union'
+        if term.startswith('!'):
+            mode, term = 'exclude', term[1:]
+        elif term.startswith('&'):
+            mode, term = 'intersect', term[1:]
+        if term.startswith('group:'):
+            term = term[len('group:'):]
+        terms[mode].append(term)
+    if not terms['union'] and (terms['intersect'] or terms['exclude']):
+        terms['union'].append('all')
+
+    selected = set()
+    for term in terms['union']:
+        selected |= pattern_host_names(term)
+    for term in terms['intersect']:
+        selected &= pattern_host_names(term)
+    for term in terms['exclude']:
+        selected -= pattern_host_names(term)
+    return sorted(selected)
+
+
+def index_pattern_host_names(term, index):
+    names = {h['name'] for h in index['hosts']}
+    if term in ('all', '*'):
+        return names
+    if '*' in term:
+        matched = {name for name in names if fnmatch.fnmatchcase(name, term)}
+        for group, members in index['members'].items():
+            if fnmatch.fnmatchcase(group, term):
+                matched.update(members)
+        return matched
+    matched = set(index['members'].get(term, []))
+    if term in names:
+        matched.add(term)
+    return matched
+
+
+def resolve_target_hosts(limit):
+    if inventory_source() == 'db':
+        with app.app_context():
+            return resolve_limit_hosts(limit)
+    index, _ = get_inventory_index()
+    return resolve_limit_hosts(limit, lambda term: index_pattern_host_names(term, index))
 
 # =============================================================================
 # PLAYBOOK MANAGEMENT
@@ -612,96 +1972,1692 @@ def get_playbooks():
     return playbooks
 
 # =============================================================================
-# SLURM JOB MANAGEMENT
+# ANSIBLE FACT CACHE
 # =============================================================================
 
-def get_jobs():
-    jobs = []
-    unique_filenames = set()
-    user = get_current_user()
-    if not user:
-        return jobs
-    
-    jobs_dir = f'/home/{user.username}/slurm_jobs'
-    if os.path.exists(jobs_dir):
-        for filename in os.listdir(jobs_dir):
-            if filename.endswith(('.yml', '.yaml', '.sh', '.slurm')):
-                if filename in unique_filenames:
-                    continue
-                    
-                unique_filenames.add(filename)
-                job_name = os.path.splitext(filename)[0]
-                job_info = {
-                    'filename': filename,
-                    'name': job_name,
-                    'path': os.path.join(jobs_dir, filename),
-                    'owner': user.username
-                }
-                jobs.append(job_info)
-    
-    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
-    if role == 'admin':
-        admin_dirs = ['/root/slurm_jobs']
-        for admin_dir in admin_dirs:
-            if os.path.exists(admin_dir):
-                for filename in os.listdir(admin_dir):
-                    if filename.endswith(('.yml', '.yaml', '.sh', '.slurm')):
-                        if filename in unique_filenames:
-                            continue
-                            
-                        unique_filenames.add(filename)
-                        job_name = os.path.splitext(filename)[0]
-                        job_info = {
-                            'filename': filename,
-                            'name': job_name,
-                            'path': os.path.join(admin_dir, filename),
-                            'owner': 'root'
-                        }
-                        jobs.append(job_info)
-    
-    jobs.sort(key=lambda x: x['name'])
-    return jobs
+fact_warm_lock = threading.Lock()
+fact_warm_status = {'running': False, 'last_started': None, 'last_finished': None, 'last_result': None}
 
-@app.route('/api/update-job', methods=['POST'])
-def update_job():
-    try:
-        user = get_current_user()
-        if not user:
-            return jsonify({'success': False, 'error': 'Not logged in'})
-        role = db.session.get(Role, user.role_id).name if user.role_id else 'user' 
-        
-        data = request.get_json()
-        original_filename = data.get('original_filename')
-        name = data.get('name', '').strip()
-        description = data.get('description', '').strip()
-        content = data.get('content', '').strip()
 
-        if not original_filename or not name or not content:
-            return jsonify({'success': False, 'error': 'Original filename, name and content are required'})
+def get_inventory_host_names():
+    return [
+        h['name'] for h in get_inventory_hosts()
+        if h['name'] != 'all' and not h['name'].startswith('group:')
+    ]
 
-        filename = name
-        if not filename.endswith(('.sh', '.slurm')):
-            filename += '.sh'
 
-        original_path = None
-        job_owner = user.username
-        
-        if role == 'admin':
-            import glob
-            for jobs_dir in glob.glob('/home/*/slurm_jobs'):
-                candidate = os.path.join(jobs_dir, original_filename)
-                if os.path.exists(candidate):
-                    original_path = candidate
-                    job_owner = jobs_dir.split('/')[2] 
-                    break
-        else:
-            jobs_dir = f'/home/{user.username}/slurm_jobs'
-            candidate = os.path.join(jobs_dir, original_filename)
-            if os.path.exists(candidate):
-                original_path = candidate
+def fact_cache_path(host):
+    return os.path.join(APP_CONFIG['facts']['cache_dir'], host)
 
-        if not original_path:
-            return jsonify({'success': False, 'error': f'Original job {original_filename} not found'})
+
+def get_fact_cache_entries():
+    cache_dir = APP_CONFIG['facts']['cache_dir']
+    ttl = APP_CONFIG['facts']['ttl']
+    now = time.time()
+    entries = {}
+    if os.path.exists(cache_dir):
+        for entry in os.scandir(cache_dir):
+            if entry.is_file():
+                age = now - entry.stat().st_mtime
+                entries[entry.name] = {'age': round(age, 1), 'stale': age > ttl}
+    return entries
+
+
+def invalidate_host_facts(hosts=None):
+    if hosts is None:
+        hosts = list(get_fact_cache_entries().keys())
+    removed = []
+    for host in hosts:
+        path = fact_cache_path(host)
+        if host and os.path.basename(path) == host and os.path.exists(path):
+            os.remove(path)
+            removed.append(host)
+    return removed
+
+
+def prune_stale_facts():
+    stale = [host for host, entry in get_fact_cache_entries().items() if entry['stale']]
+    return invalidate_host_facts(stale)
+
+
+def warm_fact_cache(hosts=None):
+    if not fact_warm_lock.acquire(blocking=False):
+        return False
+    try:
+        fact_warm_status['running'] = True
+        fact_warm_status['last_started'] = datetime.now(timezone.utc).isoformat()
+        prune_stale_facts()
+
+        inventory_path = get_ansible_inventory()
+        cached = get_fact_cache_entries()
+        if hosts is None:
+            hosts = get_inventory_host_names()
+        missing = [h for h in hosts if h not in cached]
+        if not missing or not inventory_available():
+            fact_warm_status['last_result'] = {'gathered': 0, 'return_code': 0}
+            return True
+
+        cmd = ['ansible', '-i', inventory_path, ','.join(missing), '-m', 'setup']
+        try:
+            result = run_in_process_group(
+                cmd, APP_CONFIG['facts']['warm_timeout'],
+                env=ansible_profile_env(inventory_path)
+            )
+            fact_warm_status['last_result'] = {'gathered': len(missing), 'return_code': result.returncode}
+        except subprocess.TimeoutExpired:
+            fact_warm_status['last_result'] = {'gathered': 0, 'error': 'Fact warm-up timed out'}
+        return True
+    except Exception as e:
+        fact_warm_status['last_result'] = {'gathered': 0, 'error': str(e)}
+        print(f"Error warming fact cache: {str(e)}")
+        return True
+    finally:
+        fact_warm_status['running'] = False
+        fact_warm_status['last_finished'] = datetime.now(timezone.utc).isoformat()
+        fact_warm_lock.release()
+
+
+def start_fact_cache_warmer():
+    def loop():
+        while True:
+            warm_fact_cache()
+            time.sleep(APP_CONFIG['facts']['warm_interval'])
+
+    threading.Thread(target=loop, name='fact-cache-warmer', daemon=True).start()
+
+
+# =============================================================================
+# HOST HEALTH PROBING
+# =============================================================================
+
+host_health = {}
+host_health_lock = threading.Lock()
+health_probe_lock = threading.Lock()
+health_probe_status = {'running': False, 'last_started': None, 'last_finished': None, 'probed': 0}
+
+
+async def probe_host(semaphore, name, address, port, timeout):
+    async with semaphore:
+        started = time.monotonic()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(address, port), timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            return name, {'status': 'down', 'error': str(e) or type(e).__name__, 'latency_ms': None}
+        latency = round((time.monotonic() - started) * 1000, 1)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return name, {'status': 'up', 'error': None, 'latency_ms': latency}
+
+
+async def probe_hosts_async(targets):
+    config = APP_CONFIG['health']
+    semaphore = asyncio.Semaphore(config['concurrency'])
+    return await asyncio.gather(*[
+        probe_host(semaphore, name, address, port, config['timeout'])
+        for name, address, port in targets
+    ])
+
+
+def probe_inventory_hosts(names=None, claimed=False):
+    # The API claims the lock before starting the thread so two requests
+    # can't both start a probe; claimed hands that ownership over.
+    if not claimed and not health_probe_lock.acquire(blocking=False):
+        return False
+    try:
+        health_probe_status['running'] = True
+        health_probe_status['last_started'] = datetime.now(timezone.utc).isoformat()
+        index, _ = get_inventory_index()
+        targets = []
+        local = []
+        for host in index['hosts']:
+            if names is not None and host['name'] not in names:
+                continue
+            if host.get('connection') == 'local':
+                local.append(host['name'])
+            else:
+                try:
+                    port = int(host.get('port') or APP_CONFIG['health']['port'])
+                except ValueError:
+                    port = APP_CONFIG['health']['port']
+                targets.append((host['name'], host.get('ip') or host['name'], port))
+
+        results = asyncio.run(probe_hosts_async(targets)) if targets else []
+        checked_at = time.time()
+        with host_health_lock:
+            for name, result in results:
+                result['checked_at'] = checked_at
+                host_health[name] = result
+            for name in local:
+                host_health[name] = {'status': 'up', 'error': None, 'latency_ms': 0.0, 'checked_at': checked_at}
+            if names is None:
+                known = {h['name'] for h in index['hosts']}
+                for name in list(host_health):
+                    if name not in known:
+                        del host_health[name]
+        health_probe_status['probed'] = len(results) + len(local)
+        return True
+    except Exception as e:
+        print(f"Error probing host health: {str(e)}")
+        return True
+    finally:
+        health_probe_status['running'] = False
+        health_probe_status['last_finished'] = datetime.now(timezone.utc).isoformat()
+        health_probe_lock.release()
+
+
+def get_host_health(name):
+    with host_health_lock:
+        entry = host_health.get(name)
+    if entry is None or time.time() - entry['checked_at'] > APP_CONFIG['health']['ttl']:
+        return {'status': 'unknown', 'error': None, 'latency_ms': None, 'checked_at': entry['checked_at'] if entry else None}
+    return entry
+
+
+def get_unreachable_hosts():
+    ttl = APP_CONFIG['health']['ttl']
+    now = time.time()
+    with host_health_lock:
+        return sorted(
+            name for name, entry in host_health.items()
+            if entry['status'] == 'down' and now - entry['checked_at'] <= ttl
+        )
+
+
+def start_health_prober():
+    def loop():
+        while True:
+            probe_inventory_hosts()
+            time.sleep(APP_CONFIG['health']['interval'])
+
+    threading.Thread(target=loop, name='host-health-prober', daemon=True).start()
+
+
+# =============================================================================
+# ANSIBLE EXECUTION ENGINE
+# =============================================================================
+
+execution_pool = ThreadPoolExecutor(
+    max_workers=APP_CONFIG['execution']['max_workers'],
+    thread_name_prefix='ansible-exec'
+)
+executions = {}
+executions_lock = threading.Lock()
+
+
+def get_execution_profile(inventory_path):
+    ssh_config = APP_CONFIG['ssh']
+    key = hashlib.sha1(os.path.abspath(inventory_path).encode()).hexdigest()[:12]
+    control_path_dir = os.path.join(ssh_config['control_dir'], key)
+    if not os.path.exists(control_path_dir):
+        os.makedirs(control_path_dir, mode=0o700)
+    return {
+        'inventory': inventory_path,
+        'control_path_dir': control_path_dir,
+        'control_persist': ssh_config['control_persist'],
+        'pipelining': ssh_config['pipelining'],
+        'forks': ssh_config['forks']
+    }
+
+
+SSH_CONTROL_OPTIONS = ('controlmaster', 'controlpersist')
+
+
+def configured_ssh_args(env):
+    if env.get('ANSIBLE_SSH_ARGS'):
+        return env['ANSIBLE_SSH_ARGS']
+    # Same lookup order as Ansible; only the first config file found is used.
+    candidates = [
+        env.get('ANSIBLE_CONFIG'),
+        os.path.join(os.getcwd(), 'ansible.cfg'),
+        os.path.expanduser('~/.ansible.cfg'),
+        '/etc/ansible/ansible.cfg'
+    ]
+    for path in candidates:
+        if path and os.path.isfile(path):
+            parser = configparser.ConfigParser(interpolation=None)
+            try:
+                parser.read(path)
+            except configparser.Error as e:
+                print(f"Error reading {path}: {str(e)}")
+                return ''
+            return parser.get('ssh_connection', 'ssh_args', fallback='')
+    return ''
+
+
+def merge_ssh_args(configured, control_persist):
+    try:
+        tokens = shlex.split(configured)
+    except ValueError:
+        tokens = configured.split()
+    kept = []
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        option = tokens[index + 1] if token == '-o' and index + 1 < len(tokens) else token[2:] if token.startswith('-o') else None
+        if option is not None and re.split(r'[=\s]', option.strip(), 1)[0].lower() in SSH_CONTROL_OPTIONS:
+            index += 2 if token == '-o' else 1
+            continue
+        kept.append(token)
+        index += 1
+    if not configured:
+        kept.append('-C')
+    kept.extend(['-o', 'ControlMaster=auto', '-o', f'ControlPersist={control_persist}'])
+    return ' '.join(shlex.quote(token) for token in kept)
+
+
+def ansible_profile_env(inventory_path, env=None, use_cached_facts=True):
+    env = dict(os.environ if env is None else env)
+    profile = get_execution_profile(inventory_path)
+    fact_config = APP_CONFIG['facts']
+    env['ANSIBLE_CACHE_PLUGIN'] = 'jsonfile'
+    env['ANSIBLE_CACHE_PLUGIN_CONNECTION'] = fact_config['cache_dir']
+    env['ANSIBLE_CACHE_PLUGIN_TIMEOUT'] = str(fact_config['ttl'])
+    env['ANSIBLE_GATHERING'] = 'smart' if use_cached_facts else 'implicit'
+    env['ANSIBLE_PIPELINING'] = str(profile['pipelining'])
+    env['ANSIBLE_FORKS'] = str(profile['forks'])
+    # Keep whatever ssh_args the operator configured; only the connection
+    # multiplexing options are ours.
+    env['ANSIBLE_SSH_ARGS'] = merge_ssh_args(configured_ssh_args(env), profile['control_persist'])
+    env['ANSIBLE_SSH_CONTROL_PATH_DIR'] = profile['control_path_dir']
+    env['ANSIBLE_SSH_CONTROL_PATH'] = '%(directory)s/%%C'
+    return env
+
+
+class PlaybookExecution:
+    def __init__(self, username, playbook, hosts, cmd, inventory=None, use_cached_facts=True, profile=False):
+        self.id = uuid.uuid4().hex
+        self.username = username
+        self.playbook = playbook
+        self.hosts = hosts
+        self.cmd = cmd
+        self.inventory = inventory
+        self.use_cached_facts = use_cached_facts
+        self.profile = profile
+        self.cache_key = None
+        self.read_only = False
+        self.excluded_hosts = []
+        self.lock_keys = {'*'}
+        self.watchers = {username}
+        self.status = 'queued'
+        self.return_code = None
+        self.error = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at = None
+        self.finished_at = None
+        self.log_path = os.path.join(APP_CONFIG['execution']['output_dir'], f"{self.id}.log")
+        self.events_path = os.path.join(APP_CONFIG['execution']['output_dir'], f"{self.id}.events.jsonl")
+        self.host_stats = {}
+        self.first_task = None
+        self.process = None
+        self.process_lock = threading.Lock()
+        self.cancelled_by = None
+        self.teardown_seconds = None
+        self.teardown_done = threading.Event()
+        self.output_size = 0
+        self.output_changed = threading.Condition()
+        self.done = threading.Event()
+        self.done_callbacks = []
+
+    @property
+    def finished(self):
+        return self.done.is_set()
+
+    @property
+    def output(self):
+        # Only the tail; the full log is served by the offset-based stream.
+        if not os.path.exists(self.log_path):
+            return ''
+        limit = APP_CONFIG['execution']['result_output_limit']
+        with open(self.log_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - limit))
+            data = f.read(limit)
+        if size > limit:
+            data = data[data.find(b'\n') + 1:]
+        return data.decode('utf-8', errors='replace')
+
+    def append_output(self, log_file, data):
+        log_file.write(data)
+        with self.output_changed:
+            self.output_size += len(data)
+            self.output_changed.notify_all()
+
+    def read_output(self, offset, limit):
+        if offset >= self.output_size or not os.path.exists(self.log_path):
+            return b''
+        with open(self.log_path, 'rb') as f:
+            f.seek(offset)
+            return f.read(min(limit, self.output_size - offset))
+
+    def wait_for_output(self, offset, timeout):
+        with self.output_changed:
+            if self.output_size <= offset and not self.finished:
+                self.output_changed.wait(timeout)
+            return self.output_size > offset
+
+    def finish(self):
+        self.finished_at = datetime.now(timezone.utc)
+        with self.output_changed:
+            self.done.set()
+            self.output_changed.notify_all()
+            callbacks, self.done_callbacks = self.done_callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def add_done_callback(self, callback):
+        with self.output_changed:
+            if not self.finished:
+                self.done_callbacks.append(callback)
+                return
+        callback(self)
+
+    def cancel(self, username):
+        with self.process_lock:
+            if self.finished or self.cancelled_by:
+                return False
+            self.cancelled_by = username
+            process = self.process
+        if process:
+            threading.Thread(target=self.tear_down, daemon=True).start()
+        return True
+
+    def tear_down(self):
+        self.teardown_seconds = terminate_process_group(self.process)
+        self.teardown_done.set()
+
+    def to_dict(self, include_output=False):
+        data = {
+            'execution_id': self.id,
+            'username': self.username,
+            'playbook': self.playbook,
+            'hosts': self.hosts,
+            'excluded_hosts': self.excluded_hosts,
+            'read_only': self.read_only,
+            'watchers': sorted(self.watchers),
+            'status': self.status,
+            'return_code': self.return_code,
+            'error': self.error,
+            'cancelled_by': self.cancelled_by,
+            'teardown_seconds': self.teardown_seconds,
+            'output_size': self.output_size,
+            'queue_position': execution_scheduler.position(self) if self.status == 'queued' else None,
+            'host_stats': self.host_stats,
+            'first_task': self.first_task,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+        if include_output:
+            data['output'] = self.output
+            data['output_truncated'] = self.output_size > APP_CONFIG['execution']['result_output_limit']
+        return data
+
+
+def build_execution_env(execution):
+    env = os.environ.copy()
+    if execution.inventory:
+        env = ansible_profile_env(execution.inventory, env, execution.use_cached_facts)
+    env['PYTHONUNBUFFERED'] = '1'
+
+    plugin_dirs = [APP_CONFIG['execution']['callback_plugins']]
+    if env.get('ANSIBLE_CALLBACK_PLUGINS'):
+        plugin_dirs.append(env['ANSIBLE_CALLBACK_PLUGINS'])
+    env['ANSIBLE_CALLBACK_PLUGINS'] = os.pathsep.join(plugin_dirs)
+
+    enabled = [c for c in env.get('ANSIBLE_CALLBACKS_ENABLED', '').split(',') if c]
+    if 'webapp_events' not in enabled:
+        enabled.append('webapp_events')
+    env['ANSIBLE_CALLBACKS_ENABLED'] = ','.join(enabled)
+    env['ANSIBLE_CALLBACK_WHITELIST'] = env['ANSIBLE_CALLBACKS_ENABLED']
+    env['WEBAPP_EVENTS_PATH'] = execution.events_path
+    return env
+
+
+def ingest_task_results(execution):
+    if not os.path.exists(execution.events_path):
+        return []
+
+    results = []
+    timings = []
+    first_task_times = []
+    with open(execution.events_path, 'r') as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event.get('event') == 'stats':
+                execution.host_stats = event.get('hosts', {})
+            elif event.get('event') == 'first_task':
+                first_task_times.append(event['seconds'])
+            elif event.get('event') == 'task':
+                results.append(TaskResult(
+                    execution_id=execution.id,
+                    playbook=execution.playbook,
+                    play=(event.get('play') or '')[:255],
+                    task=(event.get('task') or '')[:255],
+                    action=event.get('action'),
+                    host=event['host'],
+                    status=event['status'],
+                    changed=event.get('changed', False),
+                    message=event.get('msg'),
+                    started_at=datetime.fromtimestamp(event['start'], timezone.utc),
+                    finished_at=datetime.fromtimestamp(event['end'], timezone.utc),
+                    duration=round(event['end'] - event['start'], 3)
+                ))
+                timings.append((event.get('play') or '', event.get('task') or '', event['host'],
+                                event['end'] - event['start']))
+
+    if first_task_times:
+        execution.first_task = {
+            'hosts': len(first_task_times),
+            'avg_seconds': round(sum(first_task_times) / len(first_task_times), 3),
+            'max_seconds': round(max(first_task_times), 3)
+        }
+
+    with app.app_context():
+        try:
+            db.session.add_all(results)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error storing task results for {execution.id}: {str(e)}")
+
+    os.remove(execution.events_path)
+    return timings
+
+
+def format_task_profile(timings, limit=20):
+    tasks = {}
+    hosts = {}
+    for play, task, host, duration in timings:
+        entry = tasks.setdefault((play, task), [0.0, 0.0, 0])
+        entry[0] += duration
+        entry[1] = max(entry[1], duration)
+        entry[2] += 1
+        hosts[host] = hosts.get(host, 0.0) + duration
+
+    lines = ["", "TASK TIMING (slowest first)", "=" * 72]
+    for (play, task), (total, longest, count) in sorted(tasks.items(), key=lambda i: -i[1][1])[:limit]:
+        lines.append(f"{(play + ' : ' + task)[:44]:<44} {longest:>8.2f}s max {total / count:>8.2f}s avg  x{count}")
+    lines.extend(["", "HOST TIMING (slowest first)", "=" * 72])
+    for host, total in sorted(hosts.items(), key=lambda i: -i[1])[:limit]:
+        lines.append(f"{host[:52]:<52} {total:>10.2f}s")
+    return "\n".join(lines) + "\n"
+
+
+def compress_output_file(path):
+    compressor = zlib.compressobj(6)
+    parts = []
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            parts.append(compressor.compress(chunk))
+    parts.append(compressor.flush())
+    return b''.join(parts)
+
+
+def iter_decompressed_output(data, chunk_size=64 * 1024):
+    decompressor = zlib.decompressobj()
+    for i in range(0, len(data), chunk_size):
+        pending = data[i:i + chunk_size]
+        # Cap each step so a highly compressed chunk can't expand all at once.
+        while pending:
+            chunk = decompressor.decompress(pending, chunk_size)
+            if chunk:
+                yield chunk
+            pending = decompressor.unconsumed_tail
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+def save_execution_record(execution_id, kind, username, name, hosts, status,
+                          created_at, started_at=None, finished_at=None,
+                          return_code=None, error=None, slurm_job_id=None,
+                          teardown_seconds=None, first_task_seconds=None,
+                          output=None, output_path=None):
+    with app.app_context():
+        try:
+            record = ExecutionRecord.query.filter_by(execution_id=execution_id).first()
+            if not record:
+                record = ExecutionRecord(
+                    execution_id=execution_id,
+                    kind=kind,
+                    username=username,
+                    name=name[:255],
+                    hosts=(hosts or '')[:255],
+                    created_at=created_at
+                )
+                db.session.add(record)
+            record.status = status
+            record.started_at = started_at
+            record.finished_at = finished_at
+            record.return_code = return_code
+            record.error = error[:512] if error else None
+            record.slurm_job_id = slurm_job_id
+            record.teardown_seconds = teardown_seconds
+            record.first_task_seconds = first_task_seconds
+
+            data = None
+            if output_path and os.path.exists(output_path):
+                record.output_size = os.path.getsize(output_path)
+                data = compress_output_file(output_path)
+            elif output is not None:
+                raw = output.encode('utf-8')
+                record.output_size = len(raw)
+                data = zlib.compress(raw, 6)
+            if data is not None:
+                db.session.flush()
+                db.session.merge(ExecutionOutput(execution_id=execution_id, compression='zlib', data=data))
+
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error saving execution record {execution_id}: {str(e)}")
+
+
+def record_execution(execution):
+    save_execution_record(
+        execution.id, 'playbook', execution.username, execution.playbook, execution.hosts,
+        execution.status, execution.created_at,
+        started_at=execution.started_at,
+        finished_at=execution.finished_at,
+        return_code=execution.return_code,
+        error=execution.error,
+        teardown_seconds=execution.teardown_seconds,
+        first_task_seconds=(execution.first_task or {}).get('avg_seconds'),
+        output_path=execution.log_path if execution.finished else None
+    )
+
+
+def terminate_process_group(process, grace=None):
+    if grace is None:
+        grace = APP_CONFIG['execution']['cancel_grace']
+    start = time.monotonic()
+    for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            break
+        try:
+            process.wait(timeout=grace)
+            break
+        except subprocess.TimeoutExpired:
+            continue
+    # Forked ssh/ansible workers can outlive the group leader.
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    return round(time.monotonic() - start, 3)
+
+
+def run_in_process_group(cmd, timeout, input=None, **kwargs):
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if input is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        start_new_session=True,
+        **kwargs
+    )
+    try:
+        stdout, stderr = process.communicate(input=input, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        terminate_process_group(process)
+        process.communicate()
+        raise
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+
+def run_execution(execution):
+    execution.status = 'running'
+    execution.started_at = datetime.now(timezone.utc)
+    timed_out = threading.Event()
+    try:
+        cmd_string = " ".join(execution.cmd)
+        env = build_execution_env(execution)
+        with open(execution.log_path, 'ab', buffering=0) as log_file:
+            execution.append_output(log_file, f"Command: {cmd_string}\n\n".encode())
+            with execution.process_lock:
+                if execution.cancelled_by:
+                    return
+                process = subprocess.Popen(
+                    execution.cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    env=env,
+                    start_new_session=True
+                )
+                execution.process = process
+
+            def kill_on_timeout():
+                timed_out.set()
+                execution.tear_down()
+
+            watchdog = threading.Timer(APP_CONFIG['execution']['timeout'], kill_on_timeout)
+            watchdog.daemon = True
+            watchdog.start()
+            try:
+                for line in process.stdout:
+                    execution.append_output(log_file, line)
+                process.wait()
+            finally:
+                watchdog.cancel()
+            if execution.cancelled_by or timed_out.is_set():
+                execution.teardown_done.wait(APP_CONFIG['execution']['cancel_grace'] * 3 + 5)
+
+            execution.return_code = process.returncode
+            execution.append_output(log_file, f"\nReturn code: {process.returncode}\n".encode())
+            if execution.cancelled_by:
+                execution.append_output(
+                    log_file,
+                    f"Cancelled by {execution.cancelled_by}, teardown took {execution.teardown_seconds}s\n".encode()
+                )
+
+        timings = ingest_task_results(execution)
+        if execution.profile and timings:
+            with open(execution.log_path, 'ab', buffering=0) as log_file:
+                execution.append_output(log_file, format_task_profile(timings).encode())
+
+        if execution.cancelled_by:
+            execution.status = 'cancelled'
+            execution.error = f'Cancelled by {execution.cancelled_by}'
+        elif timed_out.is_set():
+            execution.status = 'error'
+            execution.error = 'Command timed out after 30 minutes'
+        else:
+            execution.status = 'completed' if execution.return_code == 0 else 'failed'
+    except Exception as e:
+        execution.status = 'error'
+        execution.error = f'Execution error: {str(e)}'
+    finally:
+        if execution.cancelled_by and execution.status != 'cancelled':
+            execution.status = 'cancelled'
+            execution.error = f'Cancelled by {execution.cancelled_by}'
+        execution.finish()
+        record_execution(execution)
+
+
+def sse_text_frame(text, event_id):
+    # EventSource also ends a line at a bare \r, which would cut a progress
+    # line short, so normalise line endings before framing.
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    data = '\n'.join(f"data: {line}" for line in text.split('\n'))
+    return f"id: {event_id}\n{data}\n\n"
+
+
+def decoded_offset(decoder, offset):
+    # Bytes of a character split across chunks wait in the decoder; the
+    # resume id must point before them so a reconnect re-reads them.
+    return offset - len(decoder.getstate()[0])
+
+
+def stream_execution_output(execution, offset):
+    chunk_size = APP_CONFIG['execution']['stream_chunk_size']
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    while True:
+        if not execution.wait_for_output(offset, timeout=15):
+            if execution.finished:
+                tail = decoder.decode(b'', final=True)
+                if tail:
+                    yield sse_text_frame(tail, offset)
+                yield f"event: end\ndata: {json.dumps(execution.to_dict())}\n\n"
+                return
+            yield ": keepalive\n\n"
+            continue
+
+        chunk = execution.read_output(offset, chunk_size)
+        if not execution.finished or offset + len(chunk) < execution.output_size:
+            # Only emit whole lines while more output may follow, unless a
+            # single line is longer than the chunk size.
+            newline = chunk.rfind(b'\n')
+            if newline >= 0:
+                chunk = chunk[:newline + 1]
+        offset += len(chunk)
+
+        text = decoder.decode(chunk)
+        if text:
+            yield sse_text_frame(text, decoded_offset(decoder, offset))
+
+
+def prune_executions():
+    retained = APP_CONFIG['execution']['retained']
+    finished = sorted(
+        (e for e in executions.values() if e.finished),
+        key=lambda e: e.finished_at
+    )
+    for execution in finished[:max(0, len(finished) - retained)]:
+        del executions[execution.id]
+        if os.path.exists(execution.log_path):
+            os.remove(execution.log_path)
+
+
+def host_lock_keys(hosts):
+    if not hosts or hosts == 'all':
+        return {'*'}
+    # Lock on the host names the target resolves to, so "group:web" and
+    # "web01" conflict. If the inventory cannot be read, lock everything.
+    try:
+        return set(resolve_target_hosts(hosts))
+    except Exception as e:
+        print(f"Error resolving {hosts} for host locks: {str(e)}")
+        return {'*'}
+
+
+class ExecutionScheduler:
+    def __init__(self, pool, max_running, max_per_user, max_queued_per_user):
+        self.pool = pool
+        self.max_running = max_running
+        self.max_per_user = max_per_user
+        self.max_queued_per_user = max_queued_per_user
+        self.lock = threading.Lock()
+        self.pending = []
+        self.running = {}
+
+    def can_accept(self, username):
+        with self.lock:
+            queued = sum(1 for e in self.pending if e.username == username)
+        return queued < self.max_queued_per_user
+
+    def submit(self, execution):
+        # Resolved once, outside the scheduler lock: it may read the inventory.
+        execution.lock_keys = host_lock_keys(execution.hosts)
+        with self.lock:
+            self.pending.append(execution)
+            self._dispatch()
+
+    def position(self, execution):
+        with self.lock:
+            if execution in self.pending:
+                return self.pending.index(execution) + 1
+        return None
+
+    def cancel(self, execution, username):
+        with self.lock:
+            queued = execution in self.pending
+            if queued:
+                self.pending.remove(execution)
+        if not queued:
+            return execution.cancel(username)
+        execution.cancelled_by = username
+        execution.status = 'cancelled'
+        execution.error = f'Cancelled by {username}'
+        execution.finish()
+        record_execution(execution)
+        return True
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.running.values()), list(self.pending)
+
+    def _conflicts(self, keys, locked):
+        if not locked:
+            return False
+        if '*' in keys or '*' in locked:
+            return True
+        return bool(keys & locked)
+
+    def _next_candidate(self):
+        running_by_user = {}
+        locked = set()
+        for e in self.running.values():
+            running_by_user[e.username] = running_by_user.get(e.username, 0) + 1
+            locked |= e.lock_keys
+
+        best = None
+        # A run held back by a host lock reserves its hosts, so later runs
+        # that overlap it can't keep slipping in ahead of it. Without this a
+        # queued 'all' run never gets a slot under steady load.
+        reserved = set()
+        for e in self.pending:
+            user_running = running_by_user.get(e.username, 0)
+            if user_running >= self.max_per_user:
+                continue
+            if self._conflicts(e.lock_keys, locked | reserved):
+                reserved |= e.lock_keys
+                continue
+            # Fair share: the user with the fewest running executions goes
+            # first, FIFO among equals.
+            if best is None or user_running < running_by_user.get(best.username, 0):
+                best = e
+        return best
+
+    def _dispatch(self):
+        while len(self.running) < self.max_running:
+            execution = self._next_candidate()
+            if not execution:
+                break
+            self.pending.remove(execution)
+            self.running[execution.id] = execution
+            self.pool.submit(self._run, execution)
+
+    def _run(self, execution):
+        try:
+            run_execution(execution)
+        finally:
+            with self.lock:
+                self.running.pop(execution.id, None)
+                self._dispatch()
+
+
+execution_scheduler = ExecutionScheduler(
+    execution_pool,
+    APP_CONFIG['execution']['max_workers'],
+    APP_CONFIG['execution']['max_per_user'],
+    APP_CONFIG['execution']['max_queued_per_user']
+)
+
+
+def register_execution(execution):
+    with executions_lock:
+        prune_executions()
+        executions[execution.id] = execution
+
+
+def get_execution_for_user(execution_id, user):
+    execution = executions.get(execution_id)
+    if not execution:
+        return None
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    if role != 'admin' and user.username not in execution.watchers:
+        return None
+    return execution
+
+
+def execution_cache_key(playbook_path, hosts, extra_vars, use_cached_facts, profile=False):
+    digest = hashlib.sha256()
+    with open(playbook_path, 'rb') as f:
+        digest.update(hashlib.sha256(f.read()).digest())
+    digest.update(inventory_digest().encode())
+    digest.update(json.dumps([hosts, extra_vars or {}, use_cached_facts, profile], sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def is_read_only_playbook(playbook_path):
+    if os.path.basename(playbook_path) in APP_CONFIG['execution']['read_only_playbooks']:
+        return True
+    with open(playbook_path, 'r') as f:
+        for _ in range(5):
+            line = f.readline().strip().lower()
+            if line in ('# read-only: true', '# readonly: true'):
+                return True
+    return False
+
+
+def validate_playbook_request(role, playbook, extra_vars=None):
+    home_dir = os.path.expanduser("~")
+    if role == 'admin':
+        playbook_path = get_playbook_paths(playbook)
+    else:
+        playbook_path = os.path.join(home_dir, "ansible_quickstart", "playbooks", playbook)
+    if not inventory_available():
+        raise ValueError('Inventory file not found')
+    if not playbook_path or not os.path.exists(playbook_path):
+        raise ValueError('Playbook file not found')
+    if extra_vars is not None and not isinstance(extra_vars, dict):
+        raise ValueError('extra_vars must be an object')
+    return playbook_path
+
+
+def create_playbook_execution(username, role, playbook, hosts, extra_vars=None, use_cached_facts=True,
+                              profile=False, exclude_unreachable=None):
+    inventory_path = get_ansible_inventory()
+    playbook_path = validate_playbook_request(role, playbook, extra_vars)
+    # Only real booleans: bool("false") would silently turn the flag on.
+    for name, value in (('use_cached_facts', use_cached_facts), ('profile', profile),
+                        ('exclude_unreachable', exclude_unreachable)):
+        if value is not None and not isinstance(value, bool):
+            raise ValueError(f'{name} must be true or false')
+
+    if exclude_unreachable is None:
+        exclude_unreachable = APP_CONFIG['health']['exclude_unreachable']
+    excluded = []
+    if exclude_unreachable:
+        # Only hosts this run would actually touch; unrelated hosts going
+        # down must not change the limit or the coalescing key.
+        down = get_unreachable_hosts()
+        if down:
+            excluded = sorted(set(down).intersection(resolve_target_hosts(hosts)))
+    limit = hosts
+    if excluded:
+        limit = ','.join([hosts] + [f"!{name}" for name in excluded])
+
+    cmd = [
+        'ansible-playbook',
+        '-i', inventory_path,
+        playbook_path,
+        '-v'
+    ]
+    if limit != 'all':
+        cmd.extend(['--limit', limit])
+    if extra_vars:
+        cmd.extend(['-e', json.dumps(extra_vars)])
+
+    execution = PlaybookExecution(
+        username, playbook, hosts, cmd,
+        inventory=inventory_path,
+        use_cached_facts=use_cached_facts,
+        profile=profile
+    )
+    execution.excluded_hosts = excluded
+    execution.cache_key = execution_cache_key(
+        playbook_path, limit, extra_vars, use_cached_facts, profile
+    )
+    execution.read_only = is_read_only_playbook(playbook_path)
+    return execution
+
+
+coalesce_lock = threading.Lock()
+coalesced_runs = {}
+
+
+def reusable_execution(execution):
+    if not execution.finished:
+        return True
+    if not execution.read_only or execution.status != 'completed':
+        return False
+    age = (datetime.now(timezone.utc) - execution.finished_at).total_seconds()
+    return age < APP_CONFIG['execution']['result_cache_ttl']
+
+
+def launch_execution(execution):
+    with coalesce_lock:
+        for key in [k for k, e in coalesced_runs.items() if not reusable_execution(e)]:
+            del coalesced_runs[key]
+
+        existing = coalesced_runs.get(execution.cache_key)
+        if existing and existing.id in executions:
+            existing.watchers.add(execution.username)
+            return existing, True
+
+        if not execution_scheduler.can_accept(execution.username):
+            raise ValueError('Too many queued executions, wait for some to finish')
+        # Registering is in-memory, so later launches with the same key can
+        # join this run; persisting and scheduling happen outside the lock.
+        register_execution(execution)
+        if execution.cache_key:
+            coalesced_runs[execution.cache_key] = execution
+
+    record_execution(execution)
+    execution_scheduler.submit(execution)
+    return execution, False
+
+# =============================================================================
+# PLAYBOOK PIPELINES
+# =============================================================================
+
+pipelines = {}
+pipelines_lock = threading.Lock()
+
+
+def validate_pipeline_stages(stages):
+    if not isinstance(stages, list) or not stages:
+        raise ValueError('Pipeline needs at least one stage')
+
+    ids = set()
+    for stage in stages:
+        if not isinstance(stage, dict) or not stage.get('id') or not stage.get('playbook'):
+            raise ValueError('Every stage needs an id and a playbook')
+        if stage['id'] in ids:
+            raise ValueError(f"Duplicate stage id {stage['id']}")
+        hosts = stage.get('hosts', 'all')
+        if not isinstance(hosts, str) or not hosts.strip():
+            raise ValueError(f"Stage {stage['id']} hosts must be a non-empty host pattern")
+        depends_on = stage.get('depends_on', [])
+        if not isinstance(depends_on, list) or not all(isinstance(dep, str) for dep in depends_on):
+            raise ValueError(f"Stage {stage['id']} depends_on must be a list of stage ids")
+        ids.add(stage['id'])
+
+    for stage in stages:
+        for dep in stage.get('depends_on', []):
+            if dep not in ids:
+                raise ValueError(f"Stage {stage['id']} depends on unknown stage {dep}")
+
+    remaining = {stage['id']: set(stage.get('depends_on', [])) for stage in stages}
+    while remaining:
+        ready = [sid for sid, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Pipeline has a dependency cycle between {', '.join(sorted(remaining))}")
+        for sid in ready:
+            del remaining[sid]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+class PlaybookPipeline:
+    def __init__(self, username, role, name, stages, max_parallel):
+        self.id = uuid.uuid4().hex
+        self.username = username
+        self.role = role
+        self.name = name
+        self.max_parallel = max_parallel
+        self.status = 'pending'
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at = None
+        self.finished_at = None
+        self.cancelled_by = None
+        self.changed = threading.Event()
+        self.executions = {}
+        self.stages = {}
+        for stage in stages:
+            self.stages[stage['id']] = {
+                'id': stage['id'],
+                'playbook': stage['playbook'],
+                'hosts': stage.get('hosts', 'all'),
+                'extra_vars': stage.get('extra_vars'),
+                'depends_on': list(stage.get('depends_on', [])),
+                'status': 'pending',
+                'execution_id': None,
+                'reused': False,
+                'error': None,
+                'queued_at': None,
+                'started_at': None,
+                'finished_at': None,
+                'duration': None
+            }
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    def dependents(self, stage_id):
+        found = set()
+        frontier = [stage_id]
+        while frontier:
+            current = frontier.pop()
+            for stage in self.stages.values():
+                if current in stage['depends_on'] and stage['id'] not in found:
+                    found.add(stage['id'])
+                    frontier.append(stage['id'])
+        return found
+
+    def skip_dependents(self, stage_id):
+        for dependent in self.dependents(stage_id):
+            stage = self.stages[dependent]
+            if stage['status'] == 'pending':
+                stage['status'] = 'skipped'
+                stage['error'] = f'Upstream stage {stage_id} did not complete'
+
+    def critical_path_seconds(self):
+        finish = {}
+
+        def longest(stage_id):
+            if stage_id not in finish:
+                stage = self.stages[stage_id]
+                upstream = max((longest(dep) for dep in stage['depends_on']), default=0)
+                finish[stage_id] = upstream + (stage['duration'] or 0)
+            return finish[stage_id]
+
+        return round(max((longest(sid) for sid in self.stages), default=0), 3)
+
+    def refresh_started(self):
+        for stage_id, execution in list(self.executions.items()):
+            stage = self.stages[stage_id]
+            if stage['status'] == 'queued' and execution.started_at:
+                stage['status'] = 'running'
+                started = stage['queued_at'] if stage['reused'] else execution.started_at.isoformat()
+                stage['started_at'] = started
+
+    def to_dict(self):
+        self.refresh_started()
+        elapsed = None
+        if self.started_at:
+            end = self.finished_at or datetime.now(timezone.utc)
+            elapsed = round((end - self.started_at).total_seconds(), 3)
+        return {
+            'pipeline_id': self.id,
+            'name': self.name,
+            'username': self.username,
+            'status': self.status,
+            'max_parallel': self.max_parallel,
+            'cancelled_by': self.cancelled_by,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'elapsed_seconds': elapsed,
+            'critical_path_seconds': self.critical_path_seconds(),
+            'sum_of_stages_seconds': round(sum(s['duration'] or 0 for s in self.stages.values()), 3),
+            'stages': list(self.stages.values())
+        }
+
+
+def update_stage_from_execution(stage, execution):
+    stage['status'] = execution.status if execution.status in ('completed', 'cancelled') else 'failed'
+    stage['error'] = execution.error
+    if stage['reused']:
+        # The run belongs to someone else; this stage only waited for it.
+        started = datetime.fromisoformat(stage['queued_at'])
+        finished = max(started, execution.finished_at or started)
+    else:
+        started, finished = execution.started_at, execution.finished_at
+    stage['started_at'] = started.isoformat() if started else None
+    stage['finished_at'] = finished.isoformat() if finished else None
+    if started and finished:
+        stage['duration'] = round((finished - started).total_seconds(), 3)
+
+
+def run_pipeline(pipeline):
+    pipeline.status = 'running'
+    pipeline.started_at = datetime.now(timezone.utc)
+    running = {}
+
+    while True:
+        pipeline.changed.clear()
+        pipeline.refresh_started()
+
+        for stage_id, execution in list(running.items()):
+            if execution.finished:
+                stage = pipeline.stages[stage_id]
+                update_stage_from_execution(stage, execution)
+                del running[stage_id]
+                pipeline.executions.pop(stage_id, None)
+                if stage['status'] != 'completed':
+                    pipeline.skip_dependents(stage_id)
+
+        if pipeline.cancelled_by:
+            for stage in pipeline.stages.values():
+                if stage['status'] == 'pending':
+                    stage['status'] = 'cancelled'
+            for execution in running.values():
+                if execution.username == pipeline.username:
+                    execution_scheduler.cancel(execution, pipeline.cancelled_by)
+
+        for stage in pipeline.stages.values():
+            if pipeline.cancelled_by or len(running) >= pipeline.max_parallel:
+                break
+            if stage['status'] != 'pending':
+                continue
+            if any(pipeline.stages[dep]['status'] != 'completed' for dep in stage['depends_on']):
+                continue
+            stage['queued_at'] = datetime.now(timezone.utc).isoformat()
+            try:
+                execution = create_playbook_execution(
+                    pipeline.username, pipeline.role, stage['playbook'], stage['hosts'],
+                    extra_vars=stage['extra_vars']
+                )
+                execution, coalesced = launch_execution(execution)
+            except Exception as e:
+                stage['status'] = 'failed'
+                stage['error'] = str(e)
+                pipeline.skip_dependents(stage['id'])
+                continue
+            stage['status'] = 'queued'
+            stage['execution_id'] = execution.id
+            stage['reused'] = coalesced
+            running[stage['id']] = execution
+            pipeline.executions[stage['id']] = execution
+            execution.add_done_callback(lambda _: pipeline.changed.set())
+
+        if not running:
+            break
+        pipeline.changed.wait(30)
+
+    for stage in pipeline.stages.values():
+        if stage['status'] == 'pending':
+            stage['status'] = 'skipped'
+
+    statuses = {stage['status'] for stage in pipeline.stages.values()}
+    if pipeline.cancelled_by:
+        pipeline.status = 'cancelled'
+    elif statuses == {'completed'}:
+        pipeline.status = 'completed'
+    else:
+        pipeline.status = 'failed'
+    pipeline.finished_at = datetime.now(timezone.utc)
+
+
+def submit_pipeline(pipeline):
+    with pipelines_lock:
+        retained = APP_CONFIG['execution']['pipelines_retained']
+        finished = sorted((p for p in pipelines.values() if p.finished), key=lambda p: p.finished_at)
+        for old in finished[:max(0, len(finished) - retained)]:
+            del pipelines[old.id]
+        pipelines[pipeline.id] = pipeline
+    threading.Thread(target=run_pipeline, args=(pipeline,), name=f'pipeline-{pipeline.id[:8]}', daemon=True).start()
+    return pipeline
+
+
+def get_pipeline_for_user(pipeline_id, user):
+    pipeline = pipelines.get(pipeline_id)
+    if not pipeline:
+        return None
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    if role != 'admin' and pipeline.username != user.username:
+        return None
+    return pipeline
+
+# =============================================================================
+# PLAYBOOK SCHEDULER
+# =============================================================================
+
+CRON_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def parse_cron_field(field, low, high):
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step = part.split('/', 1)
+            step = int(step)
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(v) for v in part.split('-', 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f'Cron field {field} out of range {low}-{high}')
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def next_cron_time(expr, after):
+    fields = expr.split()
+    if len(fields) != 5:
+        raise ValueError('Cron expression needs 5 fields: minute hour day month weekday')
+    try:
+        minutes, hours, days, months, weekdays = (
+            parse_cron_field(field, low, high)
+            for field, (low, high) in zip(fields, CRON_FIELD_RANGES)
+        )
+    except ValueError as e:
+        raise ValueError(f'Invalid cron expression {expr}: {str(e)}')
+    if 7 in weekdays:
+        weekdays.add(0)
+    # As in Vixie cron, a field starting with "*" (including "*/N") does not
+    # count as restricted for the day-of-month OR day-of-week rule.
+    dom_restricted = not fields[2].startswith('*')
+    dow_restricted = not fields[4].startswith('*')
+
+    t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = t + timedelta(days=366 * 4)
+    while t < limit:
+        if t.month not in months:
+            t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            continue
+        dom_match = t.day in days
+        dow_match = (t.weekday() + 1) % 7 in weekdays
+        if dom_restricted and dow_restricted:
+            day_match = dom_match or dow_match
+        else:
+            day_match = dom_match and dow_match
+        if not day_match:
+            t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            continue
+        if t.hour not in hours:
+            t = t.replace(minute=0) + timedelta(hours=1)
+            continue
+        if t.minute not in minutes:
+            t += timedelta(minutes=1)
+            continue
+        return t
+    raise ValueError(f'Cron expression {expr} never fires')
+
+
+def schedule_now():
+    # Cron fields are matched against this clock, so schedules fire in UTC.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def plan_next_run(schedule, after):
+    slot = next_cron_time(schedule.cron, after)
+    jitter = random.uniform(0, schedule.jitter_seconds or 0)
+    return slot, slot + timedelta(seconds=jitter)
+
+
+def record_schedule_run_finished(run_id, execution, coalesced=False):
+    with app.app_context():
+        try:
+            run = db.session.get(ScheduleRun, run_id)
+            if not run:
+                return
+            run.status = execution.status
+            run.error = execution.error[:512] if execution.error else None
+            if execution.started_at:
+                run.started_at = execution.started_at.replace(tzinfo=None)
+                # A run joined through coalescing started before this slot
+                # was due, so its start says nothing about our lateness.
+                if not coalesced:
+                    run.lateness_seconds = round((run.started_at - run.slot_at).total_seconds(), 3)
+            if execution.finished_at:
+                run.finished_at = execution.finished_at.replace(tzinfo=None)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error recording schedule run {run_id}: {str(e)}")
+
+
+def dispatch_schedule(schedule, now):
+    expected_run_at = schedule.next_run_at
+    # Lock the schedule row so the slot claim, the overlap check and the
+    # run row are one transaction for every dispatcher process.
+    schedule = (
+        PlaybookSchedule.query.filter_by(id=schedule.id)
+        .with_for_update().populate_existing().first()
+    )
+    if schedule is None or schedule.next_run_at != expected_run_at:
+        db.session.commit()
+        return
+
+    slot_at = schedule.next_slot_at or schedule.next_run_at
+    schedule.next_slot_at, schedule.next_run_at = plan_next_run(schedule, now)
+    schedule.last_run_at = now
+
+    run = ScheduleRun(schedule_id=schedule.id, slot_at=slot_at, dispatched_at=now)
+    # A dispatcher that died mid-run never records the finish, so an old
+    # 'dispatched' row stops counting after twice the execution timeout.
+    in_flight = ScheduleRun.query.filter(
+        ScheduleRun.schedule_id == schedule.id,
+        ScheduleRun.status == 'dispatched',
+        ScheduleRun.dispatched_at >= now - timedelta(seconds=APP_CONFIG['execution']['timeout'] * 2)
+    ).order_by(ScheduleRun.dispatched_at.desc()).first()
+    if in_flight:
+        run.status = 'skipped'
+        run.error = f'Previous run {in_flight.execution_id or in_flight.id} still running'
+        schedule.skipped_runs = (schedule.skipped_runs or 0) + 1
+        db.session.add(run)
+        db.session.commit()
+        return
+
+    run.status = 'dispatched'
+    db.session.add(run)
+    db.session.commit()
+
+    owner = User.query.filter_by(username=schedule.username).first()
+    role = db.session.get(Role, owner.role_id).name if owner and owner.role_id else 'user'
+    execution = None
+    coalesced = False
+    try:
+        execution = create_playbook_execution(
+            schedule.username, role, schedule.playbook, schedule.hosts,
+            extra_vars=json.loads(schedule.extra_vars) if schedule.extra_vars else None
+        )
+        execution, coalesced = launch_execution(execution)
+        run.execution_id = execution.id
+        schedule.last_execution_id = execution.id
+    except Exception as e:
+        execution = None
+        run.status = 'error'
+        run.error = str(e)[:512]
+    db.session.commit()
+    if execution:
+        run_id = run.id
+        execution.add_done_callback(lambda e: record_schedule_run_finished(run_id, e, coalesced))
+
+
+def dispatch_due_schedules():
+    now = schedule_now()
+    due = PlaybookSchedule.query.filter(
+        PlaybookSchedule.enabled.is_(True),
+        PlaybookSchedule.next_run_at <= now
+    ).all()
+    for schedule in due:
+        try:
+            dispatch_schedule(schedule, now)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error dispatching schedule {schedule.id}: {str(e)}")
+
+
+def start_schedule_dispatcher():
+    def loop():
+        while True:
+            with app.app_context():
+                try:
+                    dispatch_due_schedules()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Schedule dispatcher error: {str(e)}")
+            time.sleep(APP_CONFIG['execution']['schedule_poll_interval'])
+
+    threading.Thread(target=loop, name='schedule-dispatcher', daemon=True).start()
+
+# =============================================================================
+# SLURM JOB MANAGEMENT
+# =============================================================================
+
+JOB_SCRIPT_EXTENSIONS = ('.yml', '.yaml', '.sh', '.slurm')
+
+
+def read_job_description(path):
+    try:
+        with open(path, 'r', errors='replace') as f:
+            for _ in range(2):
+                line = f.readline()
+                if line.startswith('# Description: '):
+                    return line[len('# Description: '):].strip()
+                if not line.startswith('#!'):
+                    break
+    except OSError:
+        pass
+    return ''
+
+
+class JobCatalog:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.by_filename = {}
+        self.dir_mtimes = {}
+        self.last_scan = None
+        self.last_full_scan = 0
+
+    def job_dirs(self):
+        config = APP_CONFIG['jobs']
+        dirs = {}
+        try:
+            with os.scandir(config['home_root']) as homes:
+                for home in homes:
+                    if home.is_dir():
+                        dirs[home.name] = os.path.join(home.path, 'slurm_jobs')
+        except OSError:
+            pass
+        dirs.update(config['extra_dirs'])
+        return dirs
+
+    def make_entry(self, owner, path, st):
+        filename = os.path.basename(path)
+        return {
+            'filename': filename,
+            'name': os.path.splitext(filename)[0],
+            'path': path,
+            'owner': owner,
+            'size': st.st_size,
+            'mtime': st.st_mtime,
+            'description': read_job_description(path)
+        }
+
+    def scan_dir(self, owner, jobs_dir, previous):
+        entries = {}
+        with os.scandir(jobs_dir) as it:
+            for item in it:
+                if not item.name.endswith(JOB_SCRIPT_EXTENSIONS) or not item.is_file():
+                    continue
+                st = item.stat()
+                old = previous.get(item.name)
+                if old and old['mtime'] == st.st_mtime and old['size'] == st.st_size:
+                    entries[item.name] = old
+                else:
+                    entries[item.name] = self.make_entry(owner, item.path, st)
+        return entries
+
+    def rescan(self, full=False):
+        scanned = {}
+        mtimes = {}
+        for owner, jobs_dir in self.job_dirs().items():
+            try:
+                dir_mtime = os.stat(jobs_dir).st_mtime_ns
+            except OSError:
+                continue
+            mtimes[jobs_dir] = dir_mtime
+            with self.lock:
+                previous = self.entries.get(owner, {})
+                unchanged = self.dir_mtimes.get(jobs_dir) == dir_mtime
+            # Adding or removing a script bumps the directory mtime; in-place
+            # edits do not, which is what the periodic full pass is for.
+            if unchanged and not full:
+                scanned[owner] = previous
+                continue
+            try:
+                scanned[owner] = self.scan_dir(owner, jobs_dir, previous)
+            except OSError:
+                continue
+
+        by_filename = {}
+        for owner in sorted(scanned):
+            for filename in scanned[owner]:
+                by_filename.setdefault(filename, []).append(owner)
+        with self.lock:
+            self.entries = scanned
+            self.by_filename = by_filename
+            self.dir_mtimes = mtimes
+            self.last_scan = time.time()
+            if full:
+                self.last_full_scan = self.last_scan
+
+    def ensure_loaded(self):
+        if self.last_scan is None:
+            self.rescan(full=True)
+
+    def list(self, owner):
+        self.ensure_loaded()
+        with self.lock:
+            return sorted(self.entries.get(owner, {}).values(), key=lambda e: e['name'])
+
+    def find(self, filename, owner=None):
+        self.ensure_loaded()
+        with self.lock:
+            owners = [owner] if owner else self.by_filename.get(filename, [])
+            for candidate in owners:
+                entry = self.entries.get(candidate, {}).get(filename)
+                if entry:
+                    return entry
+        return self.find_on_disk(filename, owner)
+
+    def find_on_disk(self, filename, owner=None):
+        # A script written outside the app is not in the catalog until the
+        # next rescan; a miss checks the expected path directly.
+        if os.path.basename(filename) != filename or not filename.endswith(JOB_SCRIPT_EXTENSIONS):
+            return None
+        dirs = self.job_dirs()
+        for candidate in ([owner] if owner else sorted(dirs)):
+            jobs_dir = dirs.get(candidate)
+            if jobs_dir and os.path.isfile(os.path.join(jobs_dir, filename)):
+                # Leave the directory mtime alone so the next rescan still
+                # picks up anything else added alongside it.
+                self.refresh_path(candidate, os.path.join(jobs_dir, filename), update_dir_mtime=False)
+                with self.lock:
+                    entry = self.entries.get(candidate, {}).get(filename)
+                if entry:
+                    return entry
+        return None
+
+    def refresh_path(self, owner, path, update_dir_mtime=True):
+        filename = os.path.basename(path)
+        try:
+            st = os.stat(path)
+            entry = self.make_entry(owner, path, st)
+        except OSError:
+            entry = None
+        with self.lock:
+            owner_entries = self.entries.setdefault(owner, {})
+            owners = self.by_filename.setdefault(filename, [])
+            if entry:
+                owner_entries[filename] = entry
+                if owner not in owners:
+                    owners.append(owner)
+                    owners.sort()
+            else:
+                owner_entries.pop(filename, None)
+                if owner in owners:
+                    owners.remove(owner)
+            if not update_dir_mtime:
+                return
+            try:
+                self.dir_mtimes[os.path.dirname(path)] = os.stat(os.path.dirname(path)).st_mtime_ns
+            except OSError:
+                pass
+
+
+job_catalog = JobCatalog()
+
+
+def start_job_catalog_scanner():
+    def loop():
+        while True:
+            try:
+                full = time.time() - job_catalog.last_full_scan >= APP_CONFIG['jobs']['full_rescan_interval']
+                job_catalog.rescan(full=full)
+            except Exception as e:
+                print(f"Error scanning job scripts: {str(e)}")
+            time.sleep(APP_CONFIG['jobs']['rescan_interval'])
+
+    threading.Thread(target=loop, name='job-catalog-scanner', daemon=True).start()
+
+
+def find_job_for_user(user, role, filename):
+    if role == 'admin':
+        return job_catalog.find(filename)
+    return job_catalog.find(filename, owner=user.username)
+
+
+def get_jobs():
+    jobs = []
+    unique_filenames = set()
+    user = get_current_user()
+    if not user:
+        return jobs
+
+    owners = [user.username]
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    if role == 'admin':
+        owners.extend(APP_CONFIG['jobs']['extra_dirs'])
+
+    for owner in owners:
+        for entry in job_catalog.list(owner):
+            if entry['filename'] in unique_filenames:
+                continue
+            unique_filenames.add(entry['filename'])
+            jobs.append(dict(entry))
+
+    jobs.sort(key=lambda x: x['name'])
+    return jobs
+
+@app.route('/api/update-job', methods=['POST'])
+def update_job():
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'success': False, 'error': 'Not logged in'})
+        role = db.session.get(Role, user.role_id).name if user.role_id else 'user' 
+        
+        data = request.get_json()
+        original_filename = data.get('original_filename')
+        name = data.get('name', '').strip()
+        description = data.get('description', '').strip()
+        content = data.get('content', '').strip()
+
+        if not original_filename or not name or not content:
+            return jsonify({'success': False, 'error': 'Original filename, name and content are required'})
+
+        filename = name
+        if not filename.endswith(('.sh', '.slurm')):
+            filename += '.sh'
+
+        entry = find_job_for_user(user, role, original_filename)
+        original_path = entry['path'] if entry and os.path.exists(entry['path']) else None
+        job_owner = entry['owner'] if entry else user.username
+
+        if not original_path:
+            return jsonify({'success': False, 'error': f'Original job {original_filename} not found'})
 
         jobs_dir = os.path.dirname(original_path)
         new_path = os.path.join(jobs_dir, filename)
@@ -727,6 +3683,8 @@ def update_job():
 
         if filename != original_filename:
             os.remove(original_path)
+            job_catalog.refresh_path(job_owner, original_path)
+        job_catalog.refresh_path(job_owner, new_path)
 
         return jsonify({
             'success': True,
@@ -738,6 +3696,613 @@ def update_job():
     except Exception as e:
         return jsonify({'success': False, 'error': f'Failed to update job: {str(e)}'})
 
+# =============================================================================
+# SLURM STATE POLLER
+# =============================================================================
+
+SQUEUE_FIELDS = [
+    'job_id', 'partition', 'name', 'user', 'state', 'time_used', 'time_limit',
+    'nodes', 'cpus', 'nodelist_reason', 'submit_time', 'start_time'
+]
+SQUEUE_FORMAT = '%i|%P|%j|%u|%T|%M|%l|%D|%C|%R|%V|%S'
+SQUEUE_COLUMNS = [
+    ('JOBID', 'job_id'), ('PARTITION', 'partition'), ('NAME', 'name'), ('USER', 'user'),
+    ('STATE', 'state'), ('TIME', 'time_used'), ('NODES', 'nodes'), ('NODELIST(REASON)', 'nodelist')
+]
+SACCT_FIELDS = [
+    'JobID', 'JobName', 'Partition', 'User', 'NodeList', 'State',
+    'Submit', 'Start', 'End', 'Elapsed', 'ExitCode', 'AllocCPUS', 'NNodes'
+]
+SACCT_COLUMNS = [
+    ('JobID', 'job_id'), ('JobName', 'name'), ('Partition', 'partition'), ('User', 'user'),
+    ('NodeList', 'nodelist'), ('State', 'state'), ('Start', 'start_time'), ('End', 'end_time'),
+    ('Elapsed', 'elapsed'), ('ExitCode', 'exit_code')
+]
+QUEUE_RECORD_FIELDS = [
+    'job_id', 'partition', 'name', 'user', 'state', 'time_used', 'time_limit',
+    'nodes', 'cpus', 'nodelist', 'reason', 'submit_time', 'start_time'
+]
+ACCOUNTING_RECORD_FIELDS = [
+    'job_id', 'parent_job_id', 'step', 'name', 'partition', 'user', 'nodelist', 'state',
+    'cancelled_by', 'submit_time', 'start_time', 'end_time', 'elapsed', 'exit_code',
+    'signal', 'cpus', 'nodes'
+]
+TERMINAL_JOB_STATES = {
+    'COMPLETED', 'FAILED', 'CANCELLED', 'TIMEOUT', 'PREEMPTED', 'NODE_FAIL',
+    'OUT_OF_MEMORY', 'BOOT_FAIL', 'DEADLINE', 'SPECIAL_EXIT'
+}
+
+
+def split_slurm_records(output, fields):
+    records = []
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        # A "|" inside a job name adds a column; skip the line rather than
+        # shift every later field into the wrong key.
+        values = line.split('|')
+        if len(values) == len(fields):
+            records.append(dict(zip(fields, values)))
+    return records
+
+
+def job_id_sort_key(job_id):
+    # Numeric order: "9" < "10", "123_2" < "123_10", and a job before its steps.
+    base, _, step = str(job_id).partition('.')
+    parent, _, task = base.partition('_')
+    task_number = re.match(r'\[?(\d+)', task)
+    return (
+        int(parent) if parent.isdigit() else -1,
+        int(task_number.group(1)) if task_number else -1,
+        (0, 0, '') if not step else (1, int(step), '') if step.isdigit() else (2, 0, step)
+    )
+
+
+def parse_slurm_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_slurm_duration(value):
+    if not value or value in ('UNLIMITED', 'INVALID', 'NOT_SET', 'Partition_Limit'):
+        return None
+    try:
+        days = 0
+        if '-' in value:
+            day_part, value = value.split('-', 1)
+            days = int(day_part)
+        parts = [int(float(p)) for p in value.split(':')]
+    except ValueError:
+        return None
+    while len(parts) < 3:
+        parts.insert(0, 0)
+    hours, minutes, seconds = parts[-3:]
+    return days * 86400 + hours * 3600 + minutes * 60 + seconds
+
+
+def parse_slurm_time(value):
+    if not value or value in ('Unknown', 'None', 'N/A'):
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S').astimezone(timezone.utc).isoformat()
+    except ValueError:
+        return None
+
+
+def epoch_to_iso(value):
+    return datetime.fromtimestamp(value, timezone.utc).isoformat() if value else None
+
+
+def format_slurm_duration(seconds):
+    if seconds is None:
+        return ''
+    days, rest = divmod(int(seconds), 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, secs = divmod(rest, 60)
+    text = f'{hours}:{minutes:02d}:{secs:02d}' if hours else f'{minutes}:{secs:02d}'
+    return f'{days}-{hours:02d}:{minutes:02d}:{secs:02d}' if days else text
+
+
+def typed_queue_record(raw):
+    nodelist_reason = raw['nodelist_reason']
+    reason = None
+    if nodelist_reason.startswith('(') and nodelist_reason.endswith(')'):
+        reason = nodelist_reason[1:-1]
+    return {
+        'job_id': raw['job_id'],
+        'partition': raw['partition'],
+        'name': raw['name'],
+        'user': raw['user'],
+        'state': raw['state'],
+        'time_used': parse_slurm_duration(raw['time_used']),
+        'time_limit': parse_slurm_duration(raw['time_limit']),
+        'nodes': parse_slurm_int(raw['nodes']),
+        'cpus': parse_slurm_int(raw['cpus']),
+        'nodelist': None if reason is not None else (nodelist_reason or None),
+        'reason': reason,
+        'submit_time': parse_slurm_time(raw['submit_time']),
+        'start_time': parse_slurm_time(raw['start_time'])
+    }
+
+
+def slurm_json_value(value):
+    # Newer data_parser versions wrap numbers as {set, infinite, number} and
+    # report job_state as a list of flags.
+    if isinstance(value, dict) and 'number' in value:
+        if value.get('infinite') or not value.get('set', True):
+            return None
+        return value['number']
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def typed_queue_record_from_json(job, now):
+    def get(key):
+        return slurm_json_value(job.get(key))
+
+    job_id = str(get('job_id'))
+    array_job_id = get('array_job_id')
+    array_task_id = get('array_task_id')
+    if array_job_id and array_task_id is not None:
+        job_id = f'{array_job_id}_{array_task_id}'
+    elif array_job_id and job.get('array_task_string'):
+        job_id = f"{array_job_id}_[{job['array_task_string']}]"
+
+    state = get('job_state')
+    start_time = get('start_time')
+    time_limit = get('time_limit')
+    reason = job.get('state_reason')
+    return {
+        'job_id': job_id,
+        'partition': job.get('partition'),
+        'name': job.get('name'),
+        'user': job.get('user_name'),
+        'state': state,
+        'time_used': int(now - start_time) if state == 'RUNNING' and start_time else 0,
+        'time_limit': time_limit * 60 if time_limit is not None else None,
+        'nodes': get('node_count'),
+        'cpus': get('cpus'),
+        'nodelist': job.get('nodes') or None,
+        'reason': reason if reason and reason != 'None' else None,
+        'submit_time': epoch_to_iso(get('submit_time')),
+        'start_time': epoch_to_iso(start_time) if state != 'PENDING' else None
+    }
+
+
+def typed_accounting_record(raw):
+    parent, _, step = raw['JobID'].partition('.')
+    state_parts = raw['State'].split(' ')
+    exit_code, _, signal_number = raw['ExitCode'].partition(':')
+    return {
+        'job_id': raw['JobID'],
+        'parent_job_id': parent,
+        'step': step or None,
+        'name': raw['JobName'],
+        'partition': raw['Partition'] or None,
+        'user': raw['User'] or None,
+        'nodelist': raw['NodeList'] if raw['NodeList'] not in ('', 'None assigned') else None,
+        'state': state_parts[0],
+        'cancelled_by': state_parts[2] if len(state_parts) > 2 and state_parts[1] == 'by' else None,
+        'submit_time': parse_slurm_time(raw['Submit']),
+        'start_time': parse_slurm_time(raw['Start']),
+        'end_time': parse_slurm_time(raw['End']),
+        'elapsed': parse_slurm_duration(raw['Elapsed']),
+        'exit_code': parse_slurm_int(exit_code),
+        'signal': parse_slurm_int(signal_number),
+        'cpus': parse_slurm_int(raw['AllocCPUS']),
+        'nodes': parse_slurm_int(raw['NNodes'])
+    }
+
+
+def query_slurm_records(records, args, fields):
+    for field in fields:
+        if field in args:
+            allowed = set(args[field].split(','))
+            records = [r for r in records if str(r.get(field)) in allowed]
+    if args.get('q'):
+        needle = args['q'].lower()
+        records = [r for r in records if needle in (r.get('name') or '').lower()]
+
+    sort_keys = [key.strip() for key in args.get('sort', '').split(',') if key.strip()]
+    for key in reversed(sort_keys):
+        descending = key.startswith('-')
+        key = key.lstrip('-')
+        if key not in fields:
+            raise ValueError(f'Unknown sort field {key}')
+        present = [r for r in records if r.get(key) is not None]
+        missing = [r for r in records if r.get(key) is None]
+        sort_key = job_id_sort_key if key in ('job_id', 'parent_job_id') else None
+        records = sorted(
+            present, key=lambda r: sort_key(r[key]) if sort_key else r[key], reverse=descending
+        ) + missing
+
+    total = len(records)
+    limit = args.get('limit', type=int)
+    if limit is not None:
+        records = records[:max(limit, 0)]
+    return records, total
+
+
+def project_slurm_records(records, args, fields):
+    projection = [f.strip() for f in args.get('fields', '').split(',') if f.strip()]
+    unknown = [f for f in projection if f not in fields]
+    if unknown:
+        raise ValueError(f'Unknown field {unknown[0]}')
+    if not projection:
+        return records
+    return [{f: r.get(f) for f in projection} for r in records]
+
+
+def parent_job_id(job_id):
+    return job_id.split('.', 1)[0]
+
+
+class SlurmStateTable:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.queue = []
+        self.accounting = {}
+        self.records_by_job = {}
+        self.lookups = {}
+        self.queue_at = None
+        self.accounting_at = None
+        self.last_accounting_start = None
+        self.error = None
+        self.version = 0
+        self.job_states = {}
+        self.tracking = False
+        self.events = collections.deque(maxlen=APP_CONFIG['slurm']['event_backlog'])
+        self.event_seq = 0
+        self.squeue_json = None if APP_CONFIG['slurm']['squeue_json'] else False
+
+    def fetch_queue(self, timeout):
+        # Prefer squeue --json where this Slurm build supports it; fall back
+        # to the delimited format for good on the first unusable answer.
+        if self.squeue_json is not False:
+            result = run_in_process_group(['squeue', '--json'], timeout)
+            try:
+                if result.returncode != 0:
+                    raise ValueError(result.stderr.strip())
+                jobs = json.loads(result.stdout)['jobs']
+                now = time.time()
+                records = [typed_queue_record_from_json(job, now) for job in jobs]
+                self.squeue_json = True
+                return records, None
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                print(f"squeue --json unavailable, using delimited output: {str(e)}")
+                self.squeue_json = False
+
+        result = run_in_process_group(['squeue', '-h', '-o', SQUEUE_FORMAT], timeout)
+        if result.returncode != 0:
+            return None, f'squeue: {result.stderr.strip()}'
+        return [typed_queue_record(r) for r in split_slurm_records(result.stdout, SQUEUE_FIELDS)], None
+
+    def poll(self):
+        config = APP_CONFIG['slurm']
+        errors = []
+        polled_at = time.time()
+
+        try:
+            queue, error = self.fetch_queue(config['command_timeout'])
+            if error:
+                errors.append(error)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            queue = None
+            errors.append(f'squeue: {str(e)}')
+
+        # After the first full window, only ask sacct for jobs active since the
+        # previous poll (with some overlap) and merge them into the table.
+        if self.last_accounting_start is None:
+            since = int(polled_at - config['accounting_window'])
+        else:
+            since = int(self.last_accounting_start - config['poll_interval'] * 2)
+        since_arg = datetime.fromtimestamp(since).strftime('%Y-%m-%dT%H:%M:%S')
+        try:
+            result = run_in_process_group([
+                'sacct', '-a', '-n', '-P', '-S', since_arg,
+                f"--format={','.join(SACCT_FIELDS)}"
+            ], config['command_timeout'])
+            accounting = None
+            if result.returncode == 0:
+                accounting = [typed_accounting_record(r) for r in split_slurm_records(result.stdout, SACCT_FIELDS)]
+            else:
+                errors.append(f'sacct: {result.stderr.strip()}')
+        except (OSError, subprocess.TimeoutExpired) as e:
+            accounting = None
+            errors.append(f'sacct: {str(e)}')
+
+        with self.changed:
+            if queue is not None:
+                self.queue = queue
+                self.queue_at = polled_at
+            if accounting is not None:
+                for record in accounting:
+                    record['_seen'] = polled_at
+                    self.accounting[record['job_id']] = record
+                cutoff = polled_at - config['retention']
+                self.accounting = {
+                    job_id: record for job_id, record in self.accounting.items()
+                    if record['_seen'] >= cutoff
+                }
+                self.records_by_job = self.index_by_job(self.accounting)
+                self.accounting_at = polled_at
+                self.last_accounting_start = polled_at
+            if queue is not None and accounting is not None:
+                self.track_transitions(polled_at)
+            self.error = '; '.join(errors) or None
+            self.version += 1
+            self.changed.notify_all()
+
+    def current_job_states(self):
+        states = {}
+        for job_id, record in self.accounting.items():
+            if record['step'] is None:
+                states[job_id] = {'state': record['state'], 'user': record['user'], 'name': record['name']}
+        # squeue is authoritative for jobs still in the queue.
+        for record in self.queue:
+            states[record['job_id']] = {'state': record['state'], 'user': record['user'], 'name': record['name']}
+        return states
+
+    def track_transitions(self, polled_at):
+        current = self.current_job_states()
+        if self.tracking:
+            at = datetime.fromtimestamp(polled_at, timezone.utc).isoformat()
+            for job_id, info in current.items():
+                previous = self.job_states.get(job_id)
+                if previous and previous['state'] == info['state']:
+                    continue
+                self.event_seq += 1
+                self.events.append({
+                    'seq': self.event_seq,
+                    'job_id': job_id,
+                    'user': info['user'],
+                    'name': info['name'],
+                    'from': previous['state'] if previous else None,
+                    'to': info['state'],
+                    'terminal': info['state'] in TERMINAL_JOB_STATES,
+                    'at': at
+                })
+        self.job_states = current
+        self.tracking = True
+
+    def events_since(self, seq, username=None):
+        with self.lock:
+            events = [
+                e for e in self.events
+                if e['seq'] > seq and (username is None or e['user'] == username)
+            ]
+            return events, self.event_seq, self.version
+
+    def job_state(self, job_id):
+        with self.lock:
+            info = self.job_states.get(job_id)
+            return info['state'] if info else None
+
+    def job_owner(self, job_id):
+        with self.lock:
+            info = self.job_states.get(job_id)
+            return info['user'] if info else None
+
+    def active_jobs(self, username=None):
+        with self.lock:
+            return [
+                dict(info, job_id=job_id) for job_id, info in self.job_states.items()
+                if info['state'] not in TERMINAL_JOB_STATES and (username is None or info['user'] == username)
+            ]
+
+    @staticmethod
+    def index_by_job(accounting):
+        # "14_3.batch" is listed under both the array task "14_3" and the
+        # array job "14", so either id finds it without a scan.
+        by_job = {}
+        for record_id in accounting:
+            job_id = parent_job_id(record_id)
+            by_job.setdefault(job_id, []).append(record_id)
+            if '_' in job_id:
+                by_job.setdefault(job_id.split('_', 1)[0], []).append(record_id)
+        return by_job
+
+    def wait_for_update(self, version, timeout):
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def queue_for(self, username=None):
+        with self.lock:
+            return [r for r in self.queue if username is None or r['user'] == username]
+
+    def job_records(self, job_id):
+        with self.lock:
+            return [self.accounting[record_id] for record_id in self.records_by_job.get(job_id, [])]
+
+    def lookup_job(self, job_id):
+        # Jobs older than the accounting window are not in the table. Ask
+        # sacct for just this one, and keep the answer for a poll interval
+        # so repeated requests for the same id do not each run sacct.
+        config = APP_CONFIG['slurm']
+        now = time.time()
+        with self.lock:
+            cached = self.lookups.get(job_id)
+            if cached and now - cached[1] < config['poll_interval']:
+                return cached[0], None
+        result = run_in_process_group([
+            'sacct', '-a', '-n', '-P', '-j', job_id,
+            f"--format={','.join(SACCT_FIELDS)}"
+        ], config['command_timeout'])
+        if result.returncode != 0:
+            return [], f'sacct: {result.stderr.strip()}'
+        records = [typed_accounting_record(r) for r in split_slurm_records(result.stdout, SACCT_FIELDS)]
+        with self.lock:
+            self.lookups = {
+                key: value for key, value in self.lookups.items()
+                if now - value[1] < config['poll_interval']
+            }
+            self.lookups[job_id] = (records, now)
+        return records, None
+
+    def snapshot_info(self):
+        with self.lock:
+            return {
+                'queue_at': datetime.fromtimestamp(self.queue_at, timezone.utc).isoformat() if self.queue_at else None,
+                'accounting_at': datetime.fromtimestamp(self.accounting_at, timezone.utc).isoformat() if self.accounting_at else None,
+                'jobs_tracked': len(self.accounting),
+                'error': self.error
+            }
+
+
+slurm_state = SlurmStateTable()
+
+
+def start_slurm_poller():
+    def loop():
+        while True:
+            try:
+                slurm_state.poll()
+            except Exception as e:
+                print(f"Error polling Slurm state: {str(e)}")
+            time.sleep(APP_CONFIG['slurm']['poll_interval'])
+
+    threading.Thread(target=loop, name='slurm-poller', daemon=True).start()
+
+
+def session_still_active(token):
+    with app.app_context():
+        return find_active_session(token) is not None
+
+
+def stream_job_events(username, last_seq, session_token):
+    if last_seq is None:
+        with slurm_state.lock:
+            last_seq = slurm_state.event_seq
+        yield f"event: snapshot\ndata: {json.dumps(slurm_state.active_jobs(username))}\n\n"
+    checked_at = time.monotonic()
+    while True:
+        # A stream can outlive its login; end it once the session is gone.
+        if time.monotonic() - checked_at >= APP_CONFIG['slurm']['session_check_interval']:
+            if not session_still_active(session_token):
+                yield "event: end\ndata: {\"reason\": \"session ended\"}\n\n"
+                return
+            checked_at = time.monotonic()
+        events, latest_seq, version = slurm_state.events_since(last_seq, username)
+        for event in events:
+            yield f"id: {event['seq']}\nevent: job\ndata: {json.dumps(event)}\n\n"
+        last_seq = latest_seq
+        if slurm_state.wait_for_update(version, timeout=15) == version:
+            yield ": keepalive\n\n"
+
+
+SLURM_JOB_ID_RE = re.compile(r'^\d+(_\d+)?$')
+
+
+def job_log_path(username, job_id):
+    return f'/home/{username}/slurm-output-{job_id}.log'
+
+
+def job_log_size(path):
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return None
+
+
+def read_job_log(path, offset, limit):
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(limit)
+
+
+def job_log_finished(job_id):
+    return slurm_state.job_state(job_id) in TERMINAL_JOB_STATES
+
+
+def wait_for_job_log(path, job_id, offset, timeout):
+    deadline = time.monotonic() + timeout
+    interval = APP_CONFIG['slurm']['log_poll_interval']
+    while True:
+        size = job_log_size(path)
+        if size is not None and size > offset:
+            return size
+        if job_log_finished(job_id) or time.monotonic() >= deadline:
+            return size
+        time.sleep(min(interval, max(0, deadline - time.monotonic())))
+
+
+def stream_job_log(path, job_id, offset):
+    chunk_size = APP_CONFIG['slurm']['log_chunk_size']
+    # A job the poller does not know about is either too new to have been
+    # seen yet or too old to still be tracked; give it a grace period.
+    unknown_deadline = time.monotonic() + APP_CONFIG['slurm']['log_unknown_grace']
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    while True:
+        size = wait_for_job_log(path, job_id, offset, timeout=15)
+        if slurm_state.job_state(job_id) is not None:
+            unknown_deadline = None
+        if size is None or size <= offset:
+            if job_log_finished(job_id) or (unknown_deadline and time.monotonic() > unknown_deadline):
+                tail = decoder.decode(b'', final=True)
+                if tail:
+                    yield sse_text_frame(tail, offset)
+                yield f"event: end\ndata: {json.dumps({'offset': offset, 'state': slurm_state.job_state(job_id)})}\n\n"
+                return
+            yield ": keepalive\n\n"
+            continue
+
+        chunk = read_job_log(path, offset, min(chunk_size, size - offset))
+        if not job_log_finished(job_id) or offset + len(chunk) < size:
+            newline = chunk.rfind(b'\n')
+            if newline >= 0:
+                chunk = chunk[:newline + 1]
+        offset += len(chunk)
+
+        text = decoder.decode(chunk)
+        if text:
+            yield sse_text_frame(text, decoded_offset(decoder, offset))
+
+
+def resolve_job_log(user, role, job_id):
+    if not SLURM_JOB_ID_RE.match(job_id):
+        return None, 'Invalid job id'
+    owner = user.username
+    if role == 'admin':
+        owner = request.args.get('user') or slurm_state.job_owner(job_id) or user.username
+        if not re.match(r'^[a-z_][a-z0-9_.-]*$', owner):
+            return None, 'Invalid user'
+    return job_log_path(owner, job_id), None
+
+
+def format_slurm_table(columns, records, formatters=None):
+    formatters = formatters or {}
+    rows = [[header for header, _ in columns]]
+    for record in records:
+        rows.append([
+            formatters[key](record.get(key)) if key in formatters
+            else '' if record.get(key) is None else str(record.get(key))
+            for _, key in columns
+        ])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return '\n'.join(
+        ' '.join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+        for row in rows
+    ) + '\n'
+
+
+def format_squeue_table(records):
+    return format_slurm_table(SQUEUE_COLUMNS, [
+        dict(r, nodelist=r['nodelist'] or f"({r['reason'] or 'None'})") for r in records
+    ], {'time_used': format_slurm_duration})
+
+
+def format_sacct_table(records):
+    return format_slurm_table(SACCT_COLUMNS, [
+        dict(r, exit_code=f"{r['exit_code']}:{r['signal'] or 0}" if r['exit_code'] is not None else None)
+        for r in sorted(records, key=lambda r: job_id_sort_key(r['job_id']))
+    ], {'elapsed': format_slurm_duration})
+
+
 # =============================================================================
 # WEB ROUTES - MAIN PAGES
 # =============================================================================
@@ -795,10 +4360,56 @@ def index():
 # API ROUTES - INVENTORY
 # =============================================================================
 
+HOST_LISTING_ARGS = ('page', 'per_page', 'q', 'prefix', 'group', 'kind', 'name', 'compact')
+
+
 @app.route('/api/hosts')
 def get_hosts():
-    hosts = parse_inventory_file()
-    return jsonify(hosts)
+    if not any(arg in request.args for arg in HOST_LISTING_ARGS):
+        body, key = get_inventory_hosts_json()
+        etag = hashlib.sha1(repr(key).encode()).hexdigest()
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers={'ETag': f'"{etag}"'})
+        return Response(body, mimetype='application/json', headers={'ETag': f'"{etag}"'})
+
+    index, key = get_inventory_index()
+    etag = hashlib.sha1(
+        repr(key).encode() + request.query_string + str(health_probe_status['last_finished']).encode()
+    ).hexdigest()
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers={'ETag': f'"{etag}"'})
+
+    kind = request.args.get('kind', 'all')
+    if kind not in ('all', 'host', 'group'):
+        return jsonify({'success': False, 'error': 'kind must be all, host or group'})
+    groups = [g.strip() for g in request.args.get('group', '').split(',') if g.strip()]
+    entries = filter_inventory_entries(
+        index,
+        kind=kind,
+        q=request.args.get('q'),
+        prefix=request.args.get('prefix'),
+        groups=groups,
+        name=request.args.get('name'),
+        compact=request.args.get('compact', '').lower() in ('1', 'true', 'yes')
+    )
+
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 100, type=int), 1), APP_CONFIG['inventory']['max_page_size'])
+    start = (page - 1) * per_page
+    body = json.dumps({
+        'success': True,
+        'page': page,
+        'per_page': per_page,
+        'total': len(entries),
+        'pages': (len(entries) + per_page - 1) // per_page,
+        'counts': {'hosts': len(index['hosts']), 'groups': len(index['groups'])},
+        'hosts': [
+            dict(entry, health=get_host_health(entry['name'])['status'])
+            if not entry['name'].startswith('group:') and entry['name'] != 'all' else entry
+            for entry in entries[start:start + per_page]
+        ]
+    })
+    return Response(body, mimetype='application/json', headers={'ETag': f'"{etag}"'})
 
 
 @app.route('/api/create-host', methods=['POST'])
@@ -810,47 +4421,13 @@ def create_host():
         user = data.get('user', '').strip()
         connection = data.get('connection', '').strip()
         
-        home_dir = os.path.expanduser("~")
-        inventory_path = os.path.join(home_dir, "ansible_quickstart", "inventory.ini")
-        
-        if not os.path.exists(inventory_path):
+        if not inventory_available():
             return jsonify({'success': False, 'error': 'Inventory file not found'})
 
-        host_line = f"{name}"
-        if ip:
-            host_line += f" ansible_host={ip}"
-        if connection:
-            host_line += f" ansible_connection={connection}"
-        if user:
-            host_line += f" ansible_user={user}"
-        host_line += "\n"
-
-        with open(inventory_path, 'r') as f:
-            lines = f.readlines()
-
-        group_found = False
-        new_lines = []
-        
-        for line in lines:
-            new_lines.append(line)
-            if line.strip() == "[myhosts]":
-                group_found = True
-
-        if group_found:
-            idx = next(i for i, line in enumerate(new_lines) if line.strip() == "[myhosts]")
-            insert_idx = len(new_lines)
-            
-            for i in range(idx + 1, len(new_lines)):
-                if new_lines[i].startswith("[") and new_lines[i].endswith("]"):
-                    insert_idx = i
-                    break
-            
-            new_lines.insert(insert_idx, host_line)
-        else:
-            new_lines.extend(["\n[myhosts]\n", host_line])
-
-        with open(inventory_path, 'w') as f:
-            f.writelines(new_lines)
+        apply_inventory_operations([{
+            'op': 'add_host', 'name': name, 'ip': ip, 'user': user, 'connection': connection, 'group': 'myhosts'
+        }])
+        invalidate_host_facts([name])
 
         return jsonify({'success': True, 'message': f'Host {name} created in [myhosts]'})
         
@@ -864,22 +4441,11 @@ def delete_host():
         data = request.get_json()
         name = data.get('name', '').strip()
         
-        home_dir = os.path.expanduser("~")
-        inventory_path = os.path.join(home_dir, "ansible_quickstart", "inventory.ini")
-        
-        if not os.path.exists(inventory_path):
+        if not inventory_available():
             return jsonify({'success': False, 'error': 'Inventory file not found'})
         
-        with open(inventory_path, 'r') as f:
-            lines = f.readlines()
-        
-        new_lines = [
-            line for line in lines 
-            if not (line.strip().startswith(f"{name} ") or line.strip() == name)
-        ]
-        
-        with open(inventory_path, 'w') as f:
-            f.writelines(new_lines)
+        apply_inventory_operations([{'op': 'delete_host', 'name': name}])
+        invalidate_host_facts([name])
         
         return jsonify({'success': True, 'message': f'Host {name} deleted'})
         
@@ -897,29 +4463,14 @@ def create_group():
         if not group_name or not hosts:
             return jsonify({'success': False, 'error': 'Group name and hosts required'})
 
-        home_dir = os.path.expanduser("~")
-        inventory_path = os.path.join(home_dir, "ansible_quickstart", "inventory.ini")
-
-        if not os.path.exists(inventory_path):
+        if not inventory_available():
             return jsonify({'success': False, 'error': 'Inventory file not found'})
 
-        new_group = f"\n[{group_name}]\n"
-        host_lines = []
-        
-        for host in hosts:
-            line = host.get('name', '')
-            if host.get('ip'):
-                line += f" ansible_host={host['ip']}"
-            if host.get('connection'):
-                line += f" ansible_connection={host['connection']}"
-            if host.get('user'):
-                line += f" ansible_user={host['user']}"
-            
-            new_group += line + "\n"
-            host_lines.append(line)
-
-        with open(inventory_path, 'a') as f:
-            f.write(new_group)
+        host_lines = [
+            format_host_line(host.get('name', ''), host.get('ip'), host.get('connection'), host.get('user'))
+            for host in hosts
+        ]
+        apply_inventory_operations([{'op': 'add_group', 'group_name': group_name, 'hosts': hosts}])
 
         return jsonify({
             'success': True, 
@@ -936,37 +4487,206 @@ def delete_group():
         data = request.get_json()
         group_name = data.get('group_name', '').strip()
         
-        home_dir = os.path.expanduser("~")
-        inventory_path = os.path.join(home_dir, "ansible_quickstart", "inventory.ini")
-        
-        if not os.path.exists(inventory_path):
+        if not inventory_available():
             return jsonify({'success': False, 'error': 'Inventory file not found'})
         
-        with open(inventory_path, 'r') as f:
-            lines = f.readlines()
-        
-        new_lines = []
-        in_group = False
-        
-        for line in lines:
-            if line.strip().startswith(f"[{group_name}]"):
-                in_group = True
-                continue
-            
-            if in_group and line.startswith('['):
-                in_group = False
-            
-            if not in_group:
-                new_lines.append(line)
-        
-        with open(inventory_path, 'w') as f:
-            f.writelines(new_lines)
+        apply_inventory_operations([{'op': 'delete_group', 'group_name': group_name}])
         
         return jsonify({'success': True, 'message': f'Group {group_name} deleted'})
         
     except Exception as e:
         return jsonify({'success': False, 'error': f'Failed to delete group: {str(e)}'})
 
+
+@app.route('/api/update-group', methods=['POST'])
+def update_group():
+    try:
+        data = request.get_json()
+        group_name = data.get('group_name', '').strip()
+
+        if not inventory_available():
+            return jsonify({'success': False, 'error': 'Inventory file not found'})
+
+        apply_inventory_operations([{
+            'op': 'update_group', 'group_name': group_name,
+            'add': data.get('add', []), 'remove': data.get('remove', [])
+        }])
+
+        return jsonify({
+            'success': True,
+            'message': f"Group {group_name} updated: {len(data.get('add', []))} added, {len(data.get('remove', []))} removed"
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Failed to update group: {str(e)}'})
+
+
+@app.route('/api/inventory/bulk', methods=['POST'])
+def bulk_edit_inventory():
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'success': False, 'error': 'Not logged in'})
+        data = request.get_json()
+        operations = data.get('operations')
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'success': False, 'error': 'operations must be a non-empty list'})
+        if len(operations) > APP_CONFIG['inventory']['max_bulk_operations']:
+            return jsonify({'success': False, 'error': f"At most {APP_CONFIG['inventory']['max_bulk_operations']} operations per request"})
+        if not inventory_available():
+            return jsonify({'success': False, 'error': 'Inventory file not found'})
+
+        try:
+            touched_hosts = apply_inventory_operations(operations)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)})
+        invalidate_host_facts(sorted(set(touched_hosts)))
+
+        counts = {}
+        for operation in operations:
+            counts[operation['op']] = counts.get(operation['op'], 0) + 1
+        return jsonify({
+            'success': True,
+            'applied': len(operations),
+            'operations': counts,
+            'message': f'Applied {len(operations)} inventory operations'
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Bulk inventory update failed: {str(e)}'})
+
+
+@app.route('/api/inventory/import', methods=['POST'])
+def import_inventory():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    if role != 'admin':
+        return jsonify({'success': False, 'error': 'Admin access required'})
+
+    data = request.get_json(silent=True) or {}
+    content = data.get('content')
+    if content is None:
+        if not os.path.exists(get_inventory_path()):
+            return jsonify({'success': False, 'error': 'Inventory file not found'})
+        with open(get_inventory_path(), 'r') as f:
+            content = f.read()
+
+    try:
+        imported = import_inventory_ini(content)
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Inventory import failed: {str(e)}'})
+    invalidate_host_facts()
+    return jsonify({'success': True, 'hosts': imported, 'message': f'Imported {imported} hosts into the database'})
+
+
+@app.route('/api/inventory/export')
+def export_inventory():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    if inventory_source() != 'db':
+        return jsonify({'success': False, 'error': 'Inventory is not database backed'})
+
+    inventory = export_db_inventory()
+    if request.args.get('format', 'json') == 'ini':
+        return Response(format_inventory_ini(inventory), mimetype='text/plain')
+    return jsonify({'success': True, 'inventory': inventory})
+
+
+@app.route('/api/inventory/resolve')
+def resolve_inventory_limit():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    if inventory_source() != 'db':
+        return jsonify({'success': False, 'error': 'Inventory is not database backed'})
+
+    hosts = resolve_limit_hosts(request.args.get('limit', 'all'))
+    return jsonify({'success': True, 'hosts': hosts, 'count': len(hosts)})
+
+
+@app.route('/api/hosts/health')
+def get_hosts_health():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    index, _ = get_inventory_index()
+    hosts = {h['name']: get_host_health(h['name']) for h in index['hosts']}
+    counts = {}
+    for entry in hosts.values():
+        counts[entry['status']] = counts.get(entry['status'], 0) + 1
+    return jsonify({
+        'success': True,
+        'ttl': APP_CONFIG['health']['ttl'],
+        'counts': counts,
+        'hosts': hosts,
+        'probe': health_probe_status
+    })
+
+
+@app.route('/api/hosts/health/probe', methods=['POST'])
+def probe_hosts_health():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    data = request.get_json(silent=True) or {}
+    names = data.get('hosts')
+    if names is not None and not (isinstance(names, list) and all(isinstance(n, str) and n for n in names)):
+        return jsonify({'success': False, 'error': 'hosts must be a list of host names'})
+    if not health_probe_lock.acquire(blocking=False):
+        return jsonify({'success': False, 'error': 'Health probe already running'})
+    health_probe_status['running'] = True
+    threading.Thread(
+        target=probe_inventory_hosts, args=(set(names) if names is not None else None, True), daemon=True
+    ).start()
+    return jsonify({'success': True, 'message': 'Health probe started'})
+
+
+@app.route('/api/facts')
+def get_fact_cache():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    return jsonify({
+        'success': True,
+        'ttl': APP_CONFIG['facts']['ttl'],
+        'hosts': get_fact_cache_entries(),
+        'warm_up': fact_warm_status
+    })
+
+
+@app.route('/api/facts/warm', methods=['POST'])
+def warm_facts():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    data = request.get_json(silent=True) or {}
+    hosts = data.get('hosts')
+    if hosts is not None and not (isinstance(hosts, list) and all(isinstance(h, str) for h in hosts)):
+        return jsonify({'success': False, 'error': 'hosts must be a list of host names'})
+    if fact_warm_status['running']:
+        return jsonify({'success': False, 'error': 'Fact warm-up already running'})
+    threading.Thread(target=warm_fact_cache, args=(hosts,), daemon=True).start()
+    return jsonify({'success': True, 'message': 'Fact warm-up started'})
+
+
+@app.route('/api/facts/invalidate', methods=['POST'])
+def invalidate_facts():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    data = request.get_json(silent=True) or {}
+    hosts = data.get('hosts')
+    if hosts is None:
+        role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+        if role != 'admin':
+            return jsonify({'success': False, 'error': 'Only admins can clear the whole fact cache'})
+    elif not (isinstance(hosts, list) and all(isinstance(h, str) for h in hosts)):
+        return jsonify({'success': False, 'error': 'hosts must be a list of host names'})
+    removed = invalidate_host_facts(hosts)
+    return jsonify({'success': True, 'invalidated': removed})
+
 # =============================================================================
 # API ROUTES - PLAYBOOK
 # =============================================================================
@@ -1063,126 +4783,756 @@ def save_playbook():
             'message': f'Playbook {filename} saved successfully'
         })
     except Exception as e:
-        return jsonify({'success': False, 'error': f'Failed to save playbook: {str(e)}'})
+        return jsonify({'success': False, 'error': f'Failed to save playbook: {str(e)}'})
+
+
+@app.route('/api/update-playbook', methods=['POST'])
+def update_playbook():
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'success': False, 'error': 'Not logged in'})
+        role = db.session.get(Role, user.role_id).name if user.role_id else 'user' 
+        data = request.get_json()
+        original_filename = data.get('original_filename')
+        name = data.get('name', '').strip()
+        description = data.get('description', '').strip()
+        content = data.get('content', '').strip()
+        filename = name
+        if not filename.endswith(('.yml', '.yaml')):
+            filename += '.yml'
+        try:
+            yaml.safe_load(content)
+        except yaml.YAMLError as e:
+            return jsonify({'success': False, 'error': f'Invalid YAML syntax: {str(e)}'})
+        if role == 'admin':
+            original_path = get_playbook_paths(original_filename)
+        else:
+            home_dir = os.path.expanduser("~")
+            original_path = os.path.join(home_dir, "ansible_quickstart", "playbooks", original_filename)
+        if not original_path or not os.path.exists(original_path):
+            return jsonify({'success': False, 'error': f'Original playbook {original_filename} not found'})
+        new_path = os.path.join(os.path.dirname(original_path), filename)
+        if filename != original_filename and os.path.exists(new_path):
+            return jsonify({'success': False, 'error': f'Playbook {filename} already exists'})
+        final_content = content
+        if description:
+            final_content = f"# Description: {description}\n{content}"
+        with open(new_path, 'w') as f:
+            f.write(final_content)
+        if filename != original_filename:
+            os.remove(original_path)
+        return jsonify({
+            'success': True,
+            'filename': filename,
+            'path': new_path,
+            'message': f'Playbook {filename} updated successfully'
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Failed to update playbook: {str(e)}'})
+
+
+@app.route('/api/delete-playbook/<filename>', methods=['DELETE'])
+def delete_playbook(filename):
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user' 
+    if role == 'admin':
+        playbook_path = get_playbook_paths(filename)
+    else:
+        home_dir = os.path.expanduser("~")
+        playbook_path = os.path.join(home_dir, "ansible_quickstart", "playbooks", filename)
+    if not playbook_path or not os.path.exists(playbook_path):
+        return jsonify({'success': False, 'error': f'Playbook {filename} not found'})
+    os.remove(playbook_path)
+    return jsonify({
+        'success': True,
+        'filename': filename,
+        'message': f'Playbook {filename} deleted successfully'
+    })
+
+
+@app.route('/api/execute', methods=['POST'])
+def execute_playbook():
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'success': False, 'error': 'Not logged in'})
+        role = db.session.get(Role, user.role_id).name if user.role_id else 'user' 
+        data = request.get_json()
+        hosts = data.get('hosts')
+        playbook = data.get('playbook')
+        if not hosts or not playbook:
+            return jsonify({'success': False, 'error': 'Missing hosts or playbook parameter'})
+        if not isinstance(hosts, str):
+            return jsonify({'success': False, 'error': 'hosts must be a host pattern string'})
+        try:
+            execution = create_playbook_execution(
+                user.username, role, playbook, hosts,
+                extra_vars=data.get('extra_vars'),
+                use_cached_facts=data.get('use_cached_facts', True),
+                profile=data.get('profile', False),
+                exclude_unreachable=data.get('exclude_unreachable')
+            )
+            execution, coalesced = launch_execution(execution)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)})
+        return jsonify({
+            'success': True,
+            'execution_id': execution.id,
+            'status': execution.status,
+            'coalesced': coalesced,
+            'cached': coalesced and execution.finished,
+            'excluded_hosts': execution.excluded_hosts,
+            'queue_position': execution_scheduler.position(execution)
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Execution error: {str(e)}'})
+
+
+@app.route('/api/execution-profile')
+def get_execution_profile_api():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    inventory_path = get_ansible_inventory()
+    profile = get_execution_profile(inventory_path)
+    sockets = os.listdir(profile['control_path_dir'])
+    return jsonify({'success': True, **profile, 'active_control_sockets': len(sockets)})
+
+
+@app.route('/api/executions')
+def list_executions():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    with executions_lock:
+        visible = [
+            e for e in executions.values()
+            if role == 'admin' or user.username in e.watchers
+        ]
+    visible.sort(key=lambda e: e.created_at, reverse=True)
+    return jsonify({'success': True, 'executions': [e.to_dict() for e in visible]})
+
+
+@app.route('/api/executions/queue')
+def get_execution_queue():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    running, pending = execution_scheduler.snapshot()
+
+    def visible(e):
+        return role == 'admin' or e.username == user.username
+
+    return jsonify({
+        'success': True,
+        'max_running': execution_scheduler.max_running,
+        'max_per_user': execution_scheduler.max_per_user,
+        'running_count': len(running),
+        'queued_count': len(pending),
+        'running': [e.to_dict() for e in running if visible(e)],
+        'queued': [
+            {**e.to_dict(), 'queue_position': position}
+            for position, e in enumerate(pending, start=1) if visible(e)
+        ]
+    })
+
+
+@app.route('/api/executions/<execution_id>')
+def get_execution_status(execution_id):
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    execution = get_execution_for_user(execution_id, user)
+    if not execution:
+        return jsonify({'success': False, 'error': f'Execution {execution_id} not found'})
+    return jsonify({'success': True, **execution.to_dict()})
+
+
+@app.route('/api/executions/<execution_id>/cancel', methods=['POST'])
+def cancel_execution(execution_id):
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    execution = get_execution_for_user(execution_id, user)
+    if not execution:
+        return jsonify({'success': False, 'error': f'Execution {execution_id} not found'})
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    if role != 'admin' and execution.username != user.username:
+        return jsonify({'success': False, 'error': f'Execution {execution_id} was started by {execution.username}'})
+    if not execution_scheduler.cancel(execution, user.username):
+        return jsonify({'success': False, 'error': f'Execution {execution_id} is already {execution.status}'})
+    return jsonify({
+        'success': True,
+        'message': f'Execution {execution_id} cancelled',
+        **execution.to_dict()
+    })
+
+
+@app.route('/api/executions/<execution_id>/result')
+def get_execution_result(execution_id):
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    execution = get_execution_for_user(execution_id, user)
+    if not execution:
+        return jsonify({'success': False, 'error': f'Execution {execution_id} not found'})
+    if not execution.finished:
+        return jsonify({
+            'success': False,
+            'error': f'Execution {execution_id} is still {execution.status}',
+            'status': execution.status
+        })
+    return jsonify({
+        'success': execution.status == 'completed',
+        **execution.to_dict(include_output=True)
+    })
+
+@app.route('/api/executions/<execution_id>/stream')
+def stream_execution(execution_id):
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    execution = get_execution_for_user(execution_id, user)
+    if not execution:
+        return jsonify({'success': False, 'error': f'Execution {execution_id} not found'})
+    try:
+        offset = int(request.headers.get('Last-Event-ID') or request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid offset'})
+    return Response(
+        stream_execution_output(execution, max(0, offset)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/executions/<execution_id>/tasks')
+def get_execution_tasks(execution_id):
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    execution = get_execution_for_user(execution_id, user)
+    if not execution:
+        return jsonify({'success': False, 'error': f'Execution {execution_id} not found'})
+    query = TaskResult.query.filter_by(execution_id=execution.id)
+    host = request.args.get('host')
+    status = request.args.get('status')
+    if host:
+        query = query.filter_by(host=host)
+    if status:
+        query = query.filter_by(status=status)
+    results = query.order_by(TaskResult.started_at).all()
+    return jsonify({
+        'success': True,
+        'execution_id': execution.id,
+        'host_stats': execution.host_stats,
+        'tasks': [r.to_dict() for r in results]
+    })
+
+
+def scope_task_results(query, username, role):
+    if role == 'admin':
+        return query
+    own_executions = db.session.query(ExecutionRecord.execution_id).filter(ExecutionRecord.username == username)
+    return query.filter(TaskResult.execution_id.in_(own_executions))
+
+
+@app.route('/api/task-results/failed')
+def get_failed_task_hosts():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    task = request.args.get('task', '').strip()
+    if not task:
+        return jsonify({'success': False, 'error': 'Missing task parameter'})
+    query = TaskResult.query.filter(
+        TaskResult.task == task,
+        TaskResult.status.in_(['failed', 'unreachable'])
+    )
+    query = scope_task_results(query, user.username, role)
+    playbook = request.args.get('playbook')
+    if playbook:
+        query = query.filter(TaskResult.playbook == playbook)
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    results = query.order_by(TaskResult.finished_at.desc()).limit(limit).all()
+    return jsonify({
+        'success': True,
+        'task': task,
+        'hosts': sorted({r.host for r in results}),
+        'results': [r.to_dict() for r in results]
+    })
+
+
+def filter_task_results(query):
+    playbook = request.args.get('playbook')
+    since = request.args.get('since')
+    if playbook:
+        query = query.filter(TaskResult.playbook == playbook)
+    if since:
+        query = query.filter(TaskResult.started_at >= datetime.fromisoformat(since))
+    return query
+
+
+@app.route('/api/task-results/slowest')
+def get_slowest_tasks():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    limit = min(request.args.get('limit', 20, type=int), 200)
+    query = db.session.query(
+        TaskResult.playbook,
+        TaskResult.task,
+        db.func.count(TaskResult.id).label('runs'),
+        db.func.avg(TaskResult.duration).label('avg_duration'),
+        db.func.max(TaskResult.duration).label('max_duration')
+    )
+    try:
+        query = scope_task_results(filter_task_results(query), user.username, role)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date, expected ISO 8601'})
+    rows = (
+        query.group_by(TaskResult.playbook, TaskResult.task)
+        .order_by(db.func.avg(TaskResult.duration).desc())
+        .limit(limit)
+        .all()
+    )
+    return jsonify({
+        'success': True,
+        'tasks': [{
+            'playbook': row.playbook,
+            'task': row.task,
+            'runs': row.runs,
+            'avg_duration': round(float(row.avg_duration or 0), 3),
+            'max_duration': round(float(row.max_duration or 0), 3)
+        } for row in rows]
+    })
+
+@app.route('/api/task-results/slowest-hosts')
+def get_slowest_hosts():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    limit = min(request.args.get('limit', 20, type=int), 200)
+    runs = db.func.count(db.distinct(TaskResult.execution_id))
+    total_duration = db.func.sum(TaskResult.duration)
+    query = db.session.query(
+        TaskResult.host,
+        runs.label('runs'),
+        db.func.count(TaskResult.id).label('tasks'),
+        total_duration.label('total_duration'),
+        db.func.avg(TaskResult.duration).label('avg_task_duration')
+    )
+    try:
+        query = scope_task_results(filter_task_results(query), user.username, role)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date, expected ISO 8601'})
+    rows = (
+        query.group_by(TaskResult.host)
+        .order_by((total_duration / runs).desc())
+        .limit(limit)
+        .all()
+    )
+    return jsonify({
+        'success': True,
+        'hosts': [{
+            'host': row.host,
+            'runs': row.runs,
+            'tasks': row.tasks,
+            'avg_run_duration': round(float(row.total_duration or 0) / max(row.runs, 1), 3),
+            'avg_task_duration': round(float(row.avg_task_duration or 0), 3)
+        } for row in rows]
+    })
+
+# =============================================================================
+# API ROUTES - PIPELINES
+# =============================================================================
+
+@app.route('/api/pipelines', methods=['POST'])
+def create_pipeline():
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'success': False, 'error': 'Not logged in'})
+        role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+        data = request.get_json()
+        stages = data.get('stages')
+        try:
+            validate_pipeline_stages(stages)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)})
+        max_parallel = data.get('max_parallel', APP_CONFIG['execution']['pipeline_max_parallel'])
+        if not isinstance(max_parallel, int) or max_parallel < 1:
+            return jsonify({'success': False, 'error': 'max_parallel must be a positive integer'})
+        pipeline = submit_pipeline(PlaybookPipeline(
+            user.username, role, data.get('name', 'pipeline'), stages, max_parallel
+        ))
+        return jsonify({'success': True, **pipeline.to_dict()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Failed to start pipeline: {str(e)}'})
+
+
+@app.route('/api/pipelines')
+def list_pipelines():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    with pipelines_lock:
+        visible = [p for p in pipelines.values() if role == 'admin' or p.username == user.username]
+    visible.sort(key=lambda p: p.created_at, reverse=True)
+    return jsonify({'success': True, 'pipelines': [p.to_dict() for p in visible]})
+
+
+@app.route('/api/pipelines/<pipeline_id>')
+def get_pipeline(pipeline_id):
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    pipeline = get_pipeline_for_user(pipeline_id, user)
+    if not pipeline:
+        return jsonify({'success': False, 'error': f'Pipeline {pipeline_id} not found'})
+    return jsonify({'success': True, **pipeline.to_dict()})
+
+
+@app.route('/api/pipelines/<pipeline_id>/cancel', methods=['POST'])
+def cancel_pipeline(pipeline_id):
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    pipeline = get_pipeline_for_user(pipeline_id, user)
+    if not pipeline:
+        return jsonify({'success': False, 'error': f'Pipeline {pipeline_id} not found'})
+    if pipeline.finished or pipeline.cancelled_by:
+        return jsonify({'success': False, 'error': f'Pipeline {pipeline_id} is already {pipeline.status}'})
+    pipeline.cancelled_by = user.username
+    pipeline.changed.set()
+    return jsonify({'success': True, 'message': f'Pipeline {pipeline_id} cancelling'})
+
+# =============================================================================
+# API ROUTES - SCHEDULES
+# =============================================================================
+
+def get_schedule_for_user(schedule_id, user):
+    schedule = db.session.get(PlaybookSchedule, schedule_id)
+    if not schedule:
+        return None
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    if role != 'admin' and schedule.username != user.username:
+        return None
+    return schedule
+
+
+def apply_schedule_fields(schedule, data):
+    for field in ('name', 'playbook', 'hosts', 'cron'):
+        if field in data:
+            value = str(data[field]).strip()
+            if not value:
+                raise ValueError(f'{field} cannot be empty')
+            setattr(schedule, field, value)
+    if 'extra_vars' in data:
+        if data['extra_vars'] is not None and not isinstance(data['extra_vars'], dict):
+            raise ValueError('extra_vars must be an object')
+        schedule.extra_vars = json.dumps(data['extra_vars']) if data['extra_vars'] else None
+    if 'jitter_seconds' in data:
+        jitter = data['jitter_seconds']
+        if not isinstance(jitter, int) or jitter < 0:
+            raise ValueError('jitter_seconds must be a non-negative integer')
+        schedule.jitter_seconds = jitter
+    if 'enabled' in data:
+        schedule.enabled = bool(data['enabled'])
+    schedule.next_slot_at, schedule.next_run_at = plan_next_run(schedule, schedule_now())
+
+
+@app.route('/api/schedules')
+def list_schedules():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    query = PlaybookSchedule.query
+    if role != 'admin':
+        query = query.filter_by(username=user.username)
+    schedules = query.order_by(PlaybookSchedule.next_run_at).all()
+    return jsonify({'success': True, 'schedules': [sc.to_dict() for sc in schedules]})
+
+
+@app.route('/api/schedules', methods=['POST'])
+def create_schedule():
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'success': False, 'error': 'Not logged in'})
+        role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+        data = request.get_json()
+        if not data.get('playbook') or not data.get('cron'):
+            return jsonify({'success': False, 'error': 'Missing playbook or cron parameter'})
+        schedule = PlaybookSchedule(
+            name=data.get('name') or data['playbook'],
+            username=user.username,
+            hosts='all',
+            jitter_seconds=APP_CONFIG['execution']['schedule_default_jitter'],
+            enabled=True,
+            skipped_runs=0,
+            created_at=schedule_now()
+        )
+        try:
+            apply_schedule_fields(schedule, data)
+            validate_playbook_request(role, schedule.playbook)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)})
+        db.session.add(schedule)
+        db.session.commit()
+        return jsonify({'success': True, **schedule.to_dict()})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': f'Failed to create schedule: {str(e)}'})
 
 
-@app.route('/api/update-playbook', methods=['POST'])
-def update_playbook():
+@app.route('/api/schedules/<int:schedule_id>', methods=['POST'])
+def update_schedule(schedule_id):
     try:
         user = get_current_user()
         if not user:
             return jsonify({'success': False, 'error': 'Not logged in'})
-        role = db.session.get(Role, user.role_id).name if user.role_id else 'user' 
-        data = request.get_json()
-        original_filename = data.get('original_filename')
-        name = data.get('name', '').strip()
-        description = data.get('description', '').strip()
-        content = data.get('content', '').strip()
-        filename = name
-        if not filename.endswith(('.yml', '.yaml')):
-            filename += '.yml'
+        schedule = get_schedule_for_user(schedule_id, user)
+        if not schedule:
+            return jsonify({'success': False, 'error': f'Schedule {schedule_id} not found'})
         try:
-            yaml.safe_load(content)
-        except yaml.YAMLError as e:
-            return jsonify({'success': False, 'error': f'Invalid YAML syntax: {str(e)}'})
-        if role == 'admin':
-            original_path = get_playbook_paths(original_filename)
-        else:
-            home_dir = os.path.expanduser("~")
-            original_path = os.path.join(home_dir, "ansible_quickstart", "playbooks", original_filename)
-        if not original_path or not os.path.exists(original_path):
-            return jsonify({'success': False, 'error': f'Original playbook {original_filename} not found'})
-        new_path = os.path.join(os.path.dirname(original_path), filename)
-        if filename != original_filename and os.path.exists(new_path):
-            return jsonify({'success': False, 'error': f'Playbook {filename} already exists'})
-        final_content = content
-        if description:
-            final_content = f"# Description: {description}\n{content}"
-        with open(new_path, 'w') as f:
-            f.write(final_content)
-        if filename != original_filename:
-            os.remove(original_path)
-        return jsonify({
-            'success': True,
-            'filename': filename,
-            'path': new_path,
-            'message': f'Playbook {filename} updated successfully'
-        })
+            apply_schedule_fields(schedule, request.get_json())
+            owner = User.query.filter_by(username=schedule.username).first()
+            owner_role = db.session.get(Role, owner.role_id).name if owner and owner.role_id else 'user'
+            validate_playbook_request(owner_role, schedule.playbook)
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'success': False, 'error': str(e)})
+        db.session.commit()
+        return jsonify({'success': True, **schedule.to_dict()})
     except Exception as e:
-        return jsonify({'success': False, 'error': f'Failed to update playbook: {str(e)}'})
+        db.session.rollback()
+        return jsonify({'success': False, 'error': f'Failed to update schedule: {str(e)}'})
 
 
-@app.route('/api/delete-playbook/<filename>', methods=['DELETE'])
-def delete_playbook(filename):
+@app.route('/api/schedules/<int:schedule_id>', methods=['DELETE'])
+def delete_schedule(schedule_id):
     user = get_current_user()
     if not user:
         return jsonify({'success': False, 'error': 'Not logged in'})
-    role = db.session.get(Role, user.role_id).name if user.role_id else 'user' 
-    if role == 'admin':
-        playbook_path = get_playbook_paths(filename)
-    else:
-        home_dir = os.path.expanduser("~")
-        playbook_path = os.path.join(home_dir, "ansible_quickstart", "playbooks", filename)
-    if not playbook_path or not os.path.exists(playbook_path):
-        return jsonify({'success': False, 'error': f'Playbook {filename} not found'})
-    os.remove(playbook_path)
+    schedule = get_schedule_for_user(schedule_id, user)
+    if not schedule:
+        return jsonify({'success': False, 'error': f'Schedule {schedule_id} not found'})
+    ScheduleRun.query.filter_by(schedule_id=schedule.id).delete()
+    db.session.delete(schedule)
+    db.session.commit()
+    return jsonify({'success': True, 'message': f'Schedule {schedule_id} deleted'})
+
+
+@app.route('/api/schedules/<int:schedule_id>/runs')
+def list_schedule_runs(schedule_id):
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    schedule = get_schedule_for_user(schedule_id, user)
+    if not schedule:
+        return jsonify({'success': False, 'error': f'Schedule {schedule_id} not found'})
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    runs = (
+        ScheduleRun.query.filter_by(schedule_id=schedule.id)
+        .order_by(ScheduleRun.slot_at.desc())
+        .limit(limit)
+        .all()
+    )
+    lateness = [r.lateness_seconds for r in runs if r.lateness_seconds is not None]
     return jsonify({
         'success': True,
-        'filename': filename,
-        'message': f'Playbook {filename} deleted successfully'
+        'schedule': schedule.to_dict(),
+        'avg_lateness_seconds': round(sum(lateness) / len(lateness), 3) if lateness else None,
+        'max_lateness_seconds': max(lateness) if lateness else None,
+        'runs': [r.to_dict() for r in runs]
     })
 
+# =============================================================================
+# API ROUTES - EXECUTION HISTORY
+# =============================================================================
+
+def get_history_record_for_user(execution_id, user):
+    record = ExecutionRecord.query.filter_by(execution_id=execution_id).first()
+    if not record:
+        return None
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    if role != 'admin' and record.username != user.username:
+        return None
+    return record
+
+
+@app.route('/api/history')
+def list_history():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+
+    query = ExecutionRecord.query
+    if role != 'admin':
+        query = query.filter(ExecutionRecord.username == user.username)
+    elif request.args.get('user'):
+        query = query.filter(ExecutionRecord.username == request.args['user'])
+
+    for arg, column in (('kind', ExecutionRecord.kind),
+                        ('name', ExecutionRecord.name),
+                        ('playbook', ExecutionRecord.name),
+                        ('hosts', ExecutionRecord.hosts),
+                        ('status', ExecutionRecord.status),
+                        ('slurm_job_id', ExecutionRecord.slurm_job_id)):
+        value = request.args.get(arg)
+        if value:
+            query = query.filter(column == value)
+
+    return_code = request.args.get('return_code', type=int)
+    if return_code is not None:
+        query = query.filter(ExecutionRecord.return_code == return_code)
 
-@app.route('/api/execute', methods=['POST'])
-def execute_playbook():
     try:
-        user = get_current_user()
-        if not user:
-            return jsonify({'success': False, 'error': 'Not logged in'})
-        role = db.session.get(Role, user.role_id).name if user.role_id else 'user' 
-        data = request.get_json()
-        hosts = data.get('hosts')
-        playbook = data.get('playbook')
-        if not hosts or not playbook:
-            return jsonify({'success': False, 'error': 'Missing hosts or playbook parameter'})
-        home_dir = os.path.expanduser("~")
-        inventory_path = os.path.join(home_dir, "ansible_quickstart", "inventory.ini")
-        if role == 'admin':
-            playbook_path = get_playbook_paths(playbook)
-        else:
-            playbook_path = os.path.join(home_dir, "ansible_quickstart", "playbooks", playbook)
-        if not os.path.exists(inventory_path):
-            return jsonify({'success': False, 'error': 'Inventory file not found'})
-        if not playbook_path:
-            return jsonify({'success': False, 'error': 'Playbook file not found'})
-        cmd = [
-            'ansible-playbook',
-            '-i', inventory_path,
-            playbook_path,
-            '-v'
-        ]
-        if hosts != 'all':
-            cmd.extend(['--limit', hosts])
-        cmd_string = " ".join(cmd)
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=1800
-        )
-        output = f"Command: {cmd_string}\n\nSTDOUT:\n{result.stdout}\n\n"
-        if result.stderr:
-            output += f"STDERR:\n{result.stderr}\n\n"
-        output += f"Return code: {result.returncode}\n"
-        return jsonify({
-            'success': result.returncode == 0,
-            'output': output,
-            'return_code': result.returncode
+        since = request.args.get('since')
+        until = request.args.get('until')
+        if since:
+            query = query.filter(ExecutionRecord.created_at >= datetime.fromisoformat(since))
+        if until:
+            query = query.filter(ExecutionRecord.created_at <= datetime.fromisoformat(until))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date, expected ISO 8601'})
+
+    search = request.args.get('q', '').strip()
+    if search:
+        pattern = f"{search}%"
+        query = query.filter(db.or_(
+            ExecutionRecord.name.like(pattern),
+            ExecutionRecord.hosts.like(pattern)
+        ))
+
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+    pagination = query.order_by(ExecutionRecord.created_at.desc()).paginate(
+        page=page, per_page=per_page, error_out=False
+    )
+    return jsonify({
+        'success': True,
+        'page': page,
+        'per_page': per_page,
+        'total': pagination.total,
+        'pages': pagination.pages,
+        'executions': [r.to_dict() for r in pagination.items]
+    })
+
+
+@app.route('/api/history/<execution_id>')
+def get_history_entry(execution_id):
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    record = get_history_record_for_user(execution_id, user)
+    if not record:
+        return jsonify({'success': False, 'error': f'Execution {execution_id} not found'})
+    return jsonify({'success': True, **record.to_dict()})
+
+
+@app.route('/api/history/<execution_id>/output')
+def get_history_output(execution_id):
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    record = get_history_record_for_user(execution_id, user)
+    if not record:
+        return jsonify({'success': False, 'error': f'Execution {execution_id} not found'})
+    blob = db.session.get(ExecutionOutput, record.execution_id)
+    if not blob:
+        return jsonify({'success': False, 'error': f'No output stored for execution {execution_id}'})
+    return Response(
+        iter_decompressed_output(blob.data),
+        mimetype='text/plain',
+        headers={'Content-Disposition': f'inline; filename="{execution_id}.log"'}
+    )
+
+@app.route('/api/history/<execution_id>/profile')
+def get_history_profile(execution_id):
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    record = get_history_record_for_user(execution_id, user)
+    if not record:
+        return jsonify({'success': False, 'error': f'Execution {execution_id} not found'})
+    results = TaskResult.query.filter_by(execution_id=record.execution_id).all()
+
+    tasks = {}
+    hosts = {}
+    for r in results:
+        duration = r.duration or 0
+        task = tasks.setdefault((r.play, r.task), {'play': r.play, 'task': r.task, 'hosts': 0,
+                                                   'total_duration': 0.0, 'max_duration': 0.0})
+        task['hosts'] += 1
+        task['total_duration'] += duration
+        task['max_duration'] = max(task['max_duration'], duration)
+        host = hosts.setdefault(r.host, {'host': r.host, 'tasks': 0, 'total_duration': 0.0})
+        host['tasks'] += 1
+        host['total_duration'] += duration
+
+    for entry in list(tasks.values()) + list(hosts.values()):
+        entry['total_duration'] = round(entry['total_duration'], 3)
+    return jsonify({
+        'success': True,
+        'execution_id': record.execution_id,
+        'name': record.name,
+        'tasks': sorted(tasks.values(), key=lambda t: -t['max_duration']),
+        'hosts': sorted(hosts.values(), key=lambda h: -h['total_duration'])
+    })
+
+
+@app.route('/api/history/<execution_id>/trace')
+def get_history_trace(execution_id):
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    record = get_history_record_for_user(execution_id, user)
+    if not record:
+        return jsonify({'success': False, 'error': f'Execution {execution_id} not found'})
+    results = (
+        TaskResult.query.filter_by(execution_id=record.execution_id)
+        .order_by(TaskResult.started_at)
+        .all()
+    )
+
+    # Chrome trace event format: one thread per host, one complete ("X")
+    # event per task, timestamps in microseconds.
+    thread_ids = {}
+    events = [{'name': 'process_name', 'ph': 'M', 'pid': 1, 'args': {'name': record.name}}]
+    for r in results:
+        if r.host not in thread_ids:
+            thread_ids[r.host] = len(thread_ids) + 1
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1,
+                           'tid': thread_ids[r.host], 'args': {'name': r.host}})
+        if not r.started_at:
+            continue
+        events.append({
+            'name': r.task,
+            'cat': r.play or 'play',
+            'ph': 'X',
+            'pid': 1,
+            'tid': thread_ids[r.host],
+            'ts': int(r.started_at.replace(tzinfo=timezone.utc).timestamp() * 1000000),
+            'dur': int((r.duration or 0) * 1000000),
+            'args': {'status': r.status, 'changed': r.changed, 'action': r.action}
         })
-    except subprocess.TimeoutExpired:
-        return jsonify({'success': False, 'error': 'Command timed out after 30 minutes'})
-    except Exception as e:
-        return jsonify({'success': False, 'error': f'Execution error: {str(e)}'})
+
+    resp = make_response(json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}))
+    resp.headers['Content-Type'] = 'application/json'
+    resp.headers['Content-Disposition'] = f'attachment; filename="{execution_id}.trace.json"'
+    return resp
 
 # =============================================================================
 # API ROUTES - SLURM JOB MANAGEMENT
@@ -1201,20 +5551,12 @@ def get_job(filename):
         return jsonify({'success': False, 'error': 'Not logged in'})
     role = db.session.get(Role, user.role_id).name if user.role_id else 'user' 
 
-    job_path = None
-    if role == 'admin':
-        import glob
-        for jobs_dir in glob.glob('/home/*/slurm_jobs'):
-            candidate = os.path.join(jobs_dir, filename)
-            if os.path.exists(candidate):
-                job_path = candidate
-                break
-    else:
-        jobs_dir = f'/home/{user.username}/slurm_jobs'
-        job_path = os.path.join(jobs_dir, filename)
-
-    if not job_path or not os.path.exists(job_path):
+    entry = find_job_for_user(user, role, filename)
+    if not entry or not os.path.exists(entry['path']):
+        if entry:
+            job_catalog.refresh_path(entry['owner'], entry['path'])
         return jsonify({'success': False, 'error': f'Job {filename} not found'})
+    job_path = entry['path']
 
     with open(job_path, 'r') as file:
         content = file.read()
@@ -1290,6 +5632,7 @@ def save_job():
             file.write(final_content)
 
         os.chmod(job_path, 0o755)
+        job_catalog.refresh_path(target_user, job_path)
 
         try:
             user_info = pwd.getpwnam(target_user)
@@ -1321,22 +5664,14 @@ def delete_job(filename):
         return jsonify({'success': False, 'error': 'Not logged in'})
     role = db.session.get(Role, user.role_id).name if user.role_id else 'user' 
 
-    job_path = None
-    if role == 'admin':
-        import glob
-        for jobs_dir in glob.glob('/home/*/slurm_jobs'):
-            candidate = os.path.join(jobs_dir, filename)
-            if os.path.exists(candidate):
-                job_path = candidate
-                break
-    else:
-        jobs_dir = f'/home/{user.username}/slurm_jobs'
-        job_path = os.path.join(jobs_dir, filename)
-
-    if not job_path or not os.path.exists(job_path):
+    entry = find_job_for_user(user, role, filename)
+    if not entry or not os.path.exists(entry['path']):
+        if entry:
+            job_catalog.refresh_path(entry['owner'], entry['path'])
         return jsonify({'success': False, 'error': f'Job {filename} not found'})
 
-    os.remove(job_path)
+    os.remove(entry['path'])
+    job_catalog.refresh_path(entry['owner'], entry['path'])
 
     return jsonify({
         'success': True,
@@ -1362,25 +5697,20 @@ def execute_job():
             return jsonify({'success': False, 'error': 'Not logged in'})
         executing_username = user.username
         
-        jobs_dir = f"/home/{executing_username}/slurm_jobs"
-        job_path = os.path.join(jobs_dir, job_filename)
-        
-        if not os.path.exists(job_path):
+        entry = job_catalog.find(job_filename, owner=executing_username)
+        if not entry or not os.path.exists(entry['path']):
             return jsonify({'success': False, 'error': 'Job file not found'})
+        job_path = entry['path']
         
-        original_content = None
+        # The rendered script goes to sbatch on stdin so the user's file is
+        # never rewritten and concurrent submissions cannot clobber it.
+        rendered_script = None
         if app_list:
             with open(job_path, 'r') as f:
-                original_content = f.read()
-            
-            modified_content = original_content
+                rendered_script = f.read()
             for app_cfg in app_list:
                 if app_cfg:
-                    modified_content = inject_application_setup(modified_content, app_cfg)
-            
-            with open(job_path, 'w') as f:
-                f.write(modified_content)
-            os.chmod(job_path, 0o755)
+                    rendered_script = inject_application_setup(rendered_script, app_cfg)
         
         env = os.environ.copy()
         if app_list:
@@ -1394,14 +5724,13 @@ def execute_job():
         if hosts != 'all':
             cmd.extend(['--nodelist', hosts])
         
-        cmd.append(job_path)
+        if rendered_script is None:
+            cmd.append(job_path)
+        else:
+            cmd.append(f'--job-name={os.path.splitext(job_filename)[0]}')
 
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=1800, env=env)
-        
-        if original_content is not None:
-            with open(job_path, 'w') as f:
-                f.write(original_content)
-            os.chmod(job_path, 0o755)
+        started_at = datetime.now(timezone.utc)
+        result = run_in_process_group(cmd, 1800, input=rendered_script, env=env)
         
         output = f"Starting execution of {job_filename} on {hosts}...\n"
         output += f"Command: {' '.join(cmd)}\n\nSTDOUT:\n{result.stdout}\n\n"
@@ -1416,6 +5745,16 @@ def execute_job():
             if match:
                 job_id = match.group(1)
 
+        save_execution_record(
+            uuid.uuid4().hex, 'job', executing_username, job_filename, hosts,
+            'completed' if result.returncode == 0 else 'failed', started_at,
+            started_at=started_at,
+            finished_at=datetime.now(timezone.utc),
+            return_code=result.returncode,
+            slurm_job_id=job_id,
+            output=output
+        )
+
         return jsonify({
             'success': result.returncode == 0,
             'output': output,
@@ -1430,36 +5769,242 @@ def execute_job():
         return jsonify({'success': False, 'error': f'Execution error: {str(e)}'})
     
 
+@app.route('/api/execute-job-sweep', methods=['POST'])
+def execute_job_sweep():
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'success': False, 'error': 'Not logged in'})
+        role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+
+        data = request.get_json()
+        job_filename = data.get('job')
+        hosts = data.get('hosts') or 'all'
+        app_id = data.get('application')
+        if not job_filename or not app_id:
+            return jsonify({'success': False, 'error': 'Missing job or application parameter'})
+        if not isinstance(hosts, str):
+            return jsonify({'success': False, 'error': 'hosts must be a node list string'})
+
+        entry = job_catalog.find(job_filename, owner=user.username)
+        if not entry or not os.path.exists(entry['path']):
+            return jsonify({'success': False, 'error': 'Job file not found'})
+
+        app_entry = get_user_application(user, role, app_id)
+        if not app_entry:
+            return jsonify({'success': False, 'error': f'Application {app_id} not available'})
+
+        paths = data.get('test_files')
+        if paths is not None and not isinstance(paths, list):
+            return jsonify({'success': False, 'error': 'test_files must be a list of paths'})
+        try:
+            inputs = select_sweep_inputs(app_entry, paths, data.get('glob'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)})
+        if not inputs:
+            return jsonify({'success': False, 'error': 'No test files selected'})
+        max_array_size = APP_CONFIG['jobs']['max_array_size']
+        if len(inputs) > max_array_size:
+            return jsonify({'success': False, 'error': f'At most {max_array_size} inputs per sweep'})
+
+        throttle = data.get('throttle', APP_CONFIG['jobs']['default_array_throttle'])
+        if not isinstance(throttle, int) or throttle < 1:
+            return jsonify({'success': False, 'error': 'throttle must be a positive integer'})
+
+        with open(entry['path'], 'r') as f:
+            script = render_sweep_script(f.read(), app_entry, inputs)
+
+        env = os.environ.copy()
+        env['SELECTED_APPLICATION'] = app_entry['name']
+        env['APPLICATION_TYPE'] = app_entry['manifest'].get('type', '')
+
+        username = user.username
+        cmd = ['sudo', '-u', username, 'sbatch',
+               f'--array=0-{len(inputs) - 1}%{throttle}',
+               f'--job-name={os.path.splitext(job_filename)[0]}-sweep',
+               f'--output=/home/{username}/slurm-output-%A_%a.log',
+               f'--error=/home/{username}/slurm-output-%A_%a.log',
+               f'--chdir=/home/{username}']
+        if hosts != 'all':
+            cmd.extend(['--nodelist', hosts])
+
+        started_at = datetime.now(timezone.utc)
+        result = run_in_process_group(cmd, 1800, input=script, env=env)
+
+        job_id = None
+        match = re.search(r'Submitted batch job (\d+)', result.stdout or '')
+        if result.returncode == 0 and match:
+            job_id = match.group(1)
+
+        output = f"Submitting sweep of {job_filename} over {len(inputs)} inputs on {hosts}...\n"
+        output += f"Command: {' '.join(cmd)}\n\nSTDOUT:\n{result.stdout}\n\n"
+        if result.stderr:
+            output += f"STDERR:\n{result.stderr}\n\n"
+        output += f"Return code: {result.returncode}\n"
+
+        save_execution_record(
+            uuid.uuid4().hex, 'sweep', username, job_filename, hosts,
+            'completed' if result.returncode == 0 else 'failed', started_at,
+            started_at=started_at,
+            finished_at=datetime.now(timezone.utc),
+            return_code=result.returncode,
+            slurm_job_id=job_id,
+            output=output
+        )
+
+        return jsonify({
+            'success': result.returncode == 0,
+            'output': output,
+            'return_code': result.returncode,
+            'username': username,
+            'job_id': job_id,
+            'tasks': [
+                {'task_id': i, 'input': f['path'], 'log': f'/home/{username}/slurm-output-{job_id}_{i}.log'}
+                for i, f in enumerate(inputs)
+            ]
+        })
+
+    except subprocess.TimeoutExpired:
+        return jsonify({'success': False, 'error': 'Command timed out after 30 minutes'})
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Sweep submission error: {str(e)}'})
+
+
 @app.route('/api/job-output/<job_id>')
 def get_job_output(job_id):
     try:
         user = get_current_user()
         if not user:
             return jsonify({'success': False, 'error': 'Not logged in'})
-        
-        sacct_cmd = [
-            'sacct', 
-            '-j', job_id,
-            '--format=JobID,JobName,Partition,User,NodeList,State,Start,End,Elapsed,ExitCode'
-        ]
-        
-        sacct_result = subprocess.run(sacct_cmd, capture_output=True, text=True, timeout=10)
-        
-        if sacct_result.returncode != 0:
+
+        if not SLURM_JOB_ID_RE.match(job_id):
+            return jsonify({'success': False, 'error': 'Invalid job id'})
+
+        records = slurm_state.job_records(job_id)
+        error = None
+        if not records:
+            # Not in the shared snapshot: either older than the accounting
+            # window or submitted since the last poll. sacct knows both.
+            try:
+                records, error = slurm_state.lookup_job(job_id)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                error = f'sacct: {str(e)}'
+
+        if not records:
             return jsonify({
-                'success': False, 
-                'error': f'Failed to get job data: {sacct_result.stderr}'
+                'success': False,
+                'error': error or f'Job {job_id} not found in accounting data'
             })
-        
-        return jsonify({
+
+        records = [{k: v for k, v in r.items() if not k.startswith('_')} for r in records]
+        try:
+            selected, total = query_slurm_records(records, request.args, ACCOUNTING_RECORD_FIELDS)
+            projected = project_slurm_records(selected, request.args, ACCOUNTING_RECORD_FIELDS)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)})
+
+        response = {
             'success': True,
             'job_id': job_id,
-            'sacct_output': sacct_result.stdout,
-        })
+            'records': projected,
+            'total': total,
+            'snapshot': slurm_state.snapshot_info()
+        }
+        if request.args.get('format') == 'text':
+            response['sacct_output'] = format_sacct_table(selected)
+        return jsonify(response)
         
     except Exception as e:
         return jsonify({'success': False, 'error': f'Failed to get job information: {str(e)}'})
     
+@app.route('/api/job-log/<job_id>')
+def get_job_log(job_id):
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    path, error = resolve_job_log(user, role, job_id)
+    if error:
+        return jsonify({'success': False, 'error': error})
+
+    config = APP_CONFIG['slurm']
+    offset = request.args.get('offset', 0, type=int)
+    limit = min(max(request.args.get('limit', config['log_chunk_size'], type=int), 1), config['log_max_chunk_size'])
+    range_match = re.match(r'^bytes=(\d+)-(\d*)$', request.headers.get('Range', ''))
+    if range_match:
+        offset = int(range_match.group(1))
+        if range_match.group(2):
+            limit = min(limit, int(range_match.group(2)) - offset + 1)
+    offset = max(offset, 0)
+
+    wait = min(max(request.args.get('wait', 0, type=float), 0), config['log_max_wait'])
+    size = wait_for_job_log(path, job_id, offset, wait) if wait else job_log_size(path)
+    state = slurm_state.job_state(job_id)
+    if size is None:
+        return jsonify({'success': False, 'error': f'Log for job {job_id} not available yet', 'state': state})
+    if limit <= 0 or offset > size:
+        return Response(status=416, headers={'Content-Range': f'bytes */{size}'})
+
+    chunk = read_job_log(path, offset, min(limit, size - offset))
+    headers = {
+        'X-Log-Offset': str(offset),
+        'X-Next-Offset': str(offset + len(chunk)),
+        'X-Log-Size': str(size),
+        'X-Job-State': state or 'UNKNOWN',
+        'X-Log-Complete': 'true' if job_log_finished(job_id) and offset + len(chunk) >= size else 'false',
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': 'no-cache'
+    }
+    status = 200
+    if range_match:
+        status = 206
+        headers['Content-Range'] = f'bytes {offset}-{offset + len(chunk) - 1}/{size}' if chunk else f'bytes */{size}'
+    if chunk and request.args.get('gzip', '1') != '0' and 'gzip' in request.headers.get('Accept-Encoding', ''):
+        chunk = gzip.compress(chunk, compresslevel=5)
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+    return Response(chunk, status=status, mimetype='text/plain', headers=headers)
+
+
+@app.route('/api/job-log/<job_id>/stream')
+def stream_job_log_api(job_id):
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    path, error = resolve_job_log(user, role, job_id)
+    if error:
+        return jsonify({'success': False, 'error': error})
+    try:
+        offset = int(request.headers.get('Last-Event-ID') or request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid offset'})
+    return Response(
+        stream_job_log(path, job_id, max(0, offset)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/slurm/events')
+def slurm_job_events():
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'Not logged in'})
+    role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
+    username = None if role == 'admin' and request.args.get('all') == '1' else user.username
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        last_seq = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid event id'})
+    return Response(
+        stream_job_events(username, last_seq, request.cookies.get('session_token')),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/api/slurm-queue')
 def slurm_queue():
     try:
@@ -1469,31 +6014,25 @@ def slurm_queue():
         
         username = user.username
         role = db.session.get(Role, user.role_id).name if user.role_id else 'user'
-        
-        if role == 'admin':
-            squeue_cmd = [
-                'squeue',
-                '-o', '%.18i %.9P %.8j %.8u %.2t %.10M %.6D %R'
-            ]
-        else:
-            squeue_cmd = [
-                'squeue',
-                '-u', username,
-                '-o', '%.18i %.9P %.8j %.8u %.2t %.10M %.6D %R'
-            ]
-        
-        result = subprocess.run(squeue_cmd, capture_output=True, text=True, timeout=10)
-        
-        if result.returncode != 0:
+
+        info = slurm_state.snapshot_info()
+        if info['queue_at'] is None:
             return jsonify({
                 'success': False, 
-                'error': f'Failed to get queue data: {result.stderr}'
+                'error': f"Failed to get queue data: {info['error'] or 'no snapshot yet'}"
             })
-        
-        return jsonify({
-            'success': True,
-            'output': result.stdout
-        })
+
+        records = slurm_state.queue_for(None if role == 'admin' else username)
+        try:
+            selected, total = query_slurm_records(records, request.args, QUEUE_RECORD_FIELDS)
+            jobs = project_slurm_records(selected, request.args, QUEUE_RECORD_FIELDS)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)})
+
+        response = {'success': True, 'jobs': jobs, 'total': total, 'snapshot': info}
+        if request.args.get('format') == 'text':
+            response['output'] = format_squeue_table(selected)
+        return jsonify(response)
         
     except Exception as e:
         return jsonify({'success': False, 'error': f'Failed to get queue information: {str(e)}'})
@@ -1549,14 +6088,14 @@ def register_user():
 
         subprocess.run(['ssh-keygen', '-t', 'rsa', '-b', '4096', '-N', '', '-f', key_path], check=True)
         home_dir = os.path.expanduser("~")
-        inventory_path = os.path.join(home_dir, "ansible_quickstart", "inventory.ini")
+        inventory_path = get_ansible_inventory()
         playbook_path = os.path.join(home_dir, "ansible_quickstart", "playbooks", "create_user.yml")
         cmd = [
             'ansible-playbook', '-i', inventory_path, playbook_path,
             '-e', f'username={username}', '-e', f'uid={uid}', '-e', f'gid={gid}'
         ]
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = subprocess.run(cmd, capture_output=True, text=True, env=ansible_profile_env(inventory_path))
             print("Ansible STDOUT:", result.stdout)
             print("Ansible STDERR:", result.stderr)
             print("Ansible returncode:", result.returncode)
@@ -1706,13 +6245,13 @@ def update_profile():
 
         if username_changed:
             home_dir = os.path.expanduser("~")
-            inventory_path = os.path.join(home_dir, "ansible_quickstart", "inventory.ini")
+            inventory_path = get_ansible_inventory()
             playbook_path = os.path.join(home_dir, "ansible_quickstart", "playbooks", "rename_user.yml")
             cmd = [
                 'ansible-playbook', '-i', inventory_path, playbook_path,
                 '-e', f'old_username={old_username}', '-e', f'new_username={username}'
             ]
-            subprocess.run(cmd, check=True)
+            subprocess.run(cmd, check=True, env=ansible_profile_env(inventory_path))
         
         return jsonify({'success': True, 'message': 'Profile updated successfully'})
         
@@ -1812,14 +6351,14 @@ def create_user():
     subprocess.run(['ssh-keygen', '-t', 'rsa', '-b', '4096', '-N', '', '-f', key_path], check=True)
 
     home_dir = os.path.expanduser("~")
-    inventory_path = os.path.join(home_dir, "ansible_quickstart", "inventory.ini")
+    inventory_path = get_ansible_inventory()
     playbook_path = os.path.join(home_dir, "ansible_quickstart", "playbooks", "create_user.yml")
     cmd = [
         'ansible-playbook', '-i', inventory_path, playbook_path,
         '-e', f'username={username}', '-e', f'uid={uid}', '-e', f'gid={gid}'
     ]
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = subprocess.run(cmd, capture_output=True, text=True, env=ansible_profile_env(inventory_path))
         print("Ansible STDOUT:", result.stdout)
         print("Ansible STDERR:", result.stderr)
         print("Ansible returncode:", result.returncode)
@@ -1882,13 +6421,13 @@ def update_user():
 
     if username_changed:
         home_dir = os.path.expanduser("~")
-        inventory_path = os.path.join(home_dir, "ansible_quickstart", "inventory.ini")
+        inventory_path = get_ansible_inventory()
         playbook_path = os.path.join(home_dir, "ansible_quickstart", "playbooks", "rename_user.yml")
         cmd = [
             'ansible-playbook', '-i', inventory_path, playbook_path,
             '-e', f'old_username={old_username}', '-e', f'new_username={username}'
         ]
-        subprocess.run(cmd, check=True)
+        subprocess.run(cmd, check=True, env=ansible_profile_env(inventory_path))
 
     return jsonify({'success': True, 'message': 'User updated successfully'})
 
@@ -1907,13 +6446,13 @@ def delete_user():
     username = target_user.username
 
     home_dir = os.path.expanduser("~")
-    inventory_path = os.path.join(home_dir, "ansible_quickstart", "inventory.ini")
+    inventory_path = get_ansible_inventory()
     playbook_path = os.path.join(home_dir, "ansible_quickstart", "playbooks", "delete_user.yml")
     cmd = [
         'ansible-playbook', '-i', inventory_path, playbook_path,
         '-e', f'username={username}'
     ]
-    subprocess.run(cmd, check=True)
+    subprocess.run(cmd, check=True, env=ansible_profile_env(inventory_path))
 
     Session.query.filter_by(user_id=target_user.id).delete()
     db.session.delete(target_user)
@@ -2008,5 +6547,15 @@ if __name__ == '__main__':
             
         except Exception as e:
             print(f"Initialization error: {str(e)}")
+
+    debug = True
+    # With the debug reloader this block also runs in the watcher parent,
+    # which never serves requests; only the serving child starts threads.
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_fact_cache_warmer()
+        start_health_prober()
+        start_job_catalog_scanner()
+        start_slurm_poller()
+        start_schedule_dispatcher()
     
-    app.run(debug=True, host='0.0.0.0', port=8080)
+    app.run(debug=debug, host='0.0.0.0', port=8080)
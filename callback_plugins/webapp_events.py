@@ -0,0 +1,99 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    name: webapp_events
+    type: aggregate
+    short_description: Write per-host task results as JSON lines for the web app
+    description:
+      - Appends one JSON object per finished host/task to the file named by
+        the WEBAPP_EVENTS_PATH environment variable, followed by a final
+        stats record. The duration of the first non-skipped task after fact
+        gathering is also reported per host as a first_task event. It
+        includes getting a connection to the host as well as the module's
+        own runtime, so it is an upper bound on connection setup rather
+        than a measure of it. Regular stdout output is left untouched.
+    requirements:
+      - WEBAPP_EVENTS_PATH set in the environment
+'''
+
+import json
+import os
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+FACT_ACTIONS = frozenset((
+    'setup', 'gather_facts', 'ansible.builtin.setup', 'ansible.builtin.gather_facts'
+))
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'webapp_events'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        path = os.environ.get('WEBAPP_EVENTS_PATH')
+        self._events = open(path, 'a', buffering=1) if path else None
+        self._play = None
+        self._starts = {}
+        self._timed = set()
+
+    def _write(self, event):
+        if self._events:
+            self._events.write(json.dumps(event) + '\n')
+
+    def _record(self, result, status):
+        host = result._host.get_name()
+        task = result._task
+        end = time.time()
+        start = self._starts.pop((host, task._uuid), end)
+        res = result._result
+        event = {
+            'event': 'task',
+            'host': host,
+            'task': task.get_name(),
+            'action': task.action,
+            'play': self._play,
+            'status': status,
+            'changed': bool(res.get('changed', False)),
+            'start': start,
+            'end': end
+        }
+        if status in ('failed', 'unreachable'):
+            event['msg'] = str(res.get('msg', ''))[:512]
+        if host not in self._timed and status != 'skipped' and task.action not in FACT_ACTIONS:
+            self._timed.add(host)
+            self._write({'event': 'first_task', 'host': host, 'seconds': end - start})
+        self._write(event)
+
+    def v2_playbook_on_play_start(self, play):
+        self._play = play.get_name()
+
+    def v2_runner_on_start(self, host, task):
+        self._starts[(host.get_name(), task._uuid)] = time.time()
+
+    def v2_runner_on_ok(self, result):
+        self._record(result, 'ok')
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._record(result, 'ignored' if ignore_errors else 'failed')
+
+    def v2_runner_on_skipped(self, result):
+        self._record(result, 'skipped')
+
+    def v2_runner_on_unreachable(self, result):
+        self._record(result, 'unreachable')
+
+    def v2_playbook_on_stats(self, stats):
+        hosts = sorted(stats.processed.keys())
+        self._write({
+            'event': 'stats',
+            'hosts': dict((h, stats.summarize(h)) for h in hosts)
+        })
+        if self._events:
+            self._events.close()
+            self._events = None
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Ansible dynamic inventory backed by the web app database.
+
+Reads hosts, groups, memberships and vars from the inventory_* tables
+using DATABASE_URL and prints them in the dynamic inventory JSON format
+(--list, or --host <name>).
+"""
+import json
+import os
+import sys
+
+from sqlalchemy import create_engine, text
+
+
+def build_inventory(conn):
+    inventory = {
+        '_meta': {'hostvars': {}},
+        'all': {'children': ['ungrouped']},
+        'ungrouped': {'hosts': []}
+    }
+    hostvars = inventory['_meta']['hostvars']
+    host_names = {}
+
+    for row in conn.execute(text(
+        "SELECT id, name, ansible_host, ansible_user, ansible_connection FROM inventory_hosts"
+    )):
+        host_names[row.id] = row.name
+        vars_ = {}
+        if row.ansible_host:
+            vars_['ansible_host'] = row.ansible_host
+        if row.ansible_user:
+            vars_['ansible_user'] = row.ansible_user
+        if row.ansible_connection:
+            vars_['ansible_connection'] = row.ansible_connection
+        hostvars[row.name] = vars_
+
+    for row in conn.execute(text("SELECT host_id, `key`, value FROM inventory_host_vars")):
+        if row.host_id in host_names:
+            hostvars[host_names[row.host_id]][row.key] = row.value
+
+    group_names = {}
+    for row in conn.execute(text("SELECT id, name FROM inventory_groups")):
+        group_names[row.id] = row.name
+        if row.name == 'all':
+            # Only carries [all:vars]; every host is already in all.
+            inventory['all']['vars'] = {}
+            continue
+        inventory[row.name] = {'hosts': [], 'vars': {}}
+        inventory['all']['children'].append(row.name)
+
+    grouped = set()
+    for row in conn.execute(text("SELECT group_id, host_id FROM inventory_group_hosts")):
+        if row.group_id in group_names and row.host_id in host_names and group_names[row.group_id] != 'all':
+            inventory[group_names[row.group_id]]['hosts'].append(host_names[row.host_id])
+            grouped.add(row.host_id)
+
+    for row in conn.execute(text("SELECT group_id, `key`, value FROM inventory_group_vars")):
+        if row.group_id in group_names:
+            inventory[group_names[row.group_id]]['vars'][row.key] = row.value
+
+    inventory['ungrouped']['hosts'] = sorted(
+        name for host_id, name in host_names.items() if host_id not in grouped
+    )
+    return inventory
+
+
+def main():
+    url = os.environ.get('DATABASE_URL')
+    if not url:
+        sys.stderr.write("DATABASE_URL is not set\n")
+        return 1
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        inventory = build_inventory(conn)
+
+    if len(sys.argv) > 2 and sys.argv[1] == '--host':
+        print(json.dumps(inventory['_meta']['hostvars'].get(sys.argv[2], {})))
+    else:
+        print(json.dumps(inventory))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
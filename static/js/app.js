@@ -1,4 +1,12 @@
 var isEditMode = false;
+var currentExecutionId = null;
+var HOST_PICKER_PAGE_SIZE = 500;
+var HOST_LISTING_MAX_PAGE_SIZE = 1000;
+var groupOriginalMembers = [];
+var hostSearchTimer = null;
+var jobEventSource = null;
+var jobEventSourceUser = null;
+var watchedJobs = {};
 var originalFilename = '';
 window.isJobEditMode = false;
 window.originalJobFilename = '';
@@ -47,8 +55,10 @@ function checkUserAuthentication() {
                     username: res.username,
                     role: res.role
                 };
+                startJobEvents();
             } else {
                 window.currentUser = null;
+                stopJobEvents();
             }
             updateTabsAndButtonsByRole();
             if (window.currentUser && window.currentUser.role !== 1) {
@@ -77,7 +87,14 @@ function setupEventListeners() {
 function setupMainEventListeners() {
     document.getElementById('executeBtn').addEventListener('click', executePlaybook);
     document.getElementById('clearBtn').addEventListener('click', clearOutput);
+    document.getElementById('cancelExecutionBtn').addEventListener('click', cancelExecution);
     document.getElementById('refreshBtn').addEventListener('click', refreshLists);
+    document.getElementById('targetHostsSearch').addEventListener('input', function () {
+        scheduleHostSearch(loadHosts);
+    });
+    document.getElementById('jobTargetHostsSearch').addEventListener('input', function () {
+        scheduleHostSearch(loadJobHosts);
+    });
 
     document.querySelector('.tab-user').onclick = function () {
         if (window.currentUser) {
@@ -335,6 +352,7 @@ function setupProfileForm() {
             .then(r => r.json())
             .then(res => {
                 window.currentUser = null;
+                stopJobEvents();
                 updateTabsAndButtonsByRole();
                 switchTab('login');
                 document.getElementById('loginResult').innerHTML =
@@ -440,13 +458,54 @@ function loadTabData(tabName) {
 ================================================================================
 */
 
+function fetchHostPage(params) {
+    var query = new URLSearchParams(Object.assign({
+        compact: 1,
+        per_page: HOST_PICKER_PAGE_SIZE
+    }, params));
+    return fetch('/api/hosts?' + query.toString()).then(response => response.json());
+}
+
+function fetchAllHostPages(params) {
+    var hosts = [];
+    function fetchPage(page) {
+        return fetchHostPage(Object.assign({}, params, {
+            page: page,
+            per_page: HOST_LISTING_MAX_PAGE_SIZE
+        })).then(result => {
+            hosts = hosts.concat(result.hosts || []);
+            if (page < (result.pages || 0)) {
+                return fetchPage(page + 1);
+            }
+            return {hosts: hosts, total: result.total};
+        });
+    }
+    return fetchPage(1);
+}
+
+function scheduleHostSearch(reload) {
+    clearTimeout(hostSearchTimer);
+    hostSearchTimer = setTimeout(reload, 300);
+}
+
+function hostHealthSuffix(host) {
+    return host.health === 'down' ? ' - unreachable' : '';
+}
+
+function appendMoreHostsOption(select, page) {
+    if (page.total > page.hosts.length) {
+        var moreOption = document.createElement('option');
+        moreOption.value = '';
+        moreOption.disabled = true;
+        moreOption.textContent = (page.total - page.hosts.length) + ' more - type to filter';
+        select.appendChild(moreOption);
+    }
+}
+
 function loadHosts() {
-    fetch('/api/hosts')
-        .then(function (response) {
-            return response.json();
-        })
-        .then(function (hosts) {
-            populateHostsDropdown(hosts);
+    fetchHostPage({q: document.getElementById('targetHostsSearch').value.trim()})
+        .then(function (page) {
+            populateHostsDropdown(page);
             updateNodeCount();
         })
         .catch(function (error) {
@@ -456,7 +515,8 @@ function loadHosts() {
         });
 }
 
-function populateHostsDropdown(hosts) {
+function populateHostsDropdown(page) {
+    var hosts = page.hosts;
     var select = document.getElementById('targetHosts');
     select.innerHTML = '';
 
@@ -469,10 +529,10 @@ function populateHostsDropdown(hosts) {
         for (var i = 0; i < hosts.length; i++) {
             var option = document.createElement('option');
             option.value = hosts[i].name;
-            option.textContent = hosts[i].name + ' (' + hosts[i].ip + ')';
+            option.textContent = hosts[i].name + ' (' + hosts[i].ip + ')' + hostHealthSuffix(hosts[i]);
             select.appendChild(option);
         }
-        document.getElementById('nodeCount').textContent = hosts.length;
+        appendMoreHostsOption(select, page);
     } else {
         var noHostsOption = document.createElement('option');
         noHostsOption.value = '';
@@ -483,28 +543,24 @@ function populateHostsDropdown(hosts) {
 }
 
 function loadHostsDropdownForHostTab() {
-    fetch('/api/hosts')
-        .then(response => response.json())
-        .then(hosts => {
+    fetchHostPage({kind: 'host'})
+        .then(page => {
             var select = document.getElementById('hostSelect');
             select.innerHTML = '<option value="">-- New Host --</option>';
-            hosts.forEach(host => {
-                if (!host.name.startsWith('group:') && host.name !== 'all') {
-                    var option = document.createElement('option');
-                    option.value = host.name;
-                    option.textContent = host.name + (host.ip ? ' (' + host.ip + ')' : '');
-                    select.appendChild(option);
-                }
+            page.hosts.forEach(host => {
+                var option = document.createElement('option');
+                option.value = host.name;
+                option.textContent = host.name + (host.ip ? ' (' + host.ip + ')' : '');
+                select.appendChild(option);
             });
+            appendMoreHostsOption(select, page);
         });
 }
 
 function updateNodeCount() {
-    fetch('/api/hosts')
-        .then(response => response.json())
-        .then(hosts => {
-            var realHosts = hosts.filter(h => !h.name.startsWith('group:') && h.name !== 'all');
-            document.getElementById('nodeCount').textContent = realHosts.length;
+    fetchHostPage({kind: 'host', per_page: 1})
+        .then(page => {
+            document.getElementById('nodeCount').textContent = page.counts.hosts;
         })
         .catch(function () {
             document.getElementById('nodeCount').textContent = 'Error';
@@ -522,10 +578,9 @@ function onHostSelectChange() {
         return;
     }
 
-    fetch('/api/hosts')
-        .then(response => response.json())
-        .then(hosts => {
-            var host = hosts.find(h => h.name === hostName);
+    fetchHostPage({kind: 'host', name: hostName})
+        .then(page => {
+            var host = page.hosts[0];
             if (host) {
                 document.getElementById('hostName').value = host.name;
                 document.getElementById('hostIP').value = host.ip || '';
@@ -658,12 +713,11 @@ function clearHostForm() {
 */
 
 function loadGroupsDropdown() {
-    fetch('/api/hosts')
-        .then(response => response.json())
-        .then(hosts => {
+    fetchAllHostPages({kind: 'group'})
+        .then(page => {
             var select = document.getElementById('groupSelect');
             select.innerHTML = '<option value="">-- New Group --</option>';
-            hosts.forEach(host => {
+            page.hosts.forEach(host => {
                 if (host.name.startsWith('group:')) {
                     var groupName = host.name.replace('group:', '');
                     var option = document.createElement('option');
@@ -683,6 +737,7 @@ function onGroupSelectChange() {
         document.getElementById('deleteGroupBtn').style.display = 'none';
         document.getElementById('groupEditMode').style.display = 'none';
         document.getElementById('groupCreatorTitle').textContent = 'Manage Groups';
+        groupOriginalMembers = [];
         loadHostsForGroup([]);
         return;
     }
@@ -693,37 +748,28 @@ function onGroupSelectChange() {
     document.getElementById('groupEditMode').style.display = 'flex';
     document.getElementById('groupCreatorTitle').textContent = 'Edit Group: ' + groupName;
 
-    fetch('/api/hosts')
-        .then(response => response.json())
-        .then(hosts => {
-            var members = hosts
-                .filter(h => h.groups && h.groups.includes(groupName) && !h.name.startsWith('group:') && h.name !== 'all')
-                .map(h => h.name);
-            loadHostsForGroup(members);
+    fetchAllHostPages({kind: 'host', group: groupName})
+        .then(page => {
+            groupOriginalMembers = page.hosts.map(h => h.name);
+            loadHostsForGroup(groupOriginalMembers);
         });
 }
 
 function loadHostsForGroup(selectedMembers = []) {
-    fetch('/api/hosts')
-        .then(response => response.json())
-        .then(hosts => {
+    fetchAllHostPages({kind: 'host'})
+        .then(page => {
             var container = document.getElementById('groupHostsCheckboxes');
             container.innerHTML = '';
-            hosts.forEach(host => {
-                if (host.name !== 'all' && !host.name.startsWith('group:')) {
-                    var label = document.createElement('label');
-                    label.style.display = 'block';
-                    var checkbox = document.createElement('input');
-                    checkbox.type = 'checkbox';
-                    checkbox.value = host.name;
-                    checkbox.dataset.ip = host.ip || '';
-                    checkbox.dataset.user = host.user || '';
-                    checkbox.dataset.connection = host.connection || '';
-                    checkbox.checked = selectedMembers.includes(host.name);
-                    label.appendChild(checkbox);
-                    label.appendChild(document.createTextNode(' ' + host.name + (host.ip ? ' (' + host.ip + ')' : '')));
-                    container.appendChild(label);
-                }
+            page.hosts.forEach(host => {
+                var label = document.createElement('label');
+                label.style.display = 'block';
+                var checkbox = document.createElement('input');
+                checkbox.type = 'checkbox';
+                checkbox.value = host.name;
+                checkbox.checked = selectedMembers.includes(host.name);
+                label.appendChild(checkbox);
+                label.appendChild(document.createTextNode(' ' + host.name + (host.ip ? ' (' + host.ip + ')' : '')));
+                container.appendChild(label);
             });
         });
 }
@@ -732,14 +778,9 @@ function saveGroup() {
     var groupName = document.getElementById('groupName').value.trim();
     var checkboxes = document.querySelectorAll('#groupHostsCheckboxes input[type="checkbox"]:checked');
     var hosts = [];
-    checkboxes.forEach(cb => {
-        hosts.push({
-            name: cb.value,
-            ip: cb.dataset.ip || '',
-            user: cb.dataset.user || '',
-            connection: cb.dataset.connection || ''
-        });
-    });
+    // Picked hosts already exist; send names only so their resolved
+    // (possibly inherited) vars are not written back as host vars.
+    checkboxes.forEach(cb => hosts.push({name: cb.value}));
 
     if (!groupName || hosts.length === 0) {
         alert('Please enter a group name and select at least one host!');
@@ -768,49 +809,33 @@ function saveGroup() {
 function editSelectedGroup() {
     var groupName = document.getElementById('groupName').value.trim();
     var checkboxes = document.querySelectorAll('#groupHostsCheckboxes input[type="checkbox"]:checked');
-    var hosts = [];
-    checkboxes.forEach(cb => {
-        hosts.push({
-            name: cb.value,
-            ip: cb.dataset.ip || '',
-            user: cb.dataset.user || '',
-            connection: cb.dataset.connection || ''
-        });
-    });
+    var selected = [];
+    checkboxes.forEach(cb => selected.push(cb.value));
 
-    if (!groupName || hosts.length === 0) {
+    if (!groupName || selected.length === 0) {
         alert('Please enter a group name and select at least one host!');
         return;
     }
 
-    fetch('/api/delete-group', {
+    // Send only the membership changes; members the picker did not touch
+    // (and their variables) stay exactly as they are in the inventory.
+    fetch('/api/update-group', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
             body: JSON.stringify({
-                group_name: groupName
+                group_name: groupName,
+                add: selected.filter(name => !groupOriginalMembers.includes(name)),
+                remove: groupOriginalMembers.filter(name => !selected.includes(name))
             })
         })
         .then(response => response.json())
         .then(result => {
-            fetch('/api/create-group', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: JSON.stringify({
-                        group_name: groupName,
-                        hosts: hosts
-                    })
-                })
-                .then(response => response.json())
-                .then(result => {
-                    alert(result.message || result.error);
-                    loadGroupsDropdown();
-                    loadHostsForGroup([]);
-                    clearGroupForm();
-                });
+            alert(result.message || result.error);
+            loadGroupsDropdown();
+            loadHostsForGroup([]);
+            clearGroupForm();
         });
 }
 
@@ -842,6 +867,7 @@ function clearGroupForm() {
     var checkboxes = document.querySelectorAll('#groupHostsCheckboxes input[type="checkbox"]');
     checkboxes.forEach(cb => cb.checked = false);
     document.getElementById('groupSelect').value = '';
+    groupOriginalMembers = [];
     document.getElementById('editGroupBtn').style.display = 'none';
     document.getElementById('deleteGroupBtn').style.display = 'none';
     document.getElementById('groupEditMode').style.display = 'none';
@@ -921,22 +947,93 @@ function executePlaybook() {
         })
         .then(function (result) {
             if (result.success) {
-                outputContent.innerHTML += result.output;
-                updateStatus('Completed Successfully', '#28a745');
+                outputContent.innerHTML += 'Execution ' + result.execution_id + ' ' + result.status +
+                    (result.queue_position ? ' (queue position ' + result.queue_position + ')' : '') +
+                    (result.cached ? ' (cached result)' : result.coalesced ? ' (attached to identical run)' : '') + '...\n';
+                if (result.excluded_hosts && result.excluded_hosts.length) {
+                    outputContent.innerHTML += 'Skipping unreachable hosts: ' + result.excluded_hosts.join(', ') + '\n';
+                }
+                streamExecution(result.execution_id);
             } else {
-                outputContent.innerHTML += 'Error: ' + result.error + '\n' + (result.output || '');
+                outputContent.innerHTML += 'Error: ' + result.error + '\n';
                 updateStatus('Failed', '#dc3545');
+                document.getElementById('systemStatus').textContent = 'Ansible Available';
             }
         })
         .catch(function (error) {
             outputContent.innerHTML += 'Network Error: ' + error.message + '\n';
             updateStatus('Error', '#dc3545');
-        })
-        .finally(function () {
             document.getElementById('systemStatus').textContent = 'Ansible Available';
         });
 }
 
+function streamExecution(executionId) {
+    var outputContent = document.getElementById('outputContent');
+    var source = new EventSource('/api/executions/' + executionId + '/stream');
+
+    currentExecutionId = executionId;
+    document.getElementById('cancelExecutionBtn').style.display = 'inline-block';
+
+    updateStatus('Executing...', '#ffc107');
+
+    source.onmessage = function (event) {
+        outputContent.appendChild(document.createTextNode(event.data));
+        outputContent.scrollTop = outputContent.scrollHeight;
+    };
+
+    source.addEventListener('end', function (event) {
+        source.close();
+        finishExecution();
+        var status = JSON.parse(event.data);
+        if (status.status === 'completed') {
+            updateStatus('Completed Successfully', '#28a745');
+        } else if (status.status === 'cancelled') {
+            updateStatus('Cancelled', '#dc3545');
+        } else {
+            if (status.error) {
+                outputContent.appendChild(document.createTextNode('Error: ' + status.error + '\n'));
+            }
+            updateStatus('Failed', '#dc3545');
+        }
+        document.getElementById('systemStatus').textContent = 'Ansible Available';
+    });
+
+    source.onerror = function () {
+        if (source.readyState === EventSource.CLOSED) {
+            finishExecution();
+            outputContent.appendChild(document.createTextNode('Lost connection to execution ' + executionId + '\n'));
+            updateStatus('Error', '#dc3545');
+            document.getElementById('systemStatus').textContent = 'Ansible Available';
+        }
+    };
+}
+
+function finishExecution() {
+    currentExecutionId = null;
+    document.getElementById('cancelExecutionBtn').style.display = 'none';
+}
+
+function cancelExecution() {
+    if (!currentExecutionId || !confirm('Cancel the running execution?')) {
+        return;
+    }
+
+    fetch('/api/executions/' + currentExecutionId + '/cancel', {
+            method: 'POST'
+        })
+        .then(function (response) {
+            return response.json();
+        })
+        .then(function (result) {
+            if (!result.success) {
+                alert('Error: ' + result.error);
+            }
+        })
+        .catch(function (error) {
+            alert('Network Error: ' + error.message);
+        });
+}
+
 function editSelectedPlaybook() {
     var selectedPlaybook = document.getElementById('playbooks').value;
 
@@ -1222,19 +1319,17 @@ function populateJobsDropdown(jobs) {
 }
 
 function loadJobHosts() {
-    fetch('/api/hosts')
-        .then(function (response) {
-            return response.json();
-        })
-        .then(function (hosts) {
-            populateJobHostsDropdown(hosts);
+    fetchHostPage({q: document.getElementById('jobTargetHostsSearch').value.trim()})
+        .then(function (page) {
+            populateJobHostsDropdown(page);
         })
         .catch(function (error) {
             document.getElementById('jobTargetHosts').innerHTML = '<option value="">Error loading hosts</option>';
         });
 }
 
-function populateJobHostsDropdown(hosts) {
+function populateJobHostsDropdown(page) {
+    var hosts = page.hosts;
     var select = document.getElementById('jobTargetHosts');
     select.innerHTML = '';
 
@@ -1247,7 +1342,7 @@ function populateJobHostsDropdown(hosts) {
         for (var i = 0; i < hosts.length; i++) {
             var option = document.createElement('option');
             option.value = hosts[i].name;
-            option.textContent = hosts[i].name + ' (' + hosts[i].ip + ')';
+            option.textContent = hosts[i].name + ' (' + hosts[i].ip + ')' + hostHealthSuffix(hosts[i]);
             select.appendChild(option);
         }
     } else {
@@ -1292,8 +1387,7 @@ function executeJob() {
 
                 const jobIdMatch = result.output.match(/Submitted batch job (\d+)/);
                 if (jobIdMatch && jobIdMatch[1]) {
-                    const jobId = jobIdMatch[1];
-                    setTimeout(() => fetchJobOutput(jobId), 5000);
+                    watchJob(jobIdMatch[1]);
                 }
 
                 updateJobStatus('Completed Successfully', '#28a745');
@@ -1316,6 +1410,66 @@ function getSelectedApplications() {
     return Array.from(selected).map(item => JSON.parse(item.dataset.appConfig));
 }
 
+function startJobEvents() {
+    var username = window.currentUser ? window.currentUser.username : null;
+    if (jobEventSource && jobEventSourceUser === username) return;
+    stopJobEvents();
+    jobEventSource = new EventSource('/api/slurm/events');
+    jobEventSourceUser = username;
+    jobEventSource.addEventListener('job', function (event) {
+        onJobStateChange(JSON.parse(event.data));
+    });
+    jobEventSource.addEventListener('end', function () {
+        stopJobEvents();
+    });
+}
+
+function stopJobEvents() {
+    if (jobEventSource) {
+        jobEventSource.close();
+    }
+    jobEventSource = null;
+    jobEventSourceUser = null;
+    watchedJobs = {};
+}
+
+function watchJob(jobId) {
+    watchedJobs[jobId] = true;
+    startJobEvents();
+    document.getElementById('jobOutputContent').appendChild(
+        document.createTextNode('\nWatching job ' + jobId + ' for state changes...\n'));
+    followJobLog(jobId);
+}
+
+function followJobLog(jobId) {
+    var outputContent = document.getElementById('jobOutputContent');
+    var source = new EventSource('/api/job-log/' + jobId + '/stream');
+
+    source.onmessage = function (event) {
+        outputContent.appendChild(document.createTextNode(event.data));
+        outputContent.scrollTop = outputContent.scrollHeight;
+    };
+
+    source.addEventListener('end', function () {
+        source.close();
+    });
+}
+
+function onJobStateChange(change) {
+    var baseId = change.job_id.split('_')[0];
+    if (!watchedJobs[baseId]) return;
+
+    var outputContent = document.getElementById('jobOutputContent');
+    outputContent.appendChild(document.createTextNode(
+        'Job ' + change.job_id + ': ' + (change.from || 'SUBMITTED') + ' -> ' + change.to + '\n'));
+    outputContent.scrollTop = outputContent.scrollHeight;
+
+    if (change.terminal && change.job_id === baseId) {
+        delete watchedJobs[baseId];
+        fetchJobOutput(baseId);
+    }
+}
+
 function fetchJobOutput(jobId) {
     const outputContent = document.getElementById('jobOutputContent');
     
@@ -1326,7 +1480,7 @@ function fetchJobOutput(jobId) {
     
     outputContent.innerHTML += `\nFetching output for job ${jobId}...\n`;
 
-    fetch(`/api/job-output/${jobId}`)
+    fetch(`/api/job-output/${jobId}?format=text`)
         .then(response => response.json())
         .then(result => {
             if (result.success) {
@@ -1354,7 +1508,7 @@ function fetchSlurmQueue() {
     
     outputContent.innerHTML += `\nFetching SLURM queue status...\n`;
 
-    fetch('/api/slurm-queue')
+    fetch('/api/slurm-queue?format=text')
         .then(response => response.json())
         .then(result => {
             if (result.success) {
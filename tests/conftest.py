@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+# app.py builds its engines at import time, so point them somewhere harmless
+# before the first test module imports it.
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SLURM_DB_URL', 'sqlite://')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as webapp  # noqa: E402
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    monkeypatch.setitem(webapp.APP_CONFIG['execution'], 'output_dir', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def database():
+    with webapp.app.app_context():
+        webapp.db.create_all()
+        yield webapp.db
+        webapp.db.session.remove()
+        webapp.db.drop_all()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    user = type('User', (), {'username': 'alice', 'role_id': None})()
+    monkeypatch.setattr(webapp, 'get_current_user', lambda: user)
+    return webapp.app.test_client()
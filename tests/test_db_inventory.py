@@ -0,0 +1,65 @@
+import os
+import sys
+
+import app as webapp
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'inventory'))
+
+import db_inventory  # noqa: E402
+
+INVENTORY = """\
+standalone ansible_host=10.0.0.9
+
+[web]
+web01 ansible_host=10.0.0.1
+web02 ansible_host=10.0.0.2 ansible_port=22
+
+[web:vars]
+http_port=8080
+
+[all:vars]
+ansible_user=admin
+ansible_port=2222
+"""
+
+
+def test_import_keeps_all_vars(database):
+    assert webapp.import_inventory_ini(INVENTORY) == 3
+
+    inventory = webapp.export_db_inventory()
+
+    assert inventory['all']['vars'] == {'ansible_user': 'admin', 'ansible_port': '2222'}
+    assert 'all' not in inventory['all']['children']
+    assert inventory['web'] == {'hosts': ['web01', 'web02'], 'vars': {'http_port': '8080'}}
+    assert inventory['ungrouped']['hosts'] == ['standalone']
+
+
+def test_export_round_trips(database):
+    webapp.import_inventory_ini(INVENTORY)
+    exported = webapp.format_inventory_ini(webapp.export_db_inventory())
+
+    assert '[all:vars]' in exported
+
+    first = webapp.export_db_inventory()
+    webapp.import_inventory_ini(exported)
+    assert webapp.export_db_inventory() == first
+
+
+def test_dynamic_inventory_emits_all_vars(database):
+    webapp.import_inventory_ini(INVENTORY)
+
+    with database.engine.connect() as conn:
+        inventory = db_inventory.build_inventory(conn)
+
+    assert inventory['all']['vars'] == {'ansible_user': 'admin', 'ansible_port': '2222'}
+    assert 'all' not in inventory['all']['children']
+    assert sorted(inventory['web']['hosts']) == ['web01', 'web02']
+
+
+def test_all_port_applies_to_host_listing(database):
+    webapp.import_inventory_ini(INVENTORY)
+
+    hosts = {h['name']: h for h in webapp.load_db_inventory_hosts()}
+
+    assert hosts['web01']['port'] == '2222'
+    assert hosts['web02']['port'] == '22'
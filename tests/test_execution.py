@@ -0,0 +1,37 @@
+import pytest
+
+import app as webapp
+
+
+def test_run_execution_finishes_when_command_cannot_be_built(output_dir):
+    execution = webapp.PlaybookExecution('alice', 'site.yml', ['web01'], ['ansible-playbook', ['web01']])
+
+    webapp.run_execution(execution)
+
+    assert execution.finished
+    assert execution.status == 'error'
+    assert 'Execution error' in execution.error
+
+
+def test_run_execution_finishes_when_env_setup_fails(output_dir, monkeypatch):
+    def broken_env(execution):
+        raise OSError('read-only file system')
+
+    monkeypatch.setattr(webapp, 'build_execution_env', broken_env)
+    execution = webapp.PlaybookExecution('alice', 'site.yml', 'all', ['ansible-playbook', 'site.yml'])
+
+    webapp.run_execution(execution)
+
+    assert execution.finished
+    assert execution.status == 'error'
+    assert 'read-only file system' in execution.error
+
+
+@pytest.mark.parametrize('hosts', [['web01'], '', '   ', 5])
+def test_pipeline_rejects_non_string_hosts(hosts):
+    with pytest.raises(ValueError, match='hosts'):
+        webapp.validate_pipeline_stages([{'id': 'a', 'playbook': 'site.yml', 'hosts': hosts}])
+
+
+def test_pipeline_accepts_default_hosts():
+    webapp.validate_pipeline_stages([{'id': 'a', 'playbook': 'site.yml'}])
@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+import app as webapp
+
+
+@pytest.mark.parametrize('hosts', [[['x']], [''], [None], 'web01'])
+def test_probe_rejects_bad_host_lists(client, hosts):
+    response = client.post('/api/hosts/health/probe', json={'hosts': hosts})
+    assert response.get_json() == {'success': False, 'error': 'hosts must be a list of host names'}
+
+
+def test_probe_refuses_while_another_holds_the_lock(client, monkeypatch):
+    started = []
+    monkeypatch.setattr(webapp, 'probe_inventory_hosts', lambda *args: started.append(args))
+    assert webapp.health_probe_lock.acquire(blocking=False)
+    try:
+        response = client.post('/api/hosts/health/probe', json={'hosts': ['web01']})
+    finally:
+        webapp.health_probe_lock.release()
+    assert response.get_json()['error'] == 'Health probe already running'
+    assert started == []
+
+
+def test_probe_claims_the_lock_before_starting(client, monkeypatch):
+    started = []
+    monkeypatch.setattr(webapp, 'probe_inventory_hosts', lambda *args: started.append(args))
+
+    first = client.post('/api/hosts/health/probe', json={'hosts': ['web01']})
+    second = client.post('/api/hosts/health/probe', json={})
+
+    assert first.get_json()['success'] is True
+    assert second.get_json()['error'] == 'Health probe already running'
+    deadline = time.monotonic() + 5
+    while not started and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert started == [({'web01'}, True)]
+    webapp.health_probe_status['running'] = False
+    webapp.health_probe_lock.release()
+
+
+def test_claimed_probe_releases_the_lock(monkeypatch):
+    monkeypatch.setattr(webapp, 'get_inventory_index', lambda: ({'hosts': []}, None))
+    assert webapp.health_probe_lock.acquire(blocking=False)
+    webapp.health_probe_status['running'] = True
+
+    assert webapp.probe_inventory_hosts({'web01'}, claimed=True)
+
+    assert not webapp.health_probe_status['running']
+    assert webapp.health_probe_lock.acquire(blocking=False)
+    webapp.health_probe_lock.release()
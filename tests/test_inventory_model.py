@@ -0,0 +1,89 @@
+import pytest
+
+import app as webapp
+
+
+def model(text):
+    return webapp.InventoryModel.from_lines(text.splitlines())
+
+
+def test_numeric_range_keeps_zero_padding():
+    assert list(webapp.HostRange('node[01:03]')) == ['node01', 'node02', 'node03']
+
+
+def test_range_with_step_and_suffix():
+    assert list(webapp.HostRange('web[1:5:2].example.com')) == [
+        'web1.example.com', 'web3.example.com', 'web5.example.com'
+    ]
+
+
+def test_alpha_range():
+    assert list(webapp.HostRange('db-[a:c]')) == ['db-a', 'db-b', 'db-c']
+
+
+def test_range_membership_without_expanding():
+    host_range = webapp.HostRange('node[001:900:2]')
+    assert 'node001' in host_range
+    assert 'node899' in host_range
+    assert 'node002' not in host_range
+    assert 'node1' not in host_range
+    assert 'node901' not in host_range
+
+
+@pytest.mark.parametrize('pattern', ['node[5:1]', 'node[1:3:0]', 'node[a:5]'])
+def test_invalid_ranges(pattern):
+    with pytest.raises(ValueError):
+        webapp.HostRange(pattern)
+
+
+def test_children_and_ranges_are_members():
+    inventory = model(
+        "[web]\nweb[1:2]\n\n[db]\ndb01\n\n[prod:children]\nweb\ndb\n"
+    )
+    assert inventory.group_members('prod') == {'web1', 'web2', 'db01'}
+    assert inventory.defines_host('web2')
+    assert not inventory.defines_host('web3')
+
+
+def test_child_group_vars_override_parent_and_all():
+    inventory = model(
+        "[web]\nweb01\n\n[prod:children]\nweb\n\n"
+        "[prod:vars]\nansible_user=deploy\nansible_port=2200\n\n"
+        "[web:vars]\nansible_port=2201\n\n"
+        "[all:vars]\nansible_user=root\nntp=pool\n"
+    )
+    hosts = {h['name']: h for h in inventory.to_host_list()}
+    assert hosts['web01']['user'] == 'deploy'
+    assert hosts['web01']['port'] == '2201'
+    assert hosts['web01']['groups'] == ['prod', 'web']
+
+
+def test_host_vars_win_over_range_vars():
+    inventory = model("[web]\nweb[1:2] ansible_user=range\nweb2 ansible_user=own\n")
+    entries = dict(inventory.host_entries())
+    assert entries['web1']['ansible_user'] == 'range'
+    assert entries['web2']['ansible_user'] == 'own'
+
+
+@pytest.mark.parametrize('text', [
+    "[a:children]\nb\n\n[b:children]\na\n\n[a]\nh1\n\n[b]\nh2\n",
+    "[a:children]\na\n",
+    "[a:children]\nb\n\n[b:children]\nc\n\n[c:children]\na\n",
+])
+def test_recursive_group_loop_is_rejected(text):
+    with pytest.raises(ValueError, match='recursive group loop'):
+        model(text)
+
+
+def test_shared_child_is_not_a_loop():
+    inventory = model("[common]\nh1\n\n[a:children]\ncommon\n\n[b:children]\ncommon\n\n[top:children]\na\nb\n")
+    assert inventory.group_members('top') == {'h1'}
+    assert inventory.group_ancestors('common') == {'a', 'b', 'top'}
+
+
+def test_deleting_a_host_inside_a_range_is_refused():
+    document = webapp.InventoryDocument(["[web]\n", "web[01:10]\n", "web20\n"])
+    with pytest.raises(ValueError, match='range web\\[01:10\\]'):
+        document.delete_host('web05')
+    assert document.delete_host('web20') == 1
+    assert document.lines() == ["[web]\n", "web[01:10]\n"]
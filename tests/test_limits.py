@@ -0,0 +1,42 @@
+import pytest
+
+import app as webapp
+
+HOSTS = [
+    {'name': 'web01', 'ip': '10.0.0.1', 'groups': ['web', 'prod']},
+    {'name': 'web02', 'ip': '10.0.0.2', 'groups': ['web', 'staging']},
+    {'name': 'db01', 'ip': '10.0.1.1', 'groups': ['db', 'prod']},
+    {'name': 'db02', 'ip': '10.0.1.2', 'groups': ['db', 'staging']},
+    {'name': 'bastion', 'ip': '10.0.2.1', 'groups': []},
+]
+
+
+def resolve(limit):
+    index = webapp.build_inventory_index(HOSTS)
+    return webapp.resolve_limit_hosts(limit, lambda term: webapp.index_pattern_host_names(term, index))
+
+
+@pytest.mark.parametrize('limit, expected', [
+    ('all', ['bastion', 'db01', 'db02', 'web01', 'web02']),
+    ('web', ['web01', 'web02']),
+    ('web,db01', ['db01', 'web01', 'web02']),
+    ('web:db', ['db01', 'db02', 'web01', 'web02']),
+    ('web*', ['web01', 'web02']),
+    ('prod:&web', ['web01']),
+    ('web:!staging', ['web01']),
+    ('group:web', ['web01', 'web02']),
+    ('!web', ['bastion', 'db01', 'db02']),
+    ('&prod', ['db01', 'web01']),
+    ('missing', []),
+])
+def test_resolve_limit(limit, expected):
+    assert resolve(limit) == expected
+
+
+def test_exclusion_applies_after_later_union():
+    # Ansible applies every ! after the unions, whatever the order written.
+    assert resolve('!web01,web') == ['web02']
+
+
+def test_intersection_applies_after_later_union():
+    assert resolve('&prod,web,db') == ['db01', 'web01']
@@ -0,0 +1,62 @@
+import types
+
+import app as webapp
+
+
+def run(name, username, keys):
+    return types.SimpleNamespace(id=name, username=username, lock_keys=set(keys))
+
+
+def scheduler(running=(), pending=(), max_per_user=2):
+    sched = webapp.ExecutionScheduler(None, 4, max_per_user, 10)
+    sched.running = {e.id: e for e in running}
+    sched.pending = list(pending)
+    return sched
+
+
+def test_fifo_among_equals():
+    first, second = run('a', 'alice', {'web01'}), run('b', 'bob', {'web02'})
+    assert scheduler(pending=[first, second])._next_candidate() is first
+
+
+def test_fair_share_prefers_user_with_fewer_runs():
+    busy = run('r', 'alice', {'db01'})
+    queued_alice, queued_bob = run('a', 'alice', {'web01'}), run('b', 'bob', {'web02'})
+    sched = scheduler(running=[busy], pending=[queued_alice, queued_bob])
+    assert sched._next_candidate() is queued_bob
+
+
+def test_per_user_cap():
+    sched = scheduler(running=[run('r', 'alice', {'db01'})], pending=[run('a', 'alice', {'web01'})],
+                      max_per_user=1)
+    assert sched._next_candidate() is None
+
+
+def test_conflicting_run_waits():
+    sched = scheduler(running=[run('r', 'alice', {'web01'})], pending=[run('a', 'bob', {'web01', 'web02'})])
+    assert sched._next_candidate() is None
+
+
+def test_blocked_all_run_is_not_overtaken():
+    all_hosts = run('all', 'alice', {'*'})
+    later = run('b', 'bob', {'web02'})
+    sched = scheduler(running=[run('r', 'carol', {'web01'})], pending=[all_hosts, later])
+
+    assert sched._next_candidate() is None
+
+    sched.running = {}
+    assert sched._next_candidate() is all_hosts
+
+
+def test_blocked_run_only_reserves_its_own_hosts():
+    blocked = run('a', 'alice', {'web01'})
+    overlapping, disjoint = run('b', 'bob', {'web01'}), run('c', 'carol', {'db01'})
+    sched = scheduler(running=[run('r', 'dave', {'web01'})], pending=[blocked, overlapping, disjoint])
+    assert sched._next_candidate() is disjoint
+
+
+def test_user_capped_run_reserves_nothing():
+    capped = run('a', 'alice', {'*'})
+    other = run('b', 'bob', {'web02'})
+    sched = scheduler(running=[run('r', 'alice', {'db01'})], pending=[capped, other], max_per_user=1)
+    assert sched._next_candidate() is other
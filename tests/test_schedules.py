@@ -0,0 +1,89 @@
+import types
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app as webapp
+
+
+def at(text):
+    return datetime.strptime(text, '%Y-%m-%d %H:%M')
+
+
+def test_every_weekday_morning():
+    # 2026-10-16 is a Friday.
+    assert webapp.next_cron_time('0 9 * * 1-5', at('2026-10-16 09:00')) == at('2026-10-19 09:00')
+
+
+def test_step_minutes():
+    assert webapp.next_cron_time('*/15 * * * *', at('2026-10-16 10:07')) == at('2026-10-16 10:15')
+
+
+def test_sunday_as_seven():
+    assert webapp.next_cron_time('30 2 * * 7', at('2026-10-16 00:00')) == at('2026-10-18 02:30')
+
+
+def test_restricted_day_of_month_and_week_match_either():
+    # Vixie cron: the 1st of the month OR any Monday.
+    assert webapp.next_cron_time('0 0 1 * 1', at('2026-10-16 00:00')) == at('2026-10-19 00:00')
+
+
+def test_starred_day_of_week_step_needs_both():
+    # "*/2" still starts with "*", so both fields have to match.
+    assert webapp.next_cron_time('0 0 15 * */2', at('2026-10-16 00:00')) == at('2026-11-15 00:00')
+
+
+def test_month_rollover():
+    assert webapp.next_cron_time('0 0 31 * *', at('2026-11-01 00:00')) == at('2026-12-31 00:00')
+
+
+@pytest.mark.parametrize('expr', ['* * * *', '60 * * * *', '0 0 30 2 *', '0 0 * * 8', '*/0 * * * *'])
+def test_invalid_or_impossible_expressions(expr):
+    with pytest.raises(ValueError):
+        webapp.next_cron_time(expr, at('2026-10-16 00:00'))
+
+
+def test_schedule_timestamps_carry_utc_offset():
+    schedule = webapp.PlaybookSchedule(cron='0 9 * * 1-5', next_run_at=at('2026-10-19 09:00'))
+    data = schedule.to_dict()
+    assert data['timezone'] == 'UTC'
+    assert data['next_run_at'] == '2026-10-19T09:00:00+00:00'
+    assert data['last_run_at'] is None
+
+
+def make_run(database, slot_at):
+    schedule = webapp.PlaybookSchedule(name='s', username='alice', playbook='site.yml', cron='0 9 * * *')
+    database.session.add(schedule)
+    database.session.flush()
+    run = webapp.ScheduleRun(schedule_id=schedule.id, slot_at=slot_at, dispatched_at=slot_at, status='dispatched')
+    database.session.add(run)
+    database.session.commit()
+    return run.id
+
+
+def finished_execution(started_at):
+    return types.SimpleNamespace(
+        status='completed', error=None,
+        started_at=started_at.replace(tzinfo=timezone.utc),
+        finished_at=(started_at + timedelta(minutes=1)).replace(tzinfo=timezone.utc)
+    )
+
+
+def test_lateness_is_measured_from_the_slot(database):
+    run_id = make_run(database, at('2026-10-19 09:00'))
+
+    webapp.record_schedule_run_finished(run_id, finished_execution(at('2026-10-19 09:00') + timedelta(seconds=42)))
+
+    run = database.session.get(webapp.ScheduleRun, run_id)
+    assert run.status == 'completed'
+    assert run.lateness_seconds == 42
+
+
+def test_coalesced_run_records_no_lateness(database):
+    run_id = make_run(database, at('2026-10-19 09:00'))
+
+    webapp.record_schedule_run_finished(run_id, finished_execution(at('2026-10-19 08:58')), coalesced=True)
+
+    run = database.session.get(webapp.ScheduleRun, run_id)
+    assert run.status == 'completed'
+    assert run.lateness_seconds is None
@@ -0,0 +1,73 @@
+import os
+
+import app as webapp
+
+CREATE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'slurm_jobs', 'create_file.sh')
+
+APP_ENTRY = {
+    'name': 'siesta',
+    'manifest': {'type': 'binary', 'executable': '/opt/siesta/bin/siesta',
+                 'input': {'redirect': True}, 'output': {'extension': '.out'}},
+    'test_files': []
+}
+INPUTS = [{'path': '/tests/a.fdf'}, {'path': '/tests/b.fdf'}]
+
+
+def first_command(lines):
+    return next(i for i, line in enumerate(lines) if line.strip() and not line.lstrip().startswith('#'))
+
+
+def last_directive(lines):
+    return max(i for i, line in enumerate(lines) if line.startswith('#SBATCH'))
+
+
+def test_preamble_end_skips_comments_and_blank_lines():
+    lines = ['#!/bin/bash', '# Description', '', '#SBATCH --time=1', '# note', '#SBATCH --mem=1G', '', 'echo hi']
+    assert webapp.sbatch_preamble_end(lines) == 6
+
+
+def test_preamble_end_without_directives():
+    assert webapp.sbatch_preamble_end(['#!/bin/bash', 'echo hi']) == 1
+    assert webapp.sbatch_preamble_end(['echo hi']) == 0
+
+
+def test_plain_script_keeps_directives_after_a_comment():
+    with open(CREATE_FILE) as f:
+        content = f.read()
+
+    lines = webapp.render_sweep_script(content, APP_ENTRY, INPUTS).split('\n')
+
+    for directive in ('--job-name=create_file', '--time=00:05:00', '--ntasks=1', '--mem=100M'):
+        assert f'#SBATCH {directive}' in lines
+    assert last_directive(lines) < first_command(lines)
+    assert 'mkdir -p $HOME/job_outputs' not in lines
+    assert lines[-1] == 'run_sweep_task'
+
+
+def test_sweep_script_inserts_block_after_last_directive():
+    content = '\n'.join([
+        '#!/bin/bash',
+        '# Sweep over inputs',
+        '#SBATCH --job-name=sweep',
+        '',
+        '#SBATCH --time=01:00:00',
+        'run_sweep_task',
+        ''
+    ])
+
+    lines = webapp.render_sweep_script(content, APP_ENTRY, INPUTS).split('\n')
+
+    assert last_directive(lines) < first_command(lines)
+    assert lines.index('# === JOB ARRAY INPUTS ===') > lines.index('#SBATCH --time=01:00:00')
+    assert lines.count('run_sweep_task') == 1
+    assert "  /tests/a.fdf" in lines
+
+
+def test_application_setup_goes_after_all_directives():
+    content = '#!/bin/bash\n# Description\n#SBATCH --time=00:05:00\n\n#SBATCH --mem=1G\necho hi\n'
+
+    lines = webapp.inject_application_setup(content, APP_ENTRY).split('\n')
+
+    assert last_directive(lines) < lines.index('# === APPLICATION SETUP ===')
+    assert last_directive(lines) < first_command(lines)